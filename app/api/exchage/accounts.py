@@ -1,13 +1,12 @@
-from fastapi import APIRouter, HTTPException
-import requests
-from jwt import encode
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+from app.core import jsonutil, upstream
+from app.core.auth import encode
+from app.core.config import get_settings
+import asyncio
 import uuid
-import os
 from datetime import datetime
-from dotenv import load_dotenv
-
-# .env 파일 로드
-load_dotenv()
+from app.trading.balances import get_tracker
 
 router = APIRouter(
     prefix="/api/upbit",
@@ -15,26 +14,73 @@ router = APIRouter(
 )
 
 # Upbit API 설정
-UPBIT_API_URL = "https://api.upbit.com/v1"
-ACCESS_KEY = os.getenv('UPBIT_OPEN_API_ACCESS_KEY')
-SECRET_KEY = os.getenv('UPBIT_OPEN_API_SECRET_KEY')
+settings = get_settings()
+UPBIT_API_URL = settings.upbit_api_url
+ACCESS_KEY = settings.access_key
+SECRET_KEY = settings.secret_key
+
+# 잔고 스트림에서 변화가 없을 때 연결 유지용 주석을 보내는 간격 (초)
+STREAM_KEEPALIVE = 15.0
 
 @router.get("/accounts")
 async def get_accounts():
     """전체 계좌 조회"""
     try:
+        result = await fetch_accounts()
+        # 받은 김에 잔고 구독자에게 변화 전달
+        get_tracker().apply(result)
+        return result
+        
+    except Exception as e:
+        raise upstream.error_response(e)
+
+@router.get("/accounts/stream")
+async def stream_accounts():
+    """
+    잔고 변화 구독 (Server-Sent Events)
+
+    접속 시 전체 잔고를 보내고, 이후에는 화폐별로 바뀐 값만 보낸다.
+    구독 중에는 기본 BALANCE_INTERVAL, 잠긴 잔고가 있으면 BALANCE_ACTIVE_INTERVAL 간격으로 조회하고,
+    이 서버로 주문/취소/출금/입금을 요청하면 바로 조회한다.
+
+    Returns:
+        - type: snapshot (accounts: 전체 잔고) / change (changes: 화폐별 변화)
+        - seq: 변화 번호 (증가)
+        - time: 조회 시각 (Unix timestamp)
+        - changes: currency, balance, locked, avg_buy_price, changed(바뀐 필드), prev(이전 값), removed(사라진 화폐)
+    """
+    tracker = get_tracker()
+    try:
+        queue = await tracker.subscribe()
+    except Exception as e:
+        raise upstream.error_response(e)
+
+    async def events():
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=STREAM_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                yield b"id: %d\ndata: %s\n\n" % (event["seq"], jsonutil.dumps(event))
+        finally:
+            tracker.unsubscribe(queue)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+async def fetch_accounts():
+    """전체 계좌 조회 (내부용, 업비트 호출은 스레드에서 실행)"""
+    def sign():
         payload = {
             'access_key': ACCESS_KEY,
             'nonce': str(uuid.uuid4()),
         }
-        
-        jwt_token = encode(payload, SECRET_KEY)
-        headers = {"Authorization": f"Bearer {jwt_token}"}
-        
-        response = requests.get(f"{UPBIT_API_URL}/accounts", headers=headers)
+        return {"Authorization": f"Bearer {encode(payload, SECRET_KEY)}"}
+
+    def load():
+        response = upstream.get(f"{UPBIT_API_URL}/accounts", sign=sign)
         response.raise_for_status()
-        
-        return response.json()
-        
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e)) 
\ No newline at end of file
+        return upstream.decode(response)
+
+    return await asyncio.to_thread(load)
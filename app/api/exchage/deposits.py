@@ -1,24 +1,38 @@
-from fastapi import APIRouter, HTTPException
-import requests
-from jwt import encode
+from fastapi import APIRouter
+from app.core import upstream
+from app.core.auth import encode, signer
+from app.core.config import get_settings
+from app.trading.balances import get_tracker
+from app.trading.transfers import ALL, cached_get, get_transfer_cache
+import asyncio
+import time
 import uuid
-import os
-from dotenv import load_dotenv
-from typing import Optional, List
+from typing import Dict, Optional, List
 from pydantic import BaseModel
 
-# .env 파일 로드
-load_dotenv()
-
 router = APIRouter(
     prefix="/api/upbit",
     tags=["4. Deposits"]
 )
 
 # Upbit API 설정
-UPBIT_API_URL = "https://api.upbit.com/v1"
-ACCESS_KEY = os.getenv('UPBIT_OPEN_API_ACCESS_KEY')
-SECRET_KEY = os.getenv('UPBIT_OPEN_API_SECRET_KEY')
+settings = get_settings()
+UPBIT_API_URL = settings.upbit_api_url
+ACCESS_KEY = settings.access_key
+SECRET_KEY = settings.secret_key
+
+# 입금 주소 생성 요청 후 주소가 발급될 때까지 전체 입금 주소 목록을 캐시하지 않는 최대 시간 (초)
+ADDRESS_PENDING_SECONDS = 300
+# 주소 생성 중인 화폐 -> 대기 만료 시각 (monotonic)
+_pending_addresses: Dict[str, float] = {}
+
+def pending_addresses() -> List[str]:
+    """주소 생성을 요청했지만 아직 발급을 확인하지 못한 화폐"""
+    now = time.monotonic()
+    for currency, expires in list(_pending_addresses.items()):
+        if expires < now:
+            del _pending_addresses[currency]
+    return list(_pending_addresses)
 
 class KRWDepositRequest(BaseModel):
     amount: str
@@ -75,14 +89,7 @@ async def get_deposits(
         if transaction_type:
             query.append(f"transaction_type={transaction_type}")
             
-        payload = {
-            'access_key': ACCESS_KEY,
-            'nonce': str(uuid.uuid4()),
-            'query': "&".join(query)
-        }
-        
-        jwt_token = encode(payload, SECRET_KEY)
-        headers = {"Authorization": f"Bearer {jwt_token}"}
+        sign = signer(ACCESS_KEY, SECRET_KEY, "&".join(query))
         
         params = {
             'currency': currency,
@@ -98,17 +105,18 @@ async def get_deposits(
         if txids:
             params['txids[]'] = txids
             
-        response = requests.get(
+        response = await asyncio.to_thread(
+            upstream.get,
             f"{UPBIT_API_URL}/deposits",
             params=params,
-            headers=headers
+            sign=sign
         )
         response.raise_for_status()
         
-        return response.json()
+        return upstream.decode(response)
         
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise upstream.error_response(e)
 
 @router.get("/deposit")
 async def get_deposit(
@@ -133,14 +141,7 @@ async def get_deposit(
         if currency:
             query.append(f"currency={currency}")
             
-        payload = {
-            'access_key': ACCESS_KEY,
-            'nonce': str(uuid.uuid4()),
-            'query': "&".join(query)
-        }
-        
-        jwt_token = encode(payload, SECRET_KEY)
-        headers = {"Authorization": f"Bearer {jwt_token}"}
+        sign = signer(ACCESS_KEY, SECRET_KEY, "&".join(query))
         
         params = {}
         if is_txid:
@@ -150,17 +151,18 @@ async def get_deposit(
         if currency:
             params['currency'] = currency
             
-        response = requests.get(
+        response = await asyncio.to_thread(
+            upstream.get,
             f"{UPBIT_API_URL}/deposit",
             params=params,
-            headers=headers
+            sign=sign
         )
         response.raise_for_status()
         
-        return response.json()
+        return upstream.decode(response)
         
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise upstream.error_response(e)
 
 @router.post("/deposits/generate_coin_address")
 async def generate_coin_address(currency: str):
@@ -184,40 +186,43 @@ async def generate_coin_address(currency: str):
             "Content-Type": "application/json"
         }
         
-        response = requests.post(
+        response = await asyncio.to_thread(
+            upstream.post,
             f"{UPBIT_API_URL}/deposits/generate_coin_address",
             params={'currency': currency},
             headers=headers
         )
         response.raise_for_status()
+        # 주소는 비동기로 발급되므로(creating) 발급 전 "주소 없음" 응답이 캐시되지 않도록 표시
+        currency = currency.upper()
+        _pending_addresses[currency] = time.monotonic() + ADDRESS_PENDING_SECONDS
+        cache = get_transfer_cache()
+        cache.invalidate("coin_addresses", currency)
+        cache.invalidate("coin_addresses", ALL)
+        cache.invalidate("coin_info", currency)
         
-        return response.json()
+        return upstream.decode(response)
         
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise upstream.error_response(e)
 
 @router.get("/deposits/coin_addresses")
 async def get_coin_addresses():
-    """전체 입금 주소 조회"""
+    """전체 입금 주소 조회 (5분 동안 캐시, 생성 요청한 주소가 발급될 때까지는 매번 조회)"""
     try:
-        payload = {
-            'access_key': ACCESS_KEY,
-            'nonce': str(uuid.uuid4()),
-        }
-        
-        jwt_token = encode(payload, SECRET_KEY)
-        headers = {"Authorization": f"Bearer {jwt_token}"}
-        
-        response = requests.get(
-            f"{UPBIT_API_URL}/deposits/coin_addresses",
-            headers=headers
-        )
-        response.raise_for_status()
-        
-        return response.json()
+        result = await cached_get("coin_addresses", "/deposits/coin_addresses")
+        pending = pending_addresses()
+        if pending:
+            issued = {a.get("currency") for a in result if a.get("deposit_address")}
+            for currency in pending:
+                if currency in issued:
+                    _pending_addresses.pop(currency, None)
+            if _pending_addresses:
+                get_transfer_cache().invalidate("coin_addresses", ALL)
+        return result
         
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise upstream.error_response(e)
 
 @router.get("/deposits/coin_address")
 async def get_coin_address(currency: str):
@@ -226,29 +231,22 @@ async def get_coin_address(currency: str):
     
     Args:
         currency: Currency 코드
+        
+    Note:
+        - 5분 동안 캐시 (TRANSFER_CACHE_TTLS), 입금 주소 생성 요청 후에는 다시 조회
+        - 주소가 없는(발급 중인) 응답은 캐시하지 않음
     """
     try:
-        query = f"currency={currency}"
-        payload = {
-            'access_key': ACCESS_KEY,
-            'nonce': str(uuid.uuid4()),
-            'query': query
-        }
-        
-        jwt_token = encode(payload, SECRET_KEY)
-        headers = {"Authorization": f"Bearer {jwt_token}"}
-        
-        response = requests.get(
-            f"{UPBIT_API_URL}/deposits/coin_address",
-            params={'currency': currency},
-            headers=headers
-        )
-        response.raise_for_status()
-        
-        return response.json()
+        currency = currency.upper()
+        result = await cached_get("coin_addresses", "/deposits/coin_address", {'currency': currency}, key=currency)
+        if result.get("deposit_address"):
+            _pending_addresses.pop(currency, None)
+        else:
+            get_transfer_cache().invalidate("coin_addresses", currency)
+        return result
         
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise upstream.error_response(e)
 
 @router.post("/deposits/krw")
 async def deposit_krw(deposit: KRWDepositRequest):
@@ -280,40 +278,28 @@ async def deposit_krw(deposit: KRWDepositRequest):
             "Content-Type": "application/json"
         }
         
-        response = requests.post(
+        response = await asyncio.to_thread(
+            upstream.post,
             f"{UPBIT_API_URL}/deposits/krw",
             json=data,
             headers=headers
         )
         response.raise_for_status()
+        get_tracker().poke()
         
-        return response.json()
+        return upstream.decode(response)
         
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise upstream.error_response(e)
 
 @router.get("/deposits/available_banks")
 async def get_available_banks():
-    """트레블룰 가능 거래소 조회"""
+    """트레블룰 가능 거래소 조회 (1시간 동안 캐시)"""
     try:
-        payload = {
-            'access_key': ACCESS_KEY,
-            'nonce': str(uuid.uuid4()),
-        }
-        
-        jwt_token = encode(payload, SECRET_KEY)
-        headers = {"Authorization": f"Bearer {jwt_token}"}
-        
-        response = requests.get(
-            f"{UPBIT_API_URL}/deposits/available_banks",
-            headers=headers
-        )
-        response.raise_for_status()
-        
-        return response.json()
+        return await cached_get("available_banks", "/deposits/available_banks")
         
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise upstream.error_response(e)
 
 @router.get("/deposits/available_bank_uuid")
 async def get_available_bank_by_uuid(uuid: str):
@@ -325,26 +311,20 @@ async def get_available_bank_by_uuid(uuid: str):
     """
     try:
         query = f"uuid={uuid}"
-        payload = {
-            'access_key': ACCESS_KEY,
-            'nonce': str(uuid.uuid4()),
-            'query': query
-        }
+        sign = signer(ACCESS_KEY, SECRET_KEY, query)
         
-        jwt_token = encode(payload, SECRET_KEY)
-        headers = {"Authorization": f"Bearer {jwt_token}"}
-        
-        response = requests.get(
+        response = await asyncio.to_thread(
+            upstream.get,
             f"{UPBIT_API_URL}/deposits/available_bank_uuid",
             params={'uuid': uuid},
-            headers=headers
+            sign=sign
         )
         response.raise_for_status()
         
-        return response.json()
+        return upstream.decode(response)
         
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise upstream.error_response(e)
 
 @router.get("/deposits/available_bank_txid")
 async def get_available_bank_by_txid(txid: str):
@@ -356,26 +336,20 @@ async def get_available_bank_by_txid(txid: str):
     """
     try:
         query = f"txid={txid}"
-        payload = {
-            'access_key': ACCESS_KEY,
-            'nonce': str(uuid.uuid4()),
-            'query': query
-        }
+        sign = signer(ACCESS_KEY, SECRET_KEY, query)
         
-        jwt_token = encode(payload, SECRET_KEY)
-        headers = {"Authorization": f"Bearer {jwt_token}"}
-        
-        response = requests.get(
+        response = await asyncio.to_thread(
+            upstream.get,
             f"{UPBIT_API_URL}/deposits/available_bank_txid",
             params={'txid': txid},
-            headers=headers
+            sign=sign
         )
         response.raise_for_status()
         
-        return response.json()
+        return upstream.decode(response)
         
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise upstream.error_response(e)
 
 @router.get("/deposits/coin_info")
 async def get_coin_info(currency: str):
@@ -384,26 +358,13 @@ async def get_coin_info(currency: str):
     
     Args:
         currency: Currency 코드
+        
+    Note:
+        - 1분 동안 캐시 (TRANSFER_CACHE_TTLS)
     """
     try:
-        query = f"currency={currency}"
-        payload = {
-            'access_key': ACCESS_KEY,
-            'nonce': str(uuid.uuid4()),
-            'query': query
-        }
-        
-        jwt_token = encode(payload, SECRET_KEY)
-        headers = {"Authorization": f"Bearer {jwt_token}"}
-        
-        response = requests.get(
-            f"{UPBIT_API_URL}/deposits/coin_info",
-            params={'currency': currency},
-            headers=headers
-        )
-        response.raise_for_status()
-        
-        return response.json()
+        currency = currency.upper()
+        return await cached_get("coin_info", "/deposits/coin_info", {'currency': currency}, key=currency)
         
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e)) 
\ No newline at end of file
+        raise upstream.error_response(e)
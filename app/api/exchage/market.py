@@ -1,8 +1,20 @@
 from fastapi import APIRouter, HTTPException, Query
-import requests
-from typing import List, Optional, Dict
+import asyncio
+from app.core import shared_state, upstream
+from app.core.batching import MicroBatcher
+from app.core.config import get_settings
+from app.core.cache import TTLCache
+from app.core.projection import parse_fields, shape_response, shape_data
+from app.core.metrics import CACHE_REQUESTS
+from app.core.responses import FastJSONResponse
+from app.market import bars as live_bars
+from app.market import candles as local_candles
+from app.market.shared_snapshot import SnapshotReader
+from app.market.versioning import VersionedStore, project_delta
+import time
+from collections import OrderedDict
+from typing import List, Optional, Dict, Tuple
 from datetime import datetime
-import httpx
 
 router = APIRouter(
     prefix="/api/upbit",
@@ -10,37 +22,137 @@ router = APIRouter(
 )
 
 # Upbit API 설정
-UPBIT_API_URL = "https://api.upbit.com/v1"
+UPBIT_API_URL = get_settings().upbit_api_url
+
+# 마켓 코드 원본 응답 캐시 (키: is_details)
+market_cache = TTLCache("market_all", get_settings().market_cache_ttl,
+                        stale_ttl=get_settings().upstream_stale_ttl)
+
+# 공유 메모리 스냅샷 (SNAPSHOT_ENABLED 일 때 피더가 기록, 워커는 읽기만 함)
+_snapshot = None
+_snapshot_retry_at = 0.0
+
+def get_snapshot():
+    """최신 공유 메모리 스냅샷 (비활성/미생성/오래된 경우 None)"""
+    global _snapshot, _snapshot_retry_at
+    settings = get_settings()
+    if not settings.snapshot_enabled:
+        return None
+    if _snapshot is None:
+        if time.monotonic() < _snapshot_retry_at:
+            return None
+        try:
+            _snapshot = SnapshotReader(settings.snapshot_name)
+        except (FileNotFoundError, ValueError):
+            _snapshot_retry_at = time.monotonic() + 1.0
+            return None
+    if _snapshot.age() > settings.snapshot_max_age:
+        # 피더가 재시작되며 세그먼트가 새로 만들어졌을 수 있으므로 다시 연결
+        _snapshot.close()
+        _snapshot = None
+        _snapshot_retry_at = time.monotonic() + 1.0
+        return None
+    return _snapshot
+
+# since=<seq> 변경분 응답용 버전 저장소
+market_versions = {False: VersionedStore(), True: VersionedStore()}
+ticker_versions = VersionedStore()
+# 호가는 형태(depth, group_by_price)별 저장소 - 원본/집계 호가의 변경분이 섞이지 않도록 분리
+ORDERBOOK_VERSION_SHAPES = 32
+orderbook_versions: "OrderedDict[Tuple[Optional[int], Optional[float]], VersionedStore]" = OrderedDict()
+
+def orderbook_store(depth: Optional[int], group_by_price: Optional[float]) -> VersionedStore:
+    """호가 형태별 버전 저장소 (최근 ORDERBOOK_VERSION_SHAPES 개 형태만 유지, 밀려난 형태는 전체 스냅샷부터)"""
+    key = (depth, group_by_price)
+    store = orderbook_versions.get(key)
+    if store is None:
+        store = orderbook_versions[key] = VersionedStore()
+        if len(orderbook_versions) > ORDERBOOK_VERSION_SHAPES:
+            orderbook_versions.popitem(last=False)
+    else:
+        orderbook_versions.move_to_end(key)
+    return store
+
+# 소수 마켓 현재가/호가 요청 묶음 처리 (BATCH_WINDOW 안에 들어온 요청을 업비트 호출 한 번으로)
+BATCH_MAX_MARKETS = 10
+ticker_batcher = MicroBatcher("ticker", lambda codes: fetch_ticker(",".join(codes)),
+                              window=get_settings().batch_window)
+orderbook_batcher = MicroBatcher("orderbook", lambda codes: fetch_orderbook(",".join(codes)),
+                                 window=get_settings().batch_window)
+
+async def load_batched(batcher: MicroBatcher, codes: List[str]) -> Optional[List[Dict]]:
+    """묶음 처리 대상이면 마켓별 항목, 아니면 None (많은 마켓 요청은 응답을 그대로 전달)"""
+    if batcher.window <= 0 or not codes or len(codes) > BATCH_MAX_MARKETS:
+        return None
+    return await batcher.load(codes)
+
+def split_markets(markets: str) -> List[str]:
+    return [m.strip() for m in markets.split(",") if m.strip()]
+
+def versioned_response(store: VersionedStore, rows: List[Dict], since: int,
+                       codes: Optional[List[str]], fields: Optional[str], complete: bool = False):
+    """최신 값을 반영한 뒤 since 이후 변경분(또는 전체 스냅샷) 응답"""
+    store.update(rows, complete)
+    return FastJSONResponse(project_delta(store.delta(since, codes), parse_fields(fields)))
+
+def local_candle_rows(resolution, market: str, to: Optional[str], count: Optional[int]) -> Optional[List[Dict]]:
+    """로컬 집계 캔들 (요청 범위를 모두 수집하지 못했으면 None -> 업비트 조회)"""
+    if count is not None and not 0 < count <= 200:
+        return None
+    store = local_candles.get_store()
+    store.sync_shared()
+    try:
+        rows = store.query(market, resolution, count or 1, to)
+    except ValueError:
+        # 해석할 수 없는 to 형식은 업비트 응답(오류 메시지)에 맡긴다
+        rows = None
+    CACHE_REQUESTS.labels("candles_local", "miss" if rows is None else "hit").inc()
+    return rows
+
+# 라우트는 업비트 응답 바이트를 그대로 전달(passthrough)하고 fields/layout 지정 시에만 가공하며,
+# 내부(스케줄러 등)에서 Python 객체가 필요할 때는 fetch_* 함수를 사용한다.
 
 @router.get("/market/all")
-async def get_market_all(is_details: bool = False):
+async def get_market_all(
+    is_details: bool = False,
+    fields: Optional[str] = None,
+    layout: str = "rows",
+    since: Optional[int] = None
+):
     """
     마켓 코드 조회
     
     Args:
         is_details: 유의종목 필드과 같은 상세 정보 노출 여부
+        fields: 응답에 포함할 필드 (콤마 구분, ex. market,trade_price)
+        layout: 응답 형태 (rows: 객체 목록, columns: 필드별 배열)
+        since: 마지막으로 받은 seq - 지정 시 이후 변경분만 응답 (0: 전체 스냅샷 + seq, layout 미적용)
     """
     try:
-        response = requests.get(
-            f"{UPBIT_API_URL}/market/all",
-            params={'isDetails': is_details}
-        )
-        response.raise_for_status()
-        
-        # 응답 데이터 로깅
-        #print("Upbit API response:", response.json())
-        
-        return response.json()
+        snapshot = get_snapshot()
+        rows = snapshot.market_all(is_details) if snapshot is not None else None
+        if since is not None:
+            if rows is None:
+                rows = await fetch_market_all(is_details)
+            return versioned_response(market_versions[is_details], rows, since, None, fields, complete=True)
+
+        if rows is not None:
+            return shape_data(rows, fields, layout)
+
+        content = await load_market_all(is_details)
+        return shape_response(content, fields, layout)
     except Exception as e:
         #print("Error:", str(e))  # 에러 로깅
-        raise HTTPException(status_code=400, detail=str(e))
+        raise upstream.error_response(e)
 
 @router.get("/candles/minutes/{unit}")
 async def get_candles_minutes(
     unit: int,
     market: str,
     to: Optional[str] = None,
-    count: Optional[int] = None
+    count: Optional[int] = None,
+    fields: Optional[str] = None,
+    layout: str = "rows"
 ):
     """
     분(Minute) 캔들 조회
@@ -50,29 +162,38 @@ async def get_candles_minutes(
         market: 마켓 코드 (ex. KRW-BTC)
         to: 마지막 캔들 시각 (ISO 8601)
         count: 캔들 개수 (최대 200개)
+        fields: 응답에 포함할 필드 (콤마 구분, ex. market,trade_price)
+        layout: 응답 형태 (rows: 객체 목록, columns: 필드별 배열)
     """
     try:
+        rows = None if unit not in local_candles.MINUTE_UNITS else local_candle_rows(unit, market, to, count)
+        if rows is not None:
+            return shape_data(rows, fields, layout)
+
         params = {'market': market}
         if to:
             params['to'] = to
         if count:
             params['count'] = count
             
-        response = requests.get(
+        response = await asyncio.to_thread(
+            upstream.get,
             f"{UPBIT_API_URL}/candles/minutes/{unit}",
             params=params
         )
         response.raise_for_status()
-        return response.json()
+        return shape_response(response.content, fields, layout)
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise upstream.error_response(e)
 
 @router.get("/candles/days")
 async def get_candles_days(
     market: str,
     to: Optional[str] = None,
     count: Optional[int] = None,
-    converting_price_unit: Optional[str] = None
+    converting_price_unit: Optional[str] = None,
+    fields: Optional[str] = None,
+    layout: str = "rows"
 ):
     """
     일(Day) 캔들 조회
@@ -82,8 +203,14 @@ async def get_candles_days(
         to: 마지막 캔들 시각 (ISO 8601)
         count: 캔들 개수 (최대 200개)
         converting_price_unit: 종가 환산 화폐 단위 (생략 가능)
+        fields: 응답에 포함할 필드 (콤마 구분, ex. market,trade_price)
+        layout: 응답 형태 (rows: 객체 목록, columns: 필드별 배열)
     """
     try:
+        rows = None if converting_price_unit else local_candle_rows("days", market, to, count)
+        if rows is not None:
+            return shape_data(rows, fields, layout)
+
         params = {'market': market}
         if to:
             params['to'] = to
@@ -92,20 +219,23 @@ async def get_candles_days(
         if converting_price_unit:
             params['convertingPriceUnit'] = converting_price_unit
             
-        response = requests.get(
+        response = await asyncio.to_thread(
+            upstream.get,
             f"{UPBIT_API_URL}/candles/days",
             params=params
         )
         response.raise_for_status()
-        return response.json()
+        return shape_response(response.content, fields, layout)
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise upstream.error_response(e)
 
 @router.get("/candles/weeks")
 async def get_candles_weeks(
     market: str,
     to: Optional[str] = None,
-    count: Optional[int] = None
+    count: Optional[int] = None,
+    fields: Optional[str] = None,
+    layout: str = "rows"
 ):
     """
     주(Week) 캔들 조회
@@ -114,28 +244,37 @@ async def get_candles_weeks(
         market: 마켓 코드 (ex. KRW-BTC)
         to: 마지막 캔들 시각 (ISO 8601)
         count: 캔들 개수 (최대 200개)
+        fields: 응답에 포함할 필드 (콤마 구분, ex. market,trade_price)
+        layout: 응답 형태 (rows: 객체 목록, columns: 필드별 배열)
     """
     try:
+        rows = local_candle_rows("weeks", market, to, count)
+        if rows is not None:
+            return shape_data(rows, fields, layout)
+
         params = {'market': market}
         if to:
             params['to'] = to
         if count:
             params['count'] = count
             
-        response = requests.get(
+        response = await asyncio.to_thread(
+            upstream.get,
             f"{UPBIT_API_URL}/candles/weeks",
             params=params
         )
         response.raise_for_status()
-        return response.json()
+        return shape_response(response.content, fields, layout)
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise upstream.error_response(e)
 
 @router.get("/candles/months")
 async def get_candles_months(
     market: str,
     to: Optional[str] = None,
-    count: Optional[int] = None
+    count: Optional[int] = None,
+    fields: Optional[str] = None,
+    layout: str = "rows"
 ):
     """
     월(Month) 캔들 조회
@@ -144,22 +283,71 @@ async def get_candles_months(
         market: 마켓 코드 (ex. KRW-BTC)
         to: 마지막 캔들 시각 (ISO 8601)
         count: 캔들 개수 (최대 200개)
+        fields: 응답에 포함할 필드 (콤마 구분, ex. market,trade_price)
+        layout: 응답 형태 (rows: 객체 목록, columns: 필드별 배열)
     """
     try:
+        rows = local_candle_rows("months", market, to, count)
+        if rows is not None:
+            return shape_data(rows, fields, layout)
+
         params = {'market': market}
         if to:
             params['to'] = to
         if count:
             params['count'] = count
             
-        response = requests.get(
+        response = await asyncio.to_thread(
+            upstream.get,
             f"{UPBIT_API_URL}/candles/months",
             params=params
         )
         response.raise_for_status()
-        return response.json()
+        return shape_response(response.content, fields, layout)
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise upstream.error_response(e)
+
+@router.get("/candles/live/{unit}")
+async def get_candles_live(
+    unit: int,
+    market: str,
+    to: Optional[str] = None,
+    count: int = Query(1, ge=1, le=200),
+    fields: Optional[str] = None,
+    layout: str = "rows"
+):
+    """
+    체결 기반 실시간 분 캔들 조회 (업비트 호출 없음)
+
+    trade_sync 작업이 수집한 체결로 만든 캔들이며, 첫 캔들은 진행 중인 캔들이다.
+    작업을 실행하지 않는 워커는 공유 상태(단위별 최근 60개)에서 응답한다.
+
+    Args:
+        unit: 분 단위 (1, 3, 5, 15, 10, 30, 60, 240)
+        market: 마켓 코드 (ex. KRW-BTC)
+        to: 마지막 캔들 시각 (ISO 8601)
+        count: 캔들 개수 (1 ~ 200)
+        fields: 응답에 포함할 필드 (콤마 구분, ex. market,trade_price)
+        layout: 응답 형태 (rows: 객체 목록, columns: 필드별 배열)
+    """
+    if unit not in local_candles.MINUTE_UNITS:
+        raise HTTPException(status_code=400, detail="잘못된 분 단위입니다")
+    try:
+        rows = live_bars.get_builder().candles(market, unit, count, to)
+        if rows is None:
+            result = shared_state.read("live_candles")
+            shared = (result or {}).get("data", {}).get("candles", {}).get(market, {}).get(str(unit))
+            if shared is not None:
+                if to:
+                    to_ms = local_candles.parse_time(to)
+                    shared = [c for c in shared
+                              if local_candles.parse_time(c["candle_date_time_utc"]) < to_ms]
+                rows = shared[:count]
+    except Exception as e:
+        raise upstream.error_response(e)
+    if rows is None:
+        raise HTTPException(status_code=404, detail="아직 체결 기반 캔들이 없습니다 (trade_sync 작업 확인)")
+    return shape_data(rows, fields, layout)
 
 @router.get("/trades/ticks")
 async def get_trades_ticks(
@@ -167,7 +355,9 @@ async def get_trades_ticks(
     to: Optional[str] = None,
     count: Optional[int] = None,
     cursor: Optional[str] = None,
-    days_ago: Optional[int] = None
+    days_ago: Optional[int] = None,
+    fields: Optional[str] = None,
+    layout: str = "rows"
 ):
     """
     최근 체결 내역
@@ -178,6 +368,8 @@ async def get_trades_ticks(
         count: 체결 개수 (최대 500개)
         cursor: 페이지네이션 커서
         days_ago: n일 전 데이터 조회 (최대 7일)
+        fields: 응답에 포함할 필드 (콤마 구분, ex. market,trade_price)
+        layout: 응답 형태 (rows: 객체 목록, columns: 필드별 배열)
     """
     try:
         params = {'market': market}
@@ -190,52 +382,118 @@ async def get_trades_ticks(
         if days_ago:
             params['daysAgo'] = days_ago
             
-        response = requests.get(
+        response = await asyncio.to_thread(
+            upstream.get,
             f"{UPBIT_API_URL}/trades/ticks",
             params=params
         )
         response.raise_for_status()
-        return response.json()
+        return shape_response(response.content, fields, layout)
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise upstream.error_response(e)
 
 @router.get("/ticker")
-async def get_ticker(markets: str):
+async def get_ticker(
+    markets: str,
+    fields: Optional[str] = None,
+    layout: str = "rows",
+    since: Optional[int] = None
+):
     """
     현재가 정보
     
     Args:
         markets: 마켓 코드 (ex. KRW-BTC, KRW-ETH)
+        fields: 응답에 포함할 필드 (콤마 구분, ex. market,trade_price)
+        layout: 응답 형태 (rows: 객체 목록, columns: 필드별 배열)
+        since: 마지막으로 받은 seq - 지정 시 이후 변경분만 응답 (0: 전체 스냅샷 + seq, layout 미적용)
     """
     try:
-        response = requests.get(
+        snapshot = get_snapshot()
+        if since is not None:
+            codes = split_markets(markets)
+            rows = snapshot.tickers(codes) if snapshot is not None else None
+            if rows is None:
+                rows = await load_batched(ticker_batcher, codes) or await fetch_ticker(markets)
+            return versioned_response(ticker_versions, rows, since, codes, fields)
+
+        codes = split_markets(markets)
+        if snapshot is not None:
+            rows = snapshot.tickers(codes)
+            if rows is not None:
+                return shape_data(rows, fields, layout)
+
+        rows = await load_batched(ticker_batcher, codes)
+        if rows is not None:
+            return shape_data(rows, fields, layout)
+
+        response = await asyncio.to_thread(
+            upstream.get,
             f"{UPBIT_API_URL}/ticker",
             params={'markets': markets}
         )
         response.raise_for_status()
-        return response.json()
+        return shape_response(response.content, fields, layout)
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise upstream.error_response(e)
 
 @router.get("/orderbook")
-async def get_orderbook(markets: str):
+async def get_orderbook(
+    markets: str,
+    fields: Optional[str] = None,
+    layout: str = "rows",
+    since: Optional[int] = None,
+    depth: Optional[int] = None,
+    group_by_price: Optional[float] = None
+):
     """
     호가 정보 조회
     
     Args:
         markets: 마켓 코드 (ex. KRW-BTC, KRW-ETH)
+        fields: 응답에 포함할 필드 (콤마 구분, ex. market,trade_price)
+        layout: 응답 형태 (rows: 객체 목록, columns: 필드별 배열)
+        since: 마지막으로 받은 seq - 지정 시 이후 변경분만 응답 (0: 전체 스냅샷 + seq, layout 미적용)
+        depth: 응답에 포함할 호가 단계 수 (ex. 5: 상위 5단계)
+        group_by_price: 가격 구간 크기 - 구간별로 잔량을 합산 (ex. 10000: 1만원 단위)
     """
     try:
-        response = requests.get(
+        snapshot = get_snapshot()
+        codes = split_markets(markets)
+        aggregate = depth is not None or group_by_price is not None
+        if since is not None or aggregate:
+            rows = snapshot.orderbooks(codes) if snapshot is not None else None
+            if rows is None:
+                rows = await load_batched(orderbook_batcher, codes) or await fetch_orderbook(markets)
+            if aggregate:
+                from app.market.orderbook import aggregate_orderbooks  # 사용 시에만 로드 (NumPy)
+                rows = aggregate_orderbooks(rows, depth, group_by_price)
+            if since is not None:
+                return versioned_response(orderbook_store(depth, group_by_price), rows, since, codes, fields)
+            return shape_data(rows, fields, layout)
+
+        if snapshot is not None:
+            rows = snapshot.orderbooks(codes)
+            if rows is not None:
+                return shape_data(rows, fields, layout)
+
+        rows = await load_batched(orderbook_batcher, codes)
+        if rows is not None:
+            return shape_data(rows, fields, layout)
+
+        response = await asyncio.to_thread(
+            upstream.get,
             f"{UPBIT_API_URL}/orderbook",
             params={'markets': markets}
         )
         response.raise_for_status()
-        return response.json()
+        return shape_response(response.content, fields, layout)
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise upstream.error_response(e)
 
 async def get_candles(market: str, to: str, count: int = 200) -> List[Dict]:
+    import httpx  # 사용 시에만 로드 (앱 시작 시간 단축)
+
     async with httpx.AsyncClient() as client:
         response = await client.get(
             "https://api.upbit.com/v1/candles/minutes/1",
@@ -247,4 +505,64 @@ async def get_candles(market: str, to: str, count: int = 200) -> List[Dict]:
         )
         if response.status_code != 200:
             return []
-        return response.json() 
\ No newline at end of file
+        return upstream.decode(response)
+
+async def load_market_all(is_details: bool = False) -> bytes:
+    """마켓 코드 원본 응답 (market_cache_ttl 동안 캐시)"""
+    def load():
+        response = upstream.get(
+            f"{UPBIT_API_URL}/market/all",
+            params={'isDetails': is_details}
+        )
+        response.raise_for_status()
+        return response.content
+
+    # 업비트 호출은 스레드에서 실행 (워밍업 중에도 이벤트 루프가 요청을 처리하도록)
+    return await market_cache.get_or_load(is_details, lambda: asyncio.to_thread(load))
+
+async def fetch_market_all(is_details: bool = False) -> List[Dict]:
+    """마켓 코드 조회 (내부용, Python 객체 반환)"""
+    return upstream.decode(await load_market_all(is_details))
+
+async def fetch_ticker(markets: str) -> List[Dict]:
+    """현재가 정보 (내부용, Python 객체 반환)"""
+    response = await asyncio.to_thread(
+        upstream.get,
+        f"{UPBIT_API_URL}/ticker",
+        params={'markets': markets}
+    )
+    response.raise_for_status()
+    return upstream.decode(response)
+
+async def fetch_orderbook(markets: str) -> List[Dict]:
+    """호가 정보 조회 (내부용, Python 객체 반환)"""
+    response = await asyncio.to_thread(
+        upstream.get,
+        f"{UPBIT_API_URL}/orderbook",
+        params={'markets': markets}
+    )
+    response.raise_for_status()
+    return upstream.decode(response)
+
+async def fetch_candles_minutes(unit: int, market: str, count: int = 200) -> List[Dict]:
+    """분 캔들 조회 (내부용, Python 객체 반환)"""
+    response = await asyncio.to_thread(
+        upstream.get,
+        f"{UPBIT_API_URL}/candles/minutes/{unit}",
+        params={'market': market, 'count': count}
+    )
+    response.raise_for_status()
+    return upstream.decode(response)
+
+async def fetch_trades(market: str, count: int = 100, cursor: Optional[int] = None) -> List[Dict]:
+    """최근 체결 내역 조회 (내부용, Python 객체 반환, cursor: 이 체결 번호 이전 체결부터)"""
+    params = {'market': market, 'count': count}
+    if cursor is not None:
+        params['cursor'] = cursor
+    response = await asyncio.to_thread(
+        upstream.get,
+        f"{UPBIT_API_URL}/trades/ticks",
+        params=params
+    )
+    response.raise_for_status()
+    return upstream.decode(response)
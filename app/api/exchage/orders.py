@@ -1,24 +1,32 @@
-from fastapi import APIRouter, HTTPException
-import requests
-from jwt import encode
-import uuid
-import os
-from dotenv import load_dotenv
-from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.core import jsonutil, ratelimit, upstream
+from app.core.auth import encode, signer
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.trading.balances import get_tracker
+from app.trading.latency import OrderLatencyTracker
+from app.trading.validation import validate_order, validate_price_unit
+import asyncio
+import logging
+import time
+from decimal import Decimal, InvalidOperation
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from uuid import uuid4
 from pydantic import BaseModel
 
-# .env 파일 로드
-load_dotenv()
-
 router = APIRouter(
     prefix="/api/upbit",
     tags=["2. Orders"]
 )
 
+logger = logging.getLogger(__name__)
+
 # Upbit API 설정
-UPBIT_API_URL = "https://api.upbit.com/v1"
-ACCESS_KEY = os.getenv('UPBIT_OPEN_API_ACCESS_KEY')
-SECRET_KEY = os.getenv('UPBIT_OPEN_API_SECRET_KEY')
+settings = get_settings()
+UPBIT_API_URL = settings.upbit_api_url
+ACCESS_KEY = settings.access_key
+SECRET_KEY = settings.secret_key
 
 class OrderRequest(BaseModel):
     market: str
@@ -29,6 +37,11 @@ class OrderRequest(BaseModel):
     identifier: Optional[str] = None  # 조회용 사용자 지정값
     time_in_force: Optional[str] = None  # ioc, fok (ord_type이 best 혹은 limit 일때만 지원)
 
+class PriceUnitRequest(BaseModel):
+    market: str
+    prices: List[float]
+    mode: str = "nearest"  # down(내림), up(올림), nearest(반올림)
+
 class CancelAndNewOrderRequest(BaseModel):
     prev_order_uuid: Optional[str] = None
     prev_order_identifier: Optional[str] = None
@@ -38,6 +51,117 @@ class CancelAndNewOrderRequest(BaseModel):
     new_identifier: Optional[str] = None
     new_time_in_force: Optional[str] = None
 
+# uuid/identifier 목록 조회/취소 시 업비트 호출 한 번에 보내는 최대 개수
+LOOKUP_CHUNK = 100
+CANCEL_CHUNK = 20
+
+def split_ids(uuids: Optional[List[str]], identifiers: Optional[List[str]]) -> Tuple[str, List[str]]:
+    """uuids/identifiers 검증 후 (필드 이름, 목록) 반환"""
+    if not uuids and not identifiers:
+        raise HTTPException(
+            status_code=400, 
+            detail="uuids 또는 identifiers 중 하나는 필수입니다"
+        )
+    if uuids and identifiers:
+        raise HTTPException(
+            status_code=400, 
+            detail="uuids와 identifiers는 동시에 사용할 수 없습니다"
+        )
+    return ('uuid', uuids) if uuids else ('identifier', identifiers)
+
+async def signed_request(method: str, path: str, params: List[Tuple[str, str]], group: str = "default"):
+    """
+    인증이 필요한 업비트 호출 (요청 수 제한 그룹 토큰을 얻은 뒤 스레드에서 실행)
+
+    Args:
+        method: HTTP 메서드
+        path: API 경로 (ex. /orders/uuids)
+        params: (이름, 값) 목록 - 배열 파라미터는 같은 이름을 반복 (ex. ('uuids[]', uuid))
+        group: 업비트 요청 수 제한 그룹
+    """
+    await ratelimit.acquire(group)
+
+    def sign():
+        payload = {
+            'access_key': ACCESS_KEY,
+            'nonce': str(uuid4()),
+            'query': "&".join(f"{k}={v}" for k, v in params)
+        }
+        return {"Authorization": f"Bearer {encode(payload, SECRET_KEY)}"}
+
+    def call():
+        response = upstream.request(method, f"{UPBIT_API_URL}{path}", params=params, sign=sign)
+        response.raise_for_status()
+        return upstream.decode(response)
+
+    return await asyncio.to_thread(call)
+
+async def fetch_orders_by_uuid(uuids: List[str]) -> List[Dict]:
+    """uuid 목록으로 주문 조회 (내부용, 최대 100개)"""
+    return await signed_request("GET", "/orders/uuids", [('uuids[]', u) for u in uuids])
+
+# 주문별 처리 시간 기록, 접수된 주문의 체결 추적
+order_latency = OrderLatencyTracker(
+    fetch_orders_by_uuid,
+    interval=settings.order_poll_interval,
+    history=settings.order_latency_history,
+    max_track=settings.order_track_seconds,
+    max_interval=settings.order_poll_max_interval,
+    unfilled_track=settings.order_unfilled_track_seconds,
+)
+
+# 주문 가능 정보 (주문 사전 검증용, 주문 접수 시 잔고를 반영하고 취소 후 비움)
+chance_cache = TTLCache("order_chance", settings.order_chance_ttl, maxsize=256)
+
+async def load_order_chance(market: str) -> Dict:
+    """주문 가능 정보 조회 (ORDER_CHANCE_TTL 동안 캐시)"""
+    return await chance_cache.get_or_load(
+        market, lambda: signed_request("GET", "/orders/chance", [('market', market)])
+    )
+
+async def refresh_order_chance(market: str):
+    """주문 가능 정보 백그라운드 조회 (실패해도 주문에는 영향 없음)"""
+    try:
+        await load_order_chance(market)
+    except Exception as e:
+        logger.warning("Error in order chance refresh (%s): %s", market, e)
+
+def cached_order_chance(market: str) -> Optional[Dict]:
+    """
+    캐시된 주문 가능 정보 (주문 경로에서 업비트를 기다리지 않음)
+
+    Returns:
+        캐시에 없으면 None (백그라운드로 조회해 다음 주문부터 사용)
+    """
+    chance = chance_cache.get(market)
+    if chance is None:
+        asyncio.ensure_future(refresh_order_chance(market))
+    return chance
+
+def apply_order_to_chance(order: "OrderRequest", result: Dict):
+    """
+    접수된 주문이 잠근 금액/수량(locked)을 캐시된 주문 가능 잔고에 반영
+
+    Note:
+        - 업비트를 다시 조회하지 않고 캐시 만료 시각도 그대로 둔다
+        - 응답에 locked 가 없으면 해당 마켓 캐시를 비운다 (다음 주문은 잔고 검사 없이 통과)
+    """
+    chance = chance_cache.get(order.market)
+    if chance is None:
+        return
+    try:
+        locked = Decimal(str(result['locked']))
+    except (KeyError, InvalidOperation):
+        chance_cache.invalidate(order.market)
+        return
+    key = f"{order.side}_account"
+    account = dict(chance.get(key) or {})
+    if not account:
+        return
+    account['balance'] = str(Decimal(str(account.get('balance') or 0)) - locked)
+    account['locked'] = str(Decimal(str(account.get('locked') or 0)) + locked)
+    chance_cache.replace(order.market, {**chance, key: account})
+
 @router.get("/orders/chance")
 async def get_order_chance(market: str):
     """
@@ -52,28 +176,15 @@ async def get_order_chance(market: str):
         - market: 마켓 정보
         - bid_account: 매수 시 사용하는 화폐의 계좌 상태
         - ask_account: 매도 시 사용하는 화폐의 계좌 상태
+        
+    Note:
+        - ORDER_CHANCE_TTL(기본 3초) 동안 캐시하며, 주문 접수/취소 후에는 다시 조회한다
     """
     try:
-        payload = {
-            'access_key': ACCESS_KEY,
-            'nonce': str(uuid.uuid4()),
-            'query': f'market={market}'
-        }
-        
-        jwt_token = encode(payload, SECRET_KEY)
-        headers = {"Authorization": f"Bearer {jwt_token}"}
-        
-        response = requests.get(
-            f"{UPBIT_API_URL}/orders/chance",
-            params={'market': market},
-            headers=headers
-        )
-        response.raise_for_status()
-        
-        return response.json()
+        return await load_order_chance(market)
         
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise upstream.error_response(e)
 
 @router.get("/order")
 async def get_order(uuid: str = None, identifier: str = None):
@@ -111,26 +222,20 @@ async def get_order(uuid: str = None, identifier: str = None):
         if identifier:
             query.append(f"identifier={identifier}")
             
-        payload = {
-            'access_key': ACCESS_KEY,
-            'nonce': str(uuid.uuid4()),
-            'query': "&".join(query)
-        }
-        
-        jwt_token = encode(payload, SECRET_KEY)
-        headers = {"Authorization": f"Bearer {jwt_token}"}
+        sign = signer(ACCESS_KEY, SECRET_KEY, "&".join(query))
         
-        response = requests.get(
+        response = await asyncio.to_thread(
+            upstream.get,
             f"{UPBIT_API_URL}/order",
             params={'uuid': uuid} if uuid else {'identifier': identifier},
-            headers=headers
+            sign=sign
         )
         response.raise_for_status()
         
-        return response.json()
+        return upstream.decode(response)
         
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise upstream.error_response(e)
 
 @router.get("/orders")
 async def get_orders(
@@ -176,8 +281,8 @@ async def get_orders(
             for s in states:
                 query.append(f"states[]={s}")
         if uuids:
-            for uuid in uuids:
-                query.append(f"uuids[]={uuid}")
+            for order_uuid in uuids:
+                query.append(f"uuids[]={order_uuid}")
         if identifiers:
             for identifier in identifiers:
                 query.append(f"identifiers[]={identifier}")
@@ -188,14 +293,7 @@ async def get_orders(
         if order_by:
             query.append(f"order_by={order_by}")
             
-        payload = {
-            'access_key': ACCESS_KEY,
-            'nonce': str(uuid.uuid4()),
-            'query': "&".join(query)
-        }
-        
-        jwt_token = encode(payload, SECRET_KEY)
-        headers = {"Authorization": f"Bearer {jwt_token}"}
+        sign = signer(ACCESS_KEY, SECRET_KEY, "&".join(query))
         
         params = {
             'market': market,
@@ -212,90 +310,62 @@ async def get_orders(
         if identifiers:
             params['identifiers[]'] = identifiers
             
-        response = requests.get(
+        response = await asyncio.to_thread(
+            upstream.get,
             f"{UPBIT_API_URL}/orders",
             params=params,
-            headers=headers
+            sign=sign
         )
         response.raise_for_status()
         
-        return response.json()
+        return upstream.decode(response)
         
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise upstream.error_response(e)
 
 @router.get("/orders/uuids")
 async def get_orders_by_id(
-    uuids: list[str] = None,
-    identifiers: list[str] = None,
+    uuids: Optional[List[str]] = Query(None),
+    identifiers: Optional[List[str]] = Query(None),
     market: str = None,
     order_by: str = "desc"
 ):
     """
-    uuid 또는 identifier로 주문 리스트를 조회 (최대 100개)
+    uuid 또는 identifier로 주문 리스트를 조회
     
     Args:
-        uuids: 주문 UUID의 목록 (최대 100개)
-        identifiers: 주문 identifier의 목록 (최대 100개)
+        uuids: 주문 UUID의 목록
+        identifiers: 주문 identifier의 목록
         market: 마켓 ID
-        order_by: 정렬 방식 (asc/desc, default: desc)
+        order_by: 정렬 방식 (asc/desc, default: desc) - 목록이 100개를 넘으면 입력 순서로 응답
         
     Note:
         - uuids 또는 identifiers 중 한 가지 필드는 필수
         - 두 가지 필드를 함께 사용할 수 없음
+        - 업비트 한도(100개)를 넘는 목록은 100개씩 나눠 요청 수 제한 안에서 동시에 조회 후 합친다
     """
-    if not uuids and not identifiers:
-        raise HTTPException(
-            status_code=400, 
-            detail="uuids 또는 identifiers 중 하나는 필수입니다"
-        )
-    if uuids and identifiers:
-        raise HTTPException(
-            status_code=400, 
-            detail="uuids와 identifiers는 동시에 사용할 수 없습니다"
-        )
+    field, ids = split_ids(uuids, identifiers)
         
     try:
-        query = []
-        if market:
-            query.append(f"market={market}")
-        if uuids:
-            for uuid in uuids:
-                query.append(f"uuids[]={uuid}")
-        if identifiers:
-            for identifier in identifiers:
-                query.append(f"identifiers[]={identifier}")
-        if order_by:
-            query.append(f"order_by={order_by}")
-            
-        payload = {
-            'access_key': ACCESS_KEY,
-            'nonce': str(uuid.uuid4()),
-            'query': "&".join(query)
-        }
-        
-        jwt_token = encode(payload, SECRET_KEY)
-        headers = {"Authorization": f"Bearer {jwt_token}"}
-        
-        params = {'order_by': order_by}
-        if market:
-            params['market'] = market
-        if uuids:
-            params['uuids[]'] = uuids
-        if identifiers:
-            params['identifiers[]'] = identifiers
-            
-        response = requests.get(
-            f"{UPBIT_API_URL}/orders/uuids",
-            params=params,
-            headers=headers
-        )
-        response.raise_for_status()
-        
-        return response.json()
+        base = [('market', market)] if market else []
+        chunks = [ids[i:i + LOOKUP_CHUNK] for i in range(0, len(ids), LOOKUP_CHUNK)]
+        results = await asyncio.gather(*(
+            signed_request(
+                "GET", "/orders/uuids",
+                base + [(f'{field}s[]', v) for v in chunk] + [('order_by', order_by)]
+            )
+            for chunk in chunks
+        ))
+        if len(results) == 1:
+            return results[0]
+
+        position = {v: i for i, v in enumerate(ids)}
+        orders = [order for result in results for order in result]
+        orders.sort(key=lambda o: position.get(o.get(field), len(ids)))
+        return orders
         
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise upstream.error_response(e)
 
 @router.get("/orders/open")
 async def get_open_orders(
@@ -343,14 +413,7 @@ async def get_open_orders(
         if order_by:
             query.append(f"order_by={order_by}")
             
-        payload = {
-            'access_key': ACCESS_KEY,
-            'nonce': str(uuid.uuid4()),
-            'query': "&".join(query)
-        }
-        
-        jwt_token = encode(payload, SECRET_KEY)
-        headers = {"Authorization": f"Bearer {jwt_token}"}
+        sign = signer(ACCESS_KEY, SECRET_KEY, "&".join(query))
         
         params = {
             'market': market,
@@ -364,17 +427,18 @@ async def get_open_orders(
             params['states[]'] = states
             params.pop('state', None)
             
-        response = requests.get(
+        response = await asyncio.to_thread(
+            upstream.get,
             f"{UPBIT_API_URL}/orders/open",
             params=params,
-            headers=headers
+            sign=sign
         )
         response.raise_for_status()
         
-        return response.json()
+        return upstream.decode(response)
         
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise upstream.error_response(e)
 
 @router.get("/orders/closed")
 async def get_closed_orders(
@@ -426,14 +490,7 @@ async def get_closed_orders(
         if order_by:
             query.append(f"order_by={order_by}")
             
-        payload = {
-            'access_key': ACCESS_KEY,
-            'nonce': str(uuid.uuid4()),
-            'query': "&".join(query)
-        }
-        
-        jwt_token = encode(payload, SECRET_KEY)
-        headers = {"Authorization": f"Bearer {jwt_token}"}
+        sign = signer(ACCESS_KEY, SECRET_KEY, "&".join(query))
         
         params = {
             'market': market,
@@ -450,17 +507,18 @@ async def get_closed_orders(
         if end_time:
             params['end_time'] = end_time
             
-        response = requests.get(
+        response = await asyncio.to_thread(
+            upstream.get,
             f"{UPBIT_API_URL}/orders/closed",
             params=params,
-            headers=headers
+            sign=sign
         )
         response.raise_for_status()
         
-        return response.json()
+        return upstream.decode(response)
         
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise upstream.error_response(e)
 
 @router.delete("/order")
 async def cancel_order(uuid: str = None, identifier: str = None):
@@ -503,24 +561,27 @@ async def cancel_order(uuid: str = None, identifier: str = None):
             
         payload = {
             'access_key': ACCESS_KEY,
-            'nonce': str(uuid.uuid4()),
+            'nonce': str(uuid4()),
             'query': "&".join(query)
         }
         
         jwt_token = encode(payload, SECRET_KEY)
         headers = {"Authorization": f"Bearer {jwt_token}"}
         
-        response = requests.delete(
+        response = await asyncio.to_thread(
+            upstream.delete,
             f"{UPBIT_API_URL}/order",
             params={'uuid': uuid} if uuid else {'identifier': identifier},
             headers=headers
         )
         response.raise_for_status()
+        chance_cache.invalidate()
+        get_tracker().poke()
         
-        return response.json()
+        return upstream.decode(response)
         
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise upstream.error_response(e)
 
 @router.delete("/orders/open")
 async def cancel_orders(
@@ -571,7 +632,7 @@ async def cancel_orders(
             
         payload = {
             'access_key': ACCESS_KEY,
-            'nonce': str(uuid.uuid4()),
+            'nonce': str(uuid4()),
             'query': "&".join(query)
         }
         
@@ -591,88 +652,247 @@ async def cancel_orders(
         if quote_currencies:
             params['quote_currencies'] = quote_currencies
             
-        response = requests.delete(
+        response = await asyncio.to_thread(
+            upstream.delete,
             f"{UPBIT_API_URL}/orders/open",
             params=params,
             headers=headers
         )
         response.raise_for_status()
+        chance_cache.invalidate()
+        get_tracker().poke()
         
-        return response.json()
+        return upstream.decode(response)
         
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise upstream.error_response(e)
+
+# 일괄 취소 스트림: 페이지당 조회 개수, 라운드별 최대 페이지 수, 최대 라운드 수
+OPEN_ORDERS_PAGE = 100
+MAX_OPEN_ORDER_PAGES = 100
+MAX_CANCEL_ROUNDS = 50
+STREAM_FORMATS = ("ndjson", "sse")
+
+@router.delete("/orders/open/stream")
+async def cancel_orders_stream(
+    cancel_side: str = "all",
+    pairs: str = None,
+    excluded_pairs: str = None,
+    quote_currencies: str = None,
+    format: str = "ndjson"
+):
+    """
+    체결 대기 주문 일괄 취소 (주문별 결과 스트리밍)
+    
+    Args:
+        cancel_side: 주문 종류 (all: 매수/매도 전체, ask: 매도, bid: 매수)
+        pairs: 취소할 종목 리스트 (ex. KRW-BTC,KRW-ETH) - 종목별로 동시에 조회/취소
+        excluded_pairs: 취소에서 제외할 종목 리스트
+        quote_currencies: 취소할 거래 화폐 리스트 (ex. KRW,BTC,USDT)
+        format: ndjson (한 줄에 JSON 하나) 또는 sse (Server-Sent Events)
+        
+    Returns:
+        취소 결과가 나오는 대로 전송
+            - {"type": "order", "uuid", "market", "side", "result": "success" | "failed", "error"}
+            - {"type": "summary", "requested", "success", "failed", "rounds", "elapsed_ms"} (마지막)
+        
+    Note:
+        - 라운드마다 미체결 주문 전체를 100개씩 페이지로 조회(pairs 지정 시 종목 조건은 업비트에 전달)한 뒤
+          종목/매수·매도별 20개 묶음으로 주문 요청 수 제한(order 그룹) 안에서 동시에 취소하고,
+          전체 목록에 취소 대상이 남지 않을 때까지 반복한다
+        - 매수/매도, 거래 화폐, 제외 종목 조건은 업비트가 지원하지 않아 조회 후 걸러낸다
+        - 취소에 실패한 주문(응답에 결과가 없는 주문 포함)은 다시 시도하지 않는다
+        - DELETE /orders/open 과 달리 개수 제한(300개)이 없다
+    """
+    if pairs and quote_currencies:
+        raise HTTPException(
+            status_code=400, 
+            detail="pairs와 quote_currencies는 동시에 사용할 수 없습니다"
+        )
+    if cancel_side not in ("all", "ask", "bid"):
+        raise HTTPException(status_code=400, detail="cancel_side는 all, ask, bid 중 하나여야 합니다")
+    if format not in STREAM_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format은 {', '.join(STREAM_FORMATS)} 중 하나여야 합니다")
+
+    markets = [p.strip() for p in pairs.split(",") if p.strip()] if pairs else [None]
+    excluded = {p.strip() for p in excluded_pairs.split(",")} if excluded_pairs else set()
+    quotes = tuple(f"{q.strip()}-" for q in quote_currencies.split(",")) if quote_currencies else None
+
+    def wanted(order: Dict) -> bool:
+        if cancel_side != "all" and order['side'] != cancel_side:
+            return False
+        if order['market'] in excluded:
+            return False
+        return quotes is None or order['market'].startswith(quotes)
+
+    async def encoded():
+        async for event in bulk_cancel(markets, wanted):
+            if format == "sse":
+                yield b"event: %s\ndata: %s\n\n" % (event['type'].encode(), jsonutil.dumps(event))
+            else:
+                yield jsonutil.dumps(event) + b"\n"
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(encoded(), media_type=media_type)
+
+async def list_open_orders(market: Optional[str]) -> List[Dict]:
+    """
+    체결 대기 주문 전체 (market 없으면 전체 종목)
+
+    페이지가 limit 보다 적게 오면 마지막 페이지로 보고 멈춘다 (최대 MAX_OPEN_ORDER_PAGES 페이지)
+    """
+    orders = []
+    for page in range(1, MAX_OPEN_ORDER_PAGES + 1):
+        params = [('market', market)] if market else []
+        params += [('state', 'wait'), ('page', page), ('limit', OPEN_ORDERS_PAGE), ('order_by', 'desc')]
+        rows = await signed_request("GET", "/orders/open", params)
+        orders.extend(rows)
+        if len(rows) < OPEN_ORDERS_PAGE:
+            break
+    return orders
+
+async def cancel_chunk(orders: List[Dict]) -> List[Dict]:
+    """주문 묶음(최대 20개) 취소 후 주문별 결과 이벤트"""
+    info = {o['uuid']: o for o in orders}
+
+    def event(uuid_: str, result: str, error: Optional[str] = None) -> Dict:
+        order = info.get(uuid_, {})
+        item = {'type': 'order', 'uuid': uuid_, 'market': order.get('market'),
+                'side': order.get('side'), 'result': result}
+        if error:
+            item['error'] = error
+        return item
+
+    try:
+        result = await signed_request(
+            "DELETE", "/orders/uuids", [('uuids[]', u) for u in info], group="order"
+        )
+    except Exception as e:
+        return [event(u, 'failed', str(e)) for u in info]
+    events = [event(o['uuid'], 'success') for o in result.get('success', {}).get('orders', [])]
+    events += [event(o['uuid'], 'failed') for o in result.get('failed', {}).get('orders', [])]
+    answered = {e['uuid'] for e in events}
+    events += [event(u, 'failed', "취소 응답에 결과가 없습니다") for u in info if u not in answered]
+    return events
+
+async def bulk_cancel(markets: List[Optional[str]], wanted) -> AsyncIterator[Dict]:
+    """
+    체결 대기 주문 일괄 취소 이벤트 (주문별 결과, 마지막에 요약)
+
+    Args:
+        markets: 조회할 종목 목록 ([None]: 전체 종목 한 번에 조회)
+        wanted: 취소 대상 여부 (주문 -> bool)
+    """
+    start = time.perf_counter()
+    attempted = set()
+    counts = {'success': 0, 'failed': 0}
+    rounds = 0
+    error = None
+    try:
+        while rounds < MAX_CANCEL_ROUNDS:
+            # 전체 목록을 먼저 받은 뒤 취소하므로 취소로 페이지가 밀리지 않는다
+            listings = await asyncio.gather(*(list_open_orders(m) for m in markets))
+            # 조회 중 새 주문이 들어와 페이지가 밀리면 같은 주문이 두 번 나올 수 있다
+            targets = list({
+                o['uuid']: o for orders in listings for o in orders if o['uuid'] not in attempted and wanted(o)
+            }.values())
+            if not targets:
+                break
+            rounds += 1
+            groups: Dict[Tuple[str, str], List[Dict]] = {}
+            for order in targets:
+                attempted.add(order['uuid'])
+                groups.setdefault((order['market'], order['side']), []).append(order)
+            tasks = [
+                asyncio.ensure_future(cancel_chunk(group[i:i + CANCEL_CHUNK]))
+                for group in groups.values()
+                for i in range(0, len(group), CANCEL_CHUNK)
+            ]
+            for done in asyncio.as_completed(tasks):
+                for event in await done:
+                    counts[event['result']] += 1
+                    yield event
+    except Exception as e:
+        error = str(e)
+    chance_cache.invalidate()
+    get_tracker().poke()
+    summary = {
+        'type': 'summary',
+        'requested': len(attempted),
+        'success': counts['success'],
+        'failed': counts['failed'],
+        'rounds': rounds,
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 1),
+    }
+    if error:
+        summary['error'] = error
+    yield summary
 
 @router.delete("/orders/uuids")
 async def cancel_orders_by_id(
-    uuids: list[str] = None,
-    identifiers: list[str] = None
+    uuids: Optional[List[str]] = Query(None),
+    identifiers: Optional[List[str]] = Query(None)
 ):
     """
     uuid 또는 identifiers로 다수의 주문을 취소
     
     Args:
-        uuids: 취소할 주문 UUID의 목록 (최대 20개)
-        identifiers: 취소할 주문 identifier의 목록 (최대 20개)
+        uuids: 취소할 주문 UUID의 목록
+        identifiers: 취소할 주문 identifier의 목록
         
     Note:
         - uuids 또는 identifiers 중 한 가지 필드는 필수
         - 두 가지 필드를 함께 사용할 수 없음
+        - 업비트 한도(20개)를 넘는 목록은 20개씩 나눠 주문 요청 수 제한(order 그룹) 안에서 동시에 취소한다
+        - 호출 자체가 실패한 묶음의 주문은 failed 에 error 와 함께 포함된다
         
     Returns:
         success:
             - count: 취소 요청 성공한 주문의 개수
-            - orders: 취소 요청 성공한 주문 정보 (uuid, market, identifier)
+            - orders: 취소 요청 성공한 주문 정보 (uuid, market, identifier) - 입력 순서
         failed:
             - count: 취소 요청 실패한 주문의 개수
-            - orders: 취소 요청 실패한 주문 정보 (uuid, market, identifier)
+            - orders: 취소 요청 실패한 주문 정보 (uuid, market, identifier) - 입력 순서
     """
-    if not uuids and not identifiers:
-        raise HTTPException(
-            status_code=400, 
-            detail="uuids 또는 identifiers 중 하나는 필수입니다"
-        )
-    if uuids and identifiers:
-        raise HTTPException(
-            status_code=400, 
-            detail="uuids와 identifiers는 동시에 사용할 수 없습니다"
-        )
+    field, ids = split_ids(uuids, identifiers)
             
     try:
-        query = []
-        if uuids:
-            for uuid in uuids:
-                query.append(f"uuids[]={uuid}")
-        if identifiers:
-            for identifier in identifiers:
-                query.append(f"identifiers[]={identifier}")
-            
-        payload = {
-            'access_key': ACCESS_KEY,
-            'nonce': str(uuid.uuid4()),
-            'query': "&".join(query)
-        }
-        
-        jwt_token = encode(payload, SECRET_KEY)
-        headers = {"Authorization": f"Bearer {jwt_token}"}
-        
-        params = {}
-        if uuids:
-            params['uuids[]'] = uuids
-        if identifiers:
-            params['identifiers[]'] = identifiers
-            
-        response = requests.delete(
-            f"{UPBIT_API_URL}/orders/uuids",
-            params=params,
-            headers=headers
-        )
-        response.raise_for_status()
-        
-        return response.json()
+        chunks = [ids[i:i + CANCEL_CHUNK] for i in range(0, len(ids), CANCEL_CHUNK)]
+        results = await asyncio.gather(*(
+            signed_request("DELETE", "/orders/uuids", [(f'{field}s[]', v) for v in chunk], group="order")
+            for chunk in chunks
+        ), return_exceptions=True)
+        chance_cache.invalidate()
+        get_tracker().poke()
+        if len(results) == 1 and not isinstance(results[0], Exception):
+            return results[0]
+        return merge_cancel_results(field, ids, chunks, results)
         
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise upstream.error_response(e)
+
+def merge_cancel_results(field: str, ids: List[str], chunks: List[List[str]], results: List) -> Dict:
+    """묶음별 취소 결과를 입력 순서로 합침 (호출이 실패한 묶음은 모두 failed)"""
+    if all(isinstance(r, Exception) for r in results):
+        raise results[0]
+    success, failed = [], []
+    for chunk, result in zip(chunks, results):
+        if isinstance(result, Exception):
+            failed += [{field: v, 'error': str(result)} for v in chunk]
+        else:
+            success += result.get('success', {}).get('orders', [])
+            failed += result.get('failed', {}).get('orders', [])
+    position = {v: i for i, v in enumerate(ids)}
+
+    def input_order(o):
+        return position.get(o.get(field), len(ids))
+
+    success.sort(key=input_order)
+    failed.sort(key=input_order)
+    return {
+        'success': {'count': len(success), 'orders': success},
+        'failed': {'count': len(failed), 'orders': failed},
+    }
 
 @router.post("/orders")
 async def create_order(order: OrderRequest):
@@ -701,8 +921,18 @@ async def create_order(order: OrderRequest):
         - 시장가 매수 시: ord_type=price, volume 생략, price 필수
         - 시장가 매도 시: ord_type=market, volume 필수, price 생략
         - 시장가 주문은 IOC, FOK를 지원하지 않음
+        - 주문 가능 정보(최소 주문 금액, 주문 타입, 잔고 등)로 미리 검증해 거부될 주문은 업비트 호출 없이 400 (ORDER_VALIDATION)
+        - 주문 가능 정보는 캐시된 값만 사용한다. 캐시에 없으면 주문 가능 정보가 필요 없는 검사만 하고 보내며,
+          주문 가능 정보는 백그라운드로 조회한다. 접수 후에는 응답의 locked 를 캐시된 잔고에 반영한다
+        - 단계별 처리 시간은 GET /orders/latency, upbit_order_latency_seconds 메트릭으로 확인
     """
+    timeline = order_latency.start(order.market, order.side, order.ord_type)
     try:
+        if settings.order_validation:
+            validate_price_unit(order)
+            validate_order(order, cached_order_chance(order.market) or {})
+        timeline.mark("validated")
+        
         query = [
             f"market={order.market}",
             f"side={order.side}",
@@ -720,12 +950,13 @@ async def create_order(order: OrderRequest):
             
         payload = {
             'access_key': ACCESS_KEY,
-            'nonce': str(uuid.uuid4()),
+            'nonce': str(uuid4()),
             'query': "&".join(query)
         }
         
         jwt_token = encode(payload, SECRET_KEY)
         headers = {"Authorization": f"Bearer {jwt_token}"}
+        timeline.mark("signed")
         
         params = {
             'market': order.market,
@@ -742,17 +973,93 @@ async def create_order(order: OrderRequest):
         if order.time_in_force:
             params['time_in_force'] = order.time_in_force
             
-        response = requests.post(
+        await ratelimit.acquire("order")
+        timeline.mark("sent")
+        response = await asyncio.to_thread(
+            upstream.post,
             f"{UPBIT_API_URL}/orders",
             params=params,
             headers=headers
         )
+        acked_at = time.perf_counter()
         response.raise_for_status()
+        timeline.mark("acked", acked_at)
+        
+        get_tracker().poke()
         
-        return response.json()
+        result = upstream.decode(response)
+        apply_order_to_chance(order, result)
+        order_latency.acked(timeline, result)
+        return result
+        
+    except Exception as e:
+        order_latency.failed(timeline, e)
+        raise upstream.error_response(e)
+
+@router.post("/orders/price_units")
+async def round_prices(request: PriceUnitRequest):
+    """
+    가격 목록을 호가 단위에 맞춤 (사다리/그리드 주문 가격 계산용, 업비트 호출 없음)
+    
+    Args:
+        market: 마켓 ID (KRW, BTC, USDT 마켓)
+        prices: 가격 목록
+        mode: 맞추는 방식
+            - down: 내림 (매수 가격)
+            - up: 올림 (매도 가격)
+            - nearest: 반올림
+            
+    Returns:
+        - prices: 호가 단위에 맞춘 가격 (0 이하 가격은 null)
+        - price_units: 가격별 호가 단위
+        - changed: 원래 가격과 달라진 가격 수
+    """
+    from app.trading.ticksize import table_for  # 사용 시에만 로드 (NumPy)
+    import numpy as np
+
+    try:
+        table = table_for(request.market)
+        if table is None:
+            raise ValueError(f"호가 단위 표가 없는 마켓입니다: {request.market}")
+        prices = np.asarray(request.prices, dtype=float)
+        rounded = table.round_array(prices, request.mode)
+        valid = ~np.isnan(rounded)
+        return {
+            'market': request.market,
+            'mode': request.mode,
+            'prices': np.where(valid, rounded, None).tolist(),
+            'price_units': table.units_array(prices).tolist(),
+            'changed': int(np.count_nonzero(valid & (rounded != prices))),
+        }
         
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise upstream.error_response(e)
+
+@router.get("/orders/latency")
+async def get_order_latency(uuid: str = None, market: str = None, limit: int = Query(100, ge=1, le=1000)):
+    """
+    주문 단계별 처리 시간 조회 (이 워커에서 받은 주문만)
+    
+    Args:
+        uuid: 주문 UUID (지정하면 해당 주문만)
+        market: 마켓 ID
+        limit: 최근 주문 개수 (최신순)
+        
+    Returns:
+        - state: 마지막으로 확인한 주문 상태 (error: 접수 실패)
+        - elapsed_ms: 주문 요청 수신 후 단계별 경과 시간
+            (signed, sent, acked, first_fill, final)
+        - pending: 체결 확인 중인 주문 수
+    """
+    if uuid:
+        timeline = order_latency.get(uuid)
+        if timeline is None:
+            raise HTTPException(status_code=404, detail="처리 시간 기록이 없는 주문입니다")
+        return timeline.to_dict()
+    return {
+        'pending': len(order_latency.pending),
+        'orders': [t.to_dict() for t in order_latency.recent(limit, market)],
+    }
 
 @router.post("/orders/cancel_and_new")
 async def cancel_and_new_order(order: CancelAndNewOrderRequest):
@@ -807,7 +1114,7 @@ async def cancel_and_new_order(order: CancelAndNewOrderRequest):
             
         payload = {
             'access_key': ACCESS_KEY,
-            'nonce': str(uuid.uuid4()),
+            'nonce': str(uuid4()),
         }
         
         jwt_token = encode(payload, SECRET_KEY)
@@ -816,14 +1123,36 @@ async def cancel_and_new_order(order: CancelAndNewOrderRequest):
             "Content-Type": "application/json"
         }
             
-        response = requests.post(
+        response = await asyncio.to_thread(
+            upstream.post,
             f"{UPBIT_API_URL}/orders/cancel_and_new",
             json=data,
             headers=headers
         )
         response.raise_for_status()
+        chance_cache.invalidate()
+        get_tracker().poke()
         
-        return response.json()
+        return upstream.decode(response)
         
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e)) 
\ No newline at end of file
+        raise upstream.error_response(e)
+
+async def fetch_closed_orders(market: str = None, limit: int = 100):
+    """종료된 주문 리스트 조회 (내부용, 업비트 호출은 스레드에서 실행)"""
+    def load():
+        query = []
+        if market:
+            query.append(f"market={market}")
+        query += ["states[]=done", "states[]=cancel", f"limit={limit}", "order_by=desc"]
+        params = {'market': market} if market else {}
+        params.update({'states[]': ['done', 'cancel'], 'limit': limit, 'order_by': 'desc'})
+        response = upstream.get(
+            f"{UPBIT_API_URL}/orders/closed",
+            params=params,
+            sign=signer(ACCESS_KEY, SECRET_KEY, "&".join(query))
+        )
+        response.raise_for_status()
+        return upstream.decode(response)
+
+    return await asyncio.to_thread(load)
@@ -1,12 +1,11 @@
 from fastapi import APIRouter, HTTPException
-import requests
-from jwt import encode
+from app.core import upstream
+from app.core.auth import encode, signer
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.trading.wallet import WalletStatus, get_wallets
+import asyncio
 import uuid
-import os
-from dotenv import load_dotenv
-
-# .env 파일 로드
-load_dotenv()
 
 router = APIRouter(
     prefix="/api/upbit",
@@ -14,14 +13,49 @@ router = APIRouter(
 )
 
 # Upbit API 설정
-UPBIT_API_URL = "https://api.upbit.com/v1"
-ACCESS_KEY = os.getenv('UPBIT_OPEN_API_ACCESS_KEY')
-SECRET_KEY = os.getenv('UPBIT_OPEN_API_SECRET_KEY')
+settings = get_settings()
+UPBIT_API_URL = settings.upbit_api_url
+ACCESS_KEY = settings.access_key
+SECRET_KEY = settings.secret_key
+
+# 스케줄러 결과가 없을 때 라우트에서 직접 조회한 입출금 현황 (동시 요청은 한 번만 호출)
+wallet_cache = TTLCache("wallet_status", settings.wallet_status_interval, maxsize=1)
+
+async def fetch_wallet_status():
+    """입출금 현황 조회 (내부용, 업비트 호출은 스레드에서 실행)"""
+    def sign():
+        payload = {
+            'access_key': ACCESS_KEY,
+            'nonce': str(uuid.uuid4()),
+        }
+        return {"Authorization": f"Bearer {encode(payload, SECRET_KEY)}"}
+
+    def load():
+        response = upstream.get(f"{UPBIT_API_URL}/status/wallet", sign=sign)
+        response.raise_for_status()
+        return upstream.decode(response)
+
+    return await asyncio.to_thread(load)
+
+async def current_wallets() -> WalletStatus:
+    """
+    입출금 현황 (메모리)
+
+    스케줄러 작업(wallet_status_sync) 결과를 쓰고, 결과가 없거나 WALLET_STATUS_MAX_AGE 보다
+    오래되었으면 업비트에서 직접 조회한다.
+    """
+    wallets = get_wallets()
+    wallets.sync_shared()
+    if wallets.age() > settings.wallet_status_max_age:
+        rows = await wallet_cache.get_or_load("all", fetch_wallet_status)
+        if rows is not wallets.rows:
+            wallets.update(rows, notify=False)
+    return wallets
 
 @router.get("/status/wallet")
 async def get_wallet_status():
     """
-    입출금 현황 조회
+    입출금 현황 조회 (스케줄러가 갱신한 현황, WALLET_STATUS_INTERVAL 간격)
     
     Returns:
         - currency: 화폐를 의미하는 영문 대문자 코드
@@ -39,24 +73,40 @@ async def get_wallet_status():
         - block_updated_at: 블록 갱신 시각
     """
     try:
-        payload = {
-            'access_key': ACCESS_KEY,
-            'nonce': str(uuid.uuid4()),
-        }
-        
-        jwt_token = encode(payload, SECRET_KEY)
-        headers = {"Authorization": f"Bearer {jwt_token}"}
+        return (await current_wallets()).rows
         
-        response = requests.get(
-            f"{UPBIT_API_URL}/status/wallet",
-            headers=headers
-        )
-        response.raise_for_status()
+    except Exception as e:
+        raise upstream.error_response(e)
+
+@router.get("/status/wallet/{currency}")
+async def get_currency_wallet_status(currency: str):
+    """
+    화폐별 입출금 현황 조회 (메모리에서 응답)
+    
+    Args:
+        currency: Currency 코드 (ex. BTC)
         
-        return response.json()
+    Returns:
+        - currency: 화폐 코드
+        - updated_at: 현황 갱신 시각 (Unix timestamp)
+        - can_withdraw / can_deposit: 하나 이상의 네트워크에서 출금/입금 가능 여부
+        - wallets: 네트워크별 현황 (/status/wallet 항목)
+    """
+    try:
+        wallets = await current_wallets()
+        rows = wallets.get(currency)
+        if rows is None:
+            raise HTTPException(status_code=404, detail=f"입출금 현황에 없는 화폐입니다: {currency}")
+        return {
+            'currency': currency.upper(),
+            'updated_at': wallets.updated_at,
+            'can_withdraw': wallets.can_withdraw(currency),
+            'can_deposit': wallets.can_deposit(currency),
+            'wallets': rows,
+        }
         
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise upstream.error_response(e)
 
 @router.get("/api_keys")
 async def get_api_keys():
@@ -68,21 +118,16 @@ async def get_api_keys():
         - expire_at: 만료 시간 (ISO8601 형식)
     """
     try:
-        payload = {
-            'access_key': ACCESS_KEY,
-            'nonce': str(uuid.uuid4()),
-        }
-        
-        jwt_token = encode(payload, SECRET_KEY)
-        headers = {"Authorization": f"Bearer {jwt_token}"}
+        sign = signer(ACCESS_KEY, SECRET_KEY)
         
-        response = requests.get(
+        response = await asyncio.to_thread(
+            upstream.get,
             f"{UPBIT_API_URL}/api_keys",
-            headers=headers
+            sign=sign
         )
         response.raise_for_status()
         
-        return response.json()
+        return upstream.decode(response)
         
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e)) 
\ No newline at end of file
+        raise upstream.error_response(e) 
\ No newline at end of file
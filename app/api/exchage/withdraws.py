@@ -1,24 +1,25 @@
 from fastapi import APIRouter, HTTPException
-import requests
-from jwt import encode
+from app.core import upstream
+from app.core.auth import encode, signer
+from app.core.config import get_settings
+from app.trading.balances import get_tracker
+from app.trading.transfers import cached_get, get_transfer_cache
+from app.trading.wallet import get_wallets
+import asyncio
 import uuid
-import os
-from dotenv import load_dotenv
 from typing import Optional, List
 from pydantic import BaseModel
 
-# .env 파일 로드
-load_dotenv()
-
 router = APIRouter(
     prefix="/api/upbit",
     tags=["3. Withdraws"]
 )
 
 # Upbit API 설정
-UPBIT_API_URL = "https://api.upbit.com/v1"
-ACCESS_KEY = os.getenv('UPBIT_OPEN_API_ACCESS_KEY')
-SECRET_KEY = os.getenv('UPBIT_OPEN_API_SECRET_KEY')
+settings = get_settings()
+UPBIT_API_URL = settings.upbit_api_url
+ACCESS_KEY = settings.access_key
+SECRET_KEY = settings.secret_key
 
 class WithdrawRequest(BaseModel):
     amount: str
@@ -94,14 +95,7 @@ async def get_withdraws(
         if order_by:
             query.append(f"order_by={order_by}")
             
-        payload = {
-            'access_key': ACCESS_KEY,
-            'nonce': str(uuid.uuid4()),
-            'query': "&".join(query)
-        }
-        
-        jwt_token = encode(payload, SECRET_KEY)
-        headers = {"Authorization": f"Bearer {jwt_token}"}
+        sign = signer(ACCESS_KEY, SECRET_KEY, "&".join(query))
         
         params = {
             'currency': currency,
@@ -116,17 +110,18 @@ async def get_withdraws(
         if txids:
             params['txids[]'] = txids
             
-        response = requests.get(
+        response = await asyncio.to_thread(
+            upstream.get,
             f"{UPBIT_API_URL}/withdraws",
             params=params,
-            headers=headers
+            sign=sign
         )
         response.raise_for_status()
         
-        return response.json()
+        return upstream.decode(response)
         
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise upstream.error_response(e)
 
 @router.get("/withdraw")
 async def get_withdraw(
@@ -172,14 +167,7 @@ async def get_withdraw(
         if currency:
             query.append(f"currency={currency}")
             
-        payload = {
-            'access_key': ACCESS_KEY,
-            'nonce': str(uuid.uuid4()),
-            'query': "&".join(query)
-        }
-        
-        jwt_token = encode(payload, SECRET_KEY)
-        headers = {"Authorization": f"Bearer {jwt_token}"}
+        sign = signer(ACCESS_KEY, SECRET_KEY, "&".join(query))
         
         params = {}
         if is_txid:
@@ -189,17 +177,18 @@ async def get_withdraw(
         if currency:
             params['currency'] = currency
             
-        response = requests.get(
+        response = await asyncio.to_thread(
+            upstream.get,
             f"{UPBIT_API_URL}/withdraw",
             params=params,
-            headers=headers
+            sign=sign
         )
         response.raise_for_status()
         
-        return response.json()
+        return upstream.decode(response)
         
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise upstream.error_response(e)
 
 @router.get("/withdraws/chance")
 async def get_withdraw_chance(currency: str):
@@ -214,29 +203,16 @@ async def get_withdraw_chance(currency: str):
         - currency: 화폐 정보
         - account: 사용자의 계좌 정보
         - withdraw_limit: 출금 제한 정보
+            
+    Note:
+        - 10초 동안 캐시하며 (TRANSFER_CACHE_TTLS), 출금 요청 후에는 다시 조회한다
     """
     try:
-        query = f"currency={currency}"
-        payload = {
-            'access_key': ACCESS_KEY,
-            'nonce': str(uuid.uuid4()),
-            'query': query
-        }
-        
-        jwt_token = encode(payload, SECRET_KEY)
-        headers = {"Authorization": f"Bearer {jwt_token}"}
-        
-        response = requests.get(
-            f"{UPBIT_API_URL}/withdraws/chance",
-            params={'currency': currency},
-            headers=headers
-        )
-        response.raise_for_status()
-        
-        return response.json()
+        currency = currency.upper()
+        return await cached_get("withdraw_chance", "/withdraws/chance", {'currency': currency}, key=currency)
         
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise upstream.error_response(e)
 
 @router.get("/withdraws/withdraw_addresses")
 async def get_withdraw_addresses(currency: str = None):
@@ -251,32 +227,17 @@ async def get_withdraw_addresses(currency: str = None):
         - net_type: 출금 네트워크
         - address: 출금 주소
         - secondary_address: 2차 출금 주소
+            
+    Note:
+        - 5분 동안 캐시 (TRANSFER_CACHE_TTLS)
     """
     try:
-        query = []
-        if currency:
-            query.append(f"currency={currency}")
-            
-        payload = {
-            'access_key': ACCESS_KEY,
-            'nonce': str(uuid.uuid4()),
-            'query': "&".join(query)
-        }
-        
-        jwt_token = encode(payload, SECRET_KEY)
-        headers = {"Authorization": f"Bearer {jwt_token}"}
-        
-        response = requests.get(
-            f"{UPBIT_API_URL}/withdraws/withdraw_addresses",
-            params={'currency': currency} if currency else None,
-            headers=headers
-        )
-        response.raise_for_status()
-        
-        return response.json()
+        currency = currency.upper() if currency else None
+        params = {'currency': currency} if currency else None
+        return await cached_get("withdraw_addresses", "/withdraws/withdraw_addresses", params, key=currency)
         
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise upstream.error_response(e)
 
 @router.post("/withdraws/coin")
 async def withdraw_coin(withdraw: WithdrawRequest):
@@ -289,8 +250,19 @@ async def withdraw_coin(withdraw: WithdrawRequest):
         net_type: 출금 네트워크
         secondary_address: 2차 출금 주소 (필요한 경우)
         transaction_type: 출금 유형 (default: 일반출금, internal: 바로출금)
+            
+    Note:
+        - 입출금 현황(메모리)에서 출금이 중단된 화폐/네트워크는 업비트 호출 없이 400
     """
     try:
+        wallets = get_wallets()
+        wallets.sync_shared()
+        if wallets.can_withdraw(withdraw.currency, withdraw.net_type) is False:
+            raise HTTPException(
+                status_code=400,
+                detail=f"{withdraw.currency} 출금이 중단된 상태입니다 (입출금 현황 기준)"
+            )
+        
         data = {
             'amount': withdraw.amount,
             'currency': withdraw.currency,
@@ -312,17 +284,20 @@ async def withdraw_coin(withdraw: WithdrawRequest):
             "Content-Type": "application/json"
         }
         
-        response = requests.post(
+        response = await asyncio.to_thread(
+            upstream.post,
             f"{UPBIT_API_URL}/withdraws/coin",
             json=data,
             headers=headers
         )
         response.raise_for_status()
+        get_transfer_cache().invalidate("withdraw_chance", withdraw.currency.upper())
+        get_tracker().poke()
         
-        return response.json()
+        return upstream.decode(response)
         
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise upstream.error_response(e)
 
 @router.post("/withdraws/krw")
 async def withdraw_krw(withdraw: KRWWithdrawRequest):
@@ -354,14 +329,17 @@ async def withdraw_krw(withdraw: KRWWithdrawRequest):
             "Content-Type": "application/json"
         }
         
-        response = requests.post(
+        response = await asyncio.to_thread(
+            upstream.post,
             f"{UPBIT_API_URL}/withdraws/krw",
             json=data,
             headers=headers
         )
         response.raise_for_status()
+        get_transfer_cache().invalidate("withdraw_chance", "KRW")
+        get_tracker().poke()
         
-        return response.json()
+        return upstream.decode(response)
         
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e)) 
\ No newline at end of file
+        raise upstream.error_response(e) 
\ No newline at end of file
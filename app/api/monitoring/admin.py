@@ -0,0 +1,110 @@
+from fastapi import APIRouter, HTTPException, Header, Query, Request
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+from datetime import datetime
+import asyncio
+from app.core.cache import cache_stats
+from app.core.config import get_settings
+from app.core.tracing import recent_traces
+from app.core.profiler import SamplingProfiler
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["7. Monitoring"]
+)
+
+# 설정 시 X-Admin-Token 헤더 필수, 미설정 시 로컬(루프백) 요청만 허용
+ADMIN_TOKEN = get_settings().admin_token
+LOCAL_HOSTS = ("127.0.0.1", "::1", "localhost")
+
+_profile_lock = asyncio.Lock()
+
+def check_admin_token(request: Request, token: Optional[str]):
+    if ADMIN_TOKEN:
+        if token != ADMIN_TOKEN:
+            raise HTTPException(status_code=403, detail="관리자 토큰이 올바르지 않습니다")
+        return
+    host = request.client.host if request.client else None
+    if host not in LOCAL_HOSTS:
+        raise HTTPException(status_code=403, detail="ADMIN_TOKEN 을 설정하지 않으면 로컬에서만 접근할 수 있습니다")
+
+@router.get("/traces")
+async def get_traces(
+    request: Request,
+    limit: int = 50,
+    min_duration_ms: float = 0.0,
+    x_admin_token: Optional[str] = Header(None)
+):
+    """
+    최근 트레이스 조회
+
+    Args:
+        limit: 조회 개수 (default: 50)
+        min_duration_ms: 최소 처리 시간 (ms) - 느린 요청만 조회할 때 사용
+
+    Returns:
+        트레이스 목록 (트레이스별 스팬 목록, 마지막 스팬이 루트)
+        - name: 스팬 이름 (request / sign / upstream / decode ...)
+        - duration_ms: 소요 시간
+        - parent_id: 부모 스팬 ID
+        - attributes: 스팬 속성
+    """
+    check_admin_token(request, x_admin_token)
+    return recent_traces(limit, min_duration_ms)
+
+@router.get("/caches")
+async def get_caches(request: Request, x_admin_token: Optional[str] = Header(None)):
+    """
+    캐시별 통계 조회 (이 워커 기준)
+
+    Returns:
+        캐시 목록
+        - name / ttl / stale_ttl: 캐시 이름, 유효 시간, 장애 시 만료 값 응답 허용 시간 (초)
+        - hit / miss: 적중/미적중 수
+        - stale / error: 갱신 실패 시 만료 값 응답 수, 오류 전달 수
+        - invalidate: 명시적 삭제 수 (주문/출금 후 등)
+        - size / expired / max_age: 항목 수, 만료 항목 수, 가장 오래된 항목 나이 (초)
+    """
+    check_admin_token(request, x_admin_token)
+    return cache_stats()
+
+@router.post("/profile")
+async def run_profile(
+    request: Request,
+    seconds: float = Query(10.0, gt=0, le=60),
+    interval_ms: float = Query(5.0, ge=1, le=1000),
+    x_admin_token: Optional[str] = Header(None)
+):
+    """
+    샘플링 프로파일러 실행 후 플레임 그래프 다운로드
+
+    Args:
+        seconds: 프로파일링 시간 (최대 60초)
+        interval_ms: 샘플링 간격 (ms, 1 ~ 1000, default: 5)
+
+    Returns:
+        collapsed stack(folded) 포맷 파일 - flamegraph.pl 또는 speedscope.app 에서 열람
+
+    Note:
+        - 동시에 하나의 프로파일링만 실행 가능
+    """
+    check_admin_token(request, x_admin_token)
+    if _profile_lock.locked():
+        raise HTTPException(status_code=409, detail="이미 프로파일링이 실행 중입니다")
+
+    async with _profile_lock:
+        profiler = SamplingProfiler(interval=interval_ms / 1000)
+        profiler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.stop()
+
+    filename = f"profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}.folded"
+    return PlainTextResponse(
+        profiler.folded(),
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Profile-Samples": str(profiler.sample_count),
+        }
+    )
@@ -0,0 +1,57 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+import asyncio
+from app.core import jsonutil, shared_state
+
+router = APIRouter(
+    prefix="/api/upbit",
+    tags=["7. Monitoring"]
+)
+
+# 스트림에서 공유 상태 변경을 확인하는 간격 (초)
+STREAM_POLL_INTERVAL = 1.0
+
+def read_alerts(since: int = 0):
+    result = shared_state.read("alerts")
+    if result is None:
+        return []
+    return [a for a in result["data"] if a["id"] > since]
+
+@router.get("/alerts")
+async def get_alerts(since: int = 0, limit: int = 100):
+    """
+    최근 알림 조회 (리더 워커의 알림 엔진이 기록한 결과)
+
+    Args:
+        since: 이 ID 이후의 알림만 조회 (default: 0)
+        limit: 최대 개수 (default: 100, 최신순으로 자름)
+
+    Returns:
+        - id: 알림 ID (증가)
+        - time: 발생 시각 (Unix timestamp)
+        - rule / event / market: 규칙 이름, 전이 종류, 마켓 코드
+        - caution: 주의 유형 (caution_on/off)
+        - price / prev_price / threshold: 현재가, 이전 가격, 돌파한 가격 (price_above/below)
+        - net_type / prev / state: 네트워크, 이전/현재 지갑 상태 (wallet_state/block_state)
+    """
+    if limit <= 0:
+        raise HTTPException(status_code=400, detail="limit 은 1 이상이어야 합니다")
+    return read_alerts(since)[-limit:]
+
+@router.get("/alerts/stream")
+async def stream_alerts(since: int = 0):
+    """
+    알림 구독 (Server-Sent Events)
+
+    Args:
+        since: 이 ID 이후의 알림부터 전송 (재연결 시 마지막으로 받은 ID)
+    """
+    async def events():
+        last_id = since
+        while True:
+            for alert in read_alerts(last_id):
+                last_id = alert["id"]
+                yield b"id: %d\ndata: %s\n\n" % (last_id, jsonutil.dumps(alert))
+            await asyncio.sleep(STREAM_POLL_INTERVAL)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
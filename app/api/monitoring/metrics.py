@@ -0,0 +1,22 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+from app.core.metrics import generate_latest, CONTENT_TYPE_LATEST
+
+router = APIRouter(
+    tags=["7. Monitoring"]
+)
+
+@router.get("/metrics")
+async def get_metrics():
+    """
+    Prometheus 메트릭 조회
+
+    Returns:
+        - upbit_http_requests_total / upbit_http_request_duration_seconds: 라우트별 요청 수, 지연시간
+        - upbit_upstream_requests_total / upbit_upstream_request_duration_seconds: 업비트 엔드포인트별 호출 수, 응답 시간
+        - upbit_ratelimit_remaining: 요청 그룹별 남은 요청 수
+        - upbit_cache_requests_total: 캐시 적중/미적중 수
+        - upbit_scheduler_job_duration_seconds / upbit_scheduler_job_runs_total: 스케줄러 작업 실행 시간, 결과
+        - upbit_scheduler_job_lag_seconds / upbit_scheduler_job_missed_total: 예정 시각 대비 지연, 실행하지 못한 횟수
+    """
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,71 @@
+from fastapi import APIRouter, HTTPException
+import os
+from app.api.schedule.scheduler import get_elector, get_job_stats, is_scheduler_running
+from app.core import shared_state
+
+router = APIRouter(
+    prefix="/api/upbit/scheduler",
+    tags=["8. Scheduler"]
+)
+
+@router.get("/leader")
+async def get_leader():
+    """
+    스케줄러 리더 조회
+
+    Returns:
+        - is_leader: 현재 워커가 리더인지 여부
+        - pid: 현재 워커 PID
+        - leader: 리더 정보 (pid, since)
+    """
+    elector = get_elector()
+    return {
+        "is_leader": elector.is_leader,
+        "pid": os.getpid(),
+        "leader": elector.leader_info(),
+    }
+
+@router.get("/jobs")
+async def get_jobs():
+    """
+    작업 목록 및 실행 통계 조회
+
+    스케줄러를 실행 중인 워커는 실시간 통계를, 그 외 워커는 리더가 공유한 통계(최대 1초 지연)를 반환한다.
+
+    Returns:
+        - pid: 통계를 기록한 워커 PID
+        - jobs: 작업별 설정 및 통계
+            - trigger / next_run_time: 실행 주기, 다음 실행 시각
+            - max_instances / coalesce / misfire_grace_time: 중복/밀린 실행 처리 설정
+            - stats.runs / errors: 성공/실패 횟수
+            - stats.missed: misfire_grace_time 초과로 실행하지 못한 횟수
+            - stats.skipped: 이전 실행이 끝나지 않아 건너뛴 횟수
+            - stats.*_duration_ms: 실행 시간 (최근/평균/최대)
+            - stats.*_lag_ms: 예정 시각 대비 시작 지연 (최근/최대)
+    """
+    if is_scheduler_running():
+        return {"pid": os.getpid(), "jobs": get_job_stats().snapshot()}
+    result = shared_state.read("scheduler_jobs")
+    if result is None:
+        raise HTTPException(status_code=404, detail="아직 작업 통계가 없습니다")
+    return {"pid": result["pid"], "jobs": result["data"]}
+
+@router.get("/results/{job_id}")
+async def get_job_result(job_id: str):
+    """
+    작업 결과 조회 (리더 워커가 실행한 결과를 모든 워커에서 동일하게 제공)
+
+    Args:
+        job_id: 작업 ID (ex. market_monitor)
+
+    Returns:
+        - updated_at: 결과 갱신 시각 (Unix timestamp)
+        - pid: 결과를 기록한 워커 PID
+        - data: 작업 결과
+    """
+    if not job_id.replace("_", "").isalnum():
+        raise HTTPException(status_code=400, detail="잘못된 작업 ID입니다")
+    result = shared_state.read(job_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="아직 작업 결과가 없습니다")
+    return result
@@ -1,142 +1,299 @@
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.cron import CronTrigger
+import asyncio
+import json
+import os
 from datetime import datetime
-from app.api.exchage.market import get_market_all, get_ticker
+from typing import Dict, List
+from app.api.exchage.market import fetch_market_all, fetch_ticker, fetch_orderbook
+from app.api.schedule import tasks
+from app.api.schedule.stats import JobStatsListener
+from app.core import shared_state
+from app.core.config import get_settings
+from app.core.leader import FileLeaderElector
+from app.core.tracing import traced, span
+from app.market import journal
+from app.market.alerts import dispatch, get_engine as get_alert_engine, market_states
+from app.market.shared_snapshot import CAUTION_KEYS, SnapshotWriter
 
-scheduler = AsyncIOScheduler()
+_scheduler = None
+_elector = None
+_job_stats = JobStatsListener()
+_snapshot_writer = None
+_snapshot_markets = None
+_market_table = None
 
-def print_separator(length=150):
-    print("=" * length)
+def get_scheduler():
+    """스케줄러 (최초 호출 시 생성 - apscheduler 로드를 앱 시작 이후로 미룸)"""
+    global _scheduler
+    if _scheduler is None:
+        from apscheduler.schedulers.asyncio import AsyncIOScheduler
+        # 이전 실행이 끝나지 않았으면 겹쳐 실행하지 않고, 밀린 실행은 한 번으로 합친다
+        _scheduler = AsyncIOScheduler(job_defaults={
+            'max_instances': 1,
+            'coalesce': True,
+            'misfire_grace_time': 30,
+        })
+        _job_stats.attach(_scheduler)
+    return _scheduler
 
-def format_price(price):
-    return f"₩{price:,.2f}" if price >= 100 else f"₩{price:.8f}"
+def is_scheduler_running() -> bool:
+    """현재 워커에서 스케줄러가 실행 중인지 여부"""
+    return _scheduler is not None and _scheduler.running
 
+def get_job_stats() -> JobStatsListener:
+    """작업별 실행 통계"""
+    return _job_stats
+
+def get_elector() -> FileLeaderElector:
+    """스케줄러 리더 선출기 (워커 간 락 파일 공유)"""
+    global _elector
+    if _elector is None:
+        _elector = FileLeaderElector(get_settings().scheduler_lock_file)
+    return _elector
+
+# 주의 종목 유형 표시명
+CAUTION_LABELS = {
+    'PRICE_FLUCTUATIONS': "가격급등락",
+    'TRADING_VOLUME_SOARING': "거래량급등",
+    'DEPOSIT_AMOUNT_SOARING': "입금량급등",
+    'GLOBAL_PRICE_DIFFERENCES': "가격차이",
+    'CONCENTRATION_OF_SMALL_ACCOUNTS': "소수계정",
+}
+
+def get_market_table():
+    """market_monitor 현재가 테이블 (numpy 로드를 첫 실행까지 미룸)"""
+    global _market_table
+    if _market_table is None:
+        from app.market.state import MarketTable
+        _market_table = MarketTable()
+    return _market_table
+
+@traced("job market_monitor")
 async def market_monitor():
-    """1분마다 마켓 정보 모니터링"""
+    """
+    1분마다 마켓 정보 모니터링
+
+    이전 실행 대비 바뀐 마켓(유의/주의 지정·해제, 가격 돌파)만 알림 엔진으로 전달하고,
+    주의 종목 중 상승 마켓 목록은 작업 결과로 공유한다.
+    """
     try:
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        print_separator()
-        print(f"마켓 모니터링 - {now}")
-        print_separator()
         
         # 전체 마켓 조회
-        markets = await get_market_all(is_details=True)
+        markets = await fetch_market_all(is_details=True)
         krw_markets = [market['market'] for market in markets if market['market'].startswith('KRW-')]
         
         # 현재가 조회
-        market_prices = await get_ticker(','.join(krw_markets))
-        
-        # 거래량 기준 내림차순 정렬
-        market_prices.sort(key=lambda x: x['acc_trade_price_24h'], reverse=True)
-        
-        # 헤더 크기
-        header_size = {
-            'coin': 10,
-            'trade_price': 15,
-            'change_rate': 10,
-            'trade_volume': 15,
-            'trade_price_24h': 20,
-            'warning': 10,
-            'caution': 30
-        }
-
-        # 헤더 출력
-        headers = [
-            ('코인', header_size['coin']),
-            ('현재가', header_size['trade_price']),
-            ('전일대비', header_size['change_rate']),
-            ('거래량', header_size['trade_volume']),
-            ('거래금액(24H)', header_size['trade_price_24h']),
-            ('유의종목', header_size['warning']),
-            ('주의종목', header_size['caution'])
-        ]
-        
-        print(' | '.join(f"{h[0]:^{h[1]}}" for h in headers))
-        print("-" * (sum(h[1] for h in headers) + len(headers) * 3))
-        
-        # 데이터 출력
-        filterCnt = 0
-        for price in market_prices:
-            market = price['market']
-            change = price['change']
-            trade_price = format_price(price['trade_price'])
-            change_rate = f"{price['signed_change_rate']*100:+.2f}%"
-            trade_volume = f"{price['acc_trade_volume_24h']:,.1f}"
-            trade_price_24h = f"₩{price['acc_trade_price_24h']:,.0f}"
-            
-            # 마켓 이벤트 경고 정보 추가
-            market_info = next((m for m in markets if m['market'] == market), {})
-            market_event = market_info.get('market_event', {})
-            
-            warning = "⚠️ 유의" if market_event.get('warning') else ""
-            
-            # 주의 종목 상세 정보
-            caution_types = {}
-            caution_types["가격급등락"] = False
-            caution_types["거래량급등"] = False
-            caution_types["입금량급등"] = False
-            caution_types["가격차이"] = False
-            caution_types["소수계정"] = False   
-
-            if market_event.get('caution'):
-                if market_event.get('caution', {}).get('PRICE_FLUCTUATIONS'):
-                    caution_types["가격급등락"] = True
-                if market_event.get('caution', {}).get('TRADING_VOLUME_SOARING'):
-                    caution_types["거래량급등"] = True
-                if market_event.get('caution', {}).get('DEPOSIT_AMOUNT_SOARING'):
-                    caution_types["입금량급등"] = True  
-                if market_event.get('caution', {}).get('GLOBAL_PRICE_DIFFERENCES'):
-                    caution_types["가격차이"] = True
-                if market_event.get('caution', {}).get('CONCENTRATION_OF_SMALL_ACCOUNTS'):
-                    caution_types["소수계정"] = True
-            
-            caution = []
-            if caution_types["가격급등락"]:
-                caution.append("⚠️ 가격급등락")
-            if caution_types["거래량급등"]:
-                caution.append("⚠️ 거래량급등")
-            if caution_types["입금량급등"]:
-                caution.append("⚠️ 입금량급등")
-            if caution_types["가격차이"]:
-                caution.append("⚠️ 가격차이")
-            if caution_types["소수계정"]:
-                caution.append("⚠️ 소수계정")
-            
-            if caution:
-                caution = ", ".join(caution)
-            else:
-                caution = ""
-
-            values = [
-                (market[4:], header_size['coin']),
-                (trade_price, header_size['trade_price']),
-                (change_rate, header_size['change_rate']),
-                (trade_volume, header_size['trade_volume']),
-                (trade_price_24h, header_size['trade_price_24h']),
-                (warning, header_size['warning']),
-                (caution, header_size['caution'])
-            ]
-            
-            # 주의 마켓 출력 + 전일대비 플러스 출력
-            if caution != "" and change == 'RISE':
-                filterCnt += 1
-                print(' | '.join(f"{v[0]:^{v[1]}}" for v in values))
+        market_prices = await fetch_ticker(','.join(krw_markets))
+        journal.record(journal.TICKER, market_prices)
         
-        print_separator(sum(h[1] for h in headers) + len(headers) * 3)
-        print(f"총 {len(market_prices)}개 마켓 조회 완료")
-        print(f"주의 마켓 {filterCnt}개 조회 완료")
+        # 상태 변화 알림 / 결과 정리 (후처리)
+        with span("postprocess", markets=len(market_prices)):
+            alerts = get_alert_engine().update(market_states(markets, market_prices))
+            dispatch(alerts)
+
+            # 주의 마켓 + 전일대비 상승 (거래대금 내림차순)
+            table = get_market_table()
+            table.update_markets(markets)
+            table.update_tickers(market_prices)
+            rows = table.select(
+                table.quote_mask('KRW') & table.caution_mask() & table.change_mask('RISE'),
+                order_by='acc_trade_price_24h',
+            )
+            caution_markets = table.to_records(
+                rows, ['market', 'trade_price', 'signed_change_rate', 'acc_trade_price_24h']
+            )
+            warnings = table.column('warning', rows).tolist()
+            bits = table.column('caution', rows).tolist()
+            for item, warning, caution in zip(caution_markets, warnings, bits):
+                item['warning'] = warning
+                item['caution'] = [CAUTION_LABELS[key] for i, key in enumerate(CAUTION_KEYS) if caution >> i & 1]
+
+            print(f"마켓 모니터링 - {now} : 총 {len(market_prices)}개 마켓, "
+                  f"주의 마켓 {len(caution_markets)}개, 알림 {len(alerts)}개")
+
+            # 다른 워커도 같은 결과를 제공하도록 공유
+            shared_state.publish("market_monitor", {
+                'total': len(market_prices),
+                'caution_markets': caution_markets,
+            })
     except Exception as e:
         print(f"Error in market_monitor: {str(e)}")
+        # 작업 통계(errors, last_error)에 기록되도록 스케줄러로 전달
+        raise
 
-def init_scheduler():
-    """스케줄러 초기화 및 작업 등록"""
+def chunks(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+@traced("job snapshot_feeder")
+async def snapshot_feeder():
+    """공유 메모리 시세 스냅샷 갱신 (리더 워커 하나에서만 실행)"""
+    global _snapshot_writer, _snapshot_markets
+    settings = get_settings()
+    try:
+        if _snapshot_writer is None:
+            _snapshot_writer = SnapshotWriter(settings.snapshot_name, settings.snapshot_capacity)
+
+        # 마켓 목록은 바뀐 경우에만 기록 (읽는 쪽 인덱스 재구성 최소화)
+        markets = await fetch_market_all(is_details=True)
+        if markets != _snapshot_markets:
+            _snapshot_writer.update_markets(markets)
+            _snapshot_markets = markets
+
+        codes = [m['market'] for m in markets]
+        for chunk in chunks(codes, 100):
+            tickers = await fetch_ticker(','.join(chunk))
+            _snapshot_writer.update_tickers(tickers)
+            journal.record(journal.TICKER, tickers)
+
+        quotes = tuple(f"{q.strip()}-" for q in settings.snapshot_orderbook_quotes.split(",") if q.strip())
+        for chunk in chunks([c for c in codes if c.startswith(quotes)], 100):
+            orderbooks = await fetch_orderbook(','.join(chunk))
+            _snapshot_writer.update_orderbooks(orderbooks)
+            journal.record(journal.ORDERBOOK, orderbooks)
+    except Exception as e:
+        print(f"Error in snapshot_feeder: {str(e)}")
+        # 작업 통계(errors, last_error)에 기록되도록 스케줄러로 전달
+        raise
+
+# 설정 파일에서 func 로 지정할 수 있는 작업
+JOBS = {
+    'market_monitor': market_monitor,
+    'snapshot_feeder': snapshot_feeder,
+    'candle_sync': tasks.candle_sync,
+    'balance_refresh': tasks.balance_refresh,
+    'history_sync': tasks.history_sync,
+    'trade_sync': tasks.trade_sync,
+    'wallet_status_sync': tasks.wallet_status_sync,
+}
+
+INTERVAL_FIELDS = ('weeks', 'days', 'hours', 'minutes', 'seconds')
+CRON_FIELDS = ('year', 'month', 'day', 'week', 'day_of_week', 'hour', 'minute', 'second')
+JOB_OPTIONS = ('max_instances', 'coalesce', 'misfire_grace_time')
+
+def default_job_definitions() -> List[Dict]:
+    """기본 작업 정의"""
+    settings = get_settings()
+    return [
+        {
+            'id': 'market_monitor',
+            'name': '마켓 모니터링',
+            'trigger': 'cron',
+            'minute': '*',  # 매 분마다 실행
+        },
+        {
+            'id': 'snapshot_feeder',
+            'name': '공유 메모리 시세 스냅샷',
+            'trigger': 'interval',
+            'seconds': settings.snapshot_interval,
+            'enabled': settings.snapshot_enabled,
+        },
+        {
+            'id': 'trade_sync',
+            'name': '체결 기반 실시간 캔들',
+            'trigger': 'interval',
+            'seconds': settings.live_candle_interval,
+            'kwargs': {'markets': settings.live_candle_markets},
+            'enabled': bool(settings.live_candle_markets.strip()),
+        },
+        {
+            'id': 'wallet_status_sync',
+            'name': '입출금 현황 갱신',
+            'trigger': 'interval',
+            'seconds': settings.wallet_status_interval,
+            'enabled': bool(settings.access_key),
+        },
+    ]
+
+def load_job_definitions() -> List[Dict]:
+    """
+    작업 정의 조회 (기본 작업 + SCHEDULER_JOBS_FILE)
+
+    설정 파일은 작업 정의 목록(JSON)이며, 같은 id 의 기본 작업은 덮어쓴다.
+    ex) [{"id": "candle_sync", "trigger": "interval", "seconds": 0.5, "jitter": 0.1,
+          "kwargs": {"markets": ["KRW-BTC", "KRW-ETH"]}},
+         {"id": "market_monitor", "enabled": false}]
+
+    Note:
+        - func: JOBS 에 등록된 작업 이름 (없으면 id 사용)
+        - trigger: interval (weeks/days/hours/minutes/seconds, 1초 미만 가능) 또는 cron (year ~ second)
+        - jitter: 실행 시각을 무작위로 최대 jitter 초만큼 흔듦
+        - max_instances / coalesce / misfire_grace_time: 중복 실행/밀린 실행 처리 (기본 1 / true / 30)
+        - 기본 작업을 덮어쓸 때는 지정한 키만 바뀐다
+    """
+    definitions = {d['id']: d for d in default_job_definitions()}
+    path = get_settings().scheduler_jobs_file
+    if path:
+        with open(path, encoding="utf-8") as f:
+            for item in json.load(f):
+                definitions[item['id']] = {**definitions.get(item['id'], {}), **item}
+    return [d for d in definitions.values() if d.get('enabled', True)]
+
+def build_trigger(definition: Dict):
+    """작업 정의로 APScheduler 트리거 생성"""
+    from apscheduler.triggers.cron import CronTrigger
+    from apscheduler.triggers.interval import IntervalTrigger
+
+    trigger = definition.get('trigger', 'interval')
+    jitter = definition.get('jitter')
+    if trigger == 'interval':
+        fields = {k: definition[k] for k in INTERVAL_FIELDS if k in definition}
+        if not fields or sum(float(v) for v in fields.values()) <= 0:
+            raise ValueError("interval 작업은 0보다 큰 실행 간격이 필요합니다")
+        return IntervalTrigger(**fields, jitter=jitter)
+    if trigger == 'cron':
+        fields = {k: definition[k] for k in CRON_FIELDS if k in definition}
+        return CronTrigger(**fields, jitter=jitter)
+    raise ValueError(f"지원하지 않는 트리거입니다: {trigger}")
+
+def add_configured_job(scheduler, definition: Dict):
+    """작업 정의 하나를 스케줄러에 등록"""
+    func = JOBS.get(definition.get('func', definition['id']))
+    if func is None:
+        raise ValueError(f"등록되지 않은 작업입니다: {definition.get('func', definition['id'])}")
     scheduler.add_job(
-        market_monitor,
-        CronTrigger(minute="*"),  # 매 분마다 실행
-        id="market_monitor",
-        name="마켓 모니터링",
+        func,
+        build_trigger(definition),
+        id=definition['id'],
+        name=definition.get('name', definition['id']),
+        kwargs=definition.get('kwargs', {}),
         replace_existing=True,
+        **{k: definition[k] for k in JOB_OPTIONS if k in definition},
     )
+
+def init_scheduler():
+    """스케줄러 초기화 및 작업 등록"""
+    scheduler = get_scheduler()
+    for definition in load_job_definitions():
+        try:
+            add_configured_job(scheduler, definition)
+        except Exception as e:
+            print(f"Error in scheduler job {definition.get('id')}: {str(e)}")
     
     # 스케줄러 시작
-    scheduler.start() 
\ No newline at end of file
+    scheduler.start()
+
+async def start_scheduler_later(delay: float):
+    """
+    앱 시작 직후 요청 처리와 경합하지 않도록 delay 초 후 스케줄러 시작
+
+    scheduler_mode=leader 이면 락 파일을 얻은 워커 하나만 작업을 실행하고,
+    나머지 워커는 주기적으로 락을 재시도하다가 리더가 종료되면 이어받는다.
+    """
+    await asyncio.sleep(delay)
+    settings = get_settings()
+    if settings.scheduler_mode == "leader":
+        elector = get_elector()
+        while not elector.try_acquire():
+            await asyncio.sleep(settings.leader_retry_interval)
+        print(f"스케줄러 리더 선출 (pid={os.getpid()})")
+    init_scheduler()
+
+def shutdown_scheduler():
+    """스케줄러 종료 및 리더 락 해제"""
+    if _scheduler is not None and _scheduler.running:
+        _scheduler.shutdown(wait=False)
+    if _snapshot_writer is not None:
+        _snapshot_writer.close()
+    journal.close_writer()
+    if _elector is not None:
+        _elector.release()
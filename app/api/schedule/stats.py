@@ -0,0 +1,164 @@
+"""
+스케줄러 작업 실행 통계
+
+APScheduler 이벤트 리스너로 작업별 실행 시간, 예정 시각 대비 지연(lag),
+실행되지 못한 횟수(missed / max_instances)를 기록한다.
+작업 함수에 데코레이터를 붙이지 않아도 등록된 모든 작업이 집계된다.
+"""
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from app.core import shared_state
+from app.core.metrics import JOB_DURATION, JOB_LAG, JOB_MISSED, JOB_RUNS
+
+# 리더 워커가 통계를 공유하는 최소 간격 (초) - 1초 미만 작업도 파일 기록은 초당 1회로 제한
+PUBLISH_INTERVAL = 1.0
+
+
+class JobStats:
+    __slots__ = ("runs", "errors", "missed", "skipped", "last_duration",
+                 "total_duration", "max_duration", "last_lag", "max_lag",
+                 "last_run_at", "last_error")
+
+    def __init__(self):
+        self.runs = 0
+        self.errors = 0
+        self.missed = 0  # misfire_grace_time 초과로 건너뜀
+        self.skipped = 0  # 이전 실행이 끝나지 않아 건너뜀 (max_instances)
+        self.last_duration = None
+        self.total_duration = 0.0
+        self.max_duration = 0.0
+        self.last_lag = None
+        self.max_lag = 0.0
+        self.last_run_at = None
+        self.last_error = None
+
+    def to_dict(self) -> Dict:
+        completed = self.runs + self.errors
+        return {
+            "runs": self.runs,
+            "errors": self.errors,
+            "missed": self.missed,
+            "skipped": self.skipped,
+            "last_duration_ms": _ms(self.last_duration),
+            "avg_duration_ms": _ms(self.total_duration / completed) if completed else None,
+            "max_duration_ms": _ms(self.max_duration),
+            "last_lag_ms": _ms(self.last_lag),
+            "max_lag_ms": _ms(self.max_lag),
+            "last_run_at": self.last_run_at,
+            "last_error": self.last_error,
+        }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+class JobStatsListener:
+    """
+    APScheduler 이벤트 리스너
+
+    제출(SUBMITTED) 시각을 기준으로 지연을, 제출부터 완료(EXECUTED/ERROR)까지를 실행 시간으로 기록한다.
+    coalesce=False 로 밀린 실행 여러 건이 한 번에 제출되면 순서대로 실행되므로,
+    앞선 실행이 끝난 시각을 다음 실행의 시작 시각으로 사용한다.
+    """
+
+    def __init__(self, publish_name: Optional[str] = "scheduler_jobs"):
+        self.stats: Dict[str, JobStats] = {}
+        self.publish_name = publish_name
+        self._started: Dict[Tuple[str, datetime], Tuple[float, list]] = {}
+        self._scheduler = None
+        self._last_publish = 0.0
+
+    def attach(self, scheduler):
+        """스케줄러에 리스너 등록"""
+        from apscheduler import events
+
+        self._scheduler = scheduler
+        scheduler.add_listener(
+            self,
+            events.EVENT_JOB_SUBMITTED | events.EVENT_JOB_EXECUTED | events.EVENT_JOB_ERROR
+            | events.EVENT_JOB_MISSED | events.EVENT_JOB_MAX_INSTANCES
+        )
+
+    def _get(self, job_id: str) -> JobStats:
+        stats = self.stats.get(job_id)
+        if stats is None:
+            stats = self.stats[job_id] = JobStats()
+        return stats
+
+    def __call__(self, event):
+        from apscheduler import events
+
+        job_id = event.job_id
+        stats = self._get(job_id)
+        code = event.code
+
+        if code == events.EVENT_JOB_SUBMITTED:
+            run_times = event.scheduled_run_times
+            lag = max(0.0, (datetime.now(timezone.utc) - run_times[-1]).total_seconds())
+            stats.last_lag = lag
+            stats.max_lag = max(stats.max_lag, lag)
+            stats.last_run_at = time.time()
+            JOB_LAG.labels(job_id).observe(lag)
+            self._started[(job_id, run_times[0])] = (time.perf_counter(), run_times[1:])
+            return
+
+        if code == events.EVENT_JOB_MAX_INSTANCES:
+            stats.skipped += 1
+            JOB_MISSED.labels(job_id, "max_instances").inc()
+            return
+
+        # MISSED / EXECUTED / ERROR
+        now = time.perf_counter()
+        entry = self._started.pop((job_id, event.scheduled_run_time), None)
+        if entry is not None and entry[1]:
+            self._started[(job_id, entry[1][0])] = (now, entry[1][1:])
+
+        if code == events.EVENT_JOB_MISSED:
+            stats.missed += 1
+            JOB_MISSED.labels(job_id, "missed").inc()
+            return
+
+        if entry is not None:
+            duration = now - entry[0]
+            stats.last_duration = duration
+            stats.total_duration += duration
+            stats.max_duration = max(stats.max_duration, duration)
+            JOB_DURATION.labels(job_id).observe(duration)
+        if event.exception is not None:
+            stats.errors += 1
+            stats.last_error = f"{type(event.exception).__name__}: {event.exception}"
+            JOB_RUNS.labels(job_id, "error").inc()
+        else:
+            stats.runs += 1
+            JOB_RUNS.labels(job_id, "success").inc()
+        self._maybe_publish()
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """작업별 설정/다음 실행 시각/통계"""
+        result = {}
+        jobs = self._scheduler.get_jobs() if self._scheduler is not None else []
+        for job in jobs:
+            result[job.id] = {
+                "name": job.name,
+                "trigger": str(job.trigger),
+                "next_run_time": job.next_run_time.isoformat() if job.next_run_time else None,
+                "max_instances": job.max_instances,
+                "coalesce": job.coalesce,
+                "misfire_grace_time": job.misfire_grace_time,
+                "stats": self._get(job.id).to_dict(),
+            }
+        return result
+
+    def _maybe_publish(self):
+        """다른 워커에서도 조회할 수 있도록 통계 공유 (PUBLISH_INTERVAL 마다 최대 1회)"""
+        now = time.monotonic()
+        if self.publish_name is None or now - self._last_publish < PUBLISH_INTERVAL:
+            return
+        self._last_publish = now
+        try:
+            shared_state.publish(self.publish_name, self.snapshot())
+        except Exception as e:
+            print(f"Error in job stats publish: {str(e)}")
@@ -0,0 +1,156 @@
+"""
+설정으로 등록하는 스케줄러 작업
+
+각 작업은 결과를 작업 이름으로 공유 상태(app.core.shared_state)에 기록하므로
+GET /api/upbit/scheduler/results/{이름} 으로 모든 워커에서 조회할 수 있다.
+예외는 잡지 않고 스케줄러로 전달해 작업 통계(errors, last_error)에 기록되도록 한다.
+"""
+import time
+from typing import Dict, List, Optional, Tuple, Union
+
+from app.api.exchage.accounts import fetch_accounts
+from app.api.exchage.market import fetch_candles_minutes, fetch_trades
+from app.api.exchage.orders import fetch_closed_orders
+from app.api.exchage.status import fetch_wallet_status
+from app.core import shared_state
+from app.core.tracing import traced
+from app.market import bars as live_bars
+from app.market import candles as local_candles
+from app.market import journal
+from app.market.alerts import dispatch
+from app.trading.balances import get_tracker
+from app.trading.wallet import get_wallets
+
+# 마켓별 마지막으로 저널에 기록한 체결 번호
+_last_trade_ids = {}
+# 이전 실행 이후 체결을 모두 받을 때까지 과거로 넘기는 최대 페이지 수
+TRADE_SYNC_MAX_PAGES = 10
+
+
+def market_list(markets: Union[str, List[str]]) -> List[str]:
+    """리스트 또는 콤마 구분 문자열로 지정한 마켓 코드 목록"""
+    if isinstance(markets, str):
+        return [m.strip() for m in markets.split(",") if m.strip()]
+    return list(markets)
+
+
+@traced("job candle_sync")
+async def candle_sync(markets: Union[str, List[str]] = "KRW-BTC", unit: int = 1, count: int = 2):
+    """
+    최근 분 캔들 동기화
+
+    unit=1 이면 로컬 캔들 저장소(app.market.candles)에 반영해 /candles/* 라우트가 상위 단위
+    캔들까지 직접 응답한다. 다른 워커는 공유 상태의 fetched_at 기준으로 같은 구간을 반영한다.
+    수집 구간은 첫 실행 때 받은 가장 오래된 캔들부터 시작하며, CANDLE_MAX_LAG 보다 짧은 간격으로 실행한다.
+
+    Args:
+        markets: 마켓 코드 목록 (리스트 또는 콤마 구분 문자열)
+        unit: 분 단위 (1, 3, 5, 15, 10, 30, 60, 240)
+        count: 마켓별 조회할 캔들 개수 (최대 200개)
+    """
+    markets = market_list(markets)
+    candles = {}
+    store = local_candles.get_store()
+    # 다른 워커는 모든 마켓에 같은 시각을 적용하므로 가장 이른 조회 시각을 공유
+    started_at = time.time()
+    for market in markets:
+        fetched_at = time.time()
+        candles[market] = await fetch_candles_minutes(unit, market, count)
+        if unit == 1:
+            store.ingest(market, candles[market], fetched_at)
+    shared_state.publish("candle_sync", {'unit': unit, 'candles': candles, 'fetched_at': started_at})
+
+
+async def fetch_new_trades(market: str, count: int, last_id: int) -> Tuple[List[Dict], bool]:
+    """
+    이전 실행에서 받은 체결(last_id)까지 과거로 넘기며 체결 내역 조회
+
+    Returns:
+        (체결 목록, 누락 여부 - 최대 페이지 수 안에 last_id 까지 닿지 못함)
+    """
+    trades = await fetch_trades(market, count)
+    pages = 1
+    while last_id and trades:
+        oldest = min(t['sequential_id'] for t in trades)
+        if oldest <= last_id:
+            break
+        if pages >= TRADE_SYNC_MAX_PAGES:
+            return trades, True
+        older = await fetch_trades(market, count, cursor=oldest)
+        if not older:
+            break
+        trades.extend(older)
+        pages += 1
+    return trades, False
+
+
+@traced("job trade_sync")
+async def trade_sync(markets: Union[str, List[str]] = "KRW-BTC", count: int = 100):
+    """
+    최근 체결 내역으로 실시간 캔들(app.market.bars) 갱신, 시세 저널 기록 (JOURNAL_ENABLED=true 일 때)
+
+    이전 실행에서 기록한 체결(sequential_id)은 건너뛰고, 새 체결만 시간 순으로 기록한다.
+    조회한 체결이 이전 실행의 마지막 체결까지 닿지 않으면 cursor 로 과거 페이지를 더 받는다
+    (TRADE_SYNC_MAX_PAGES 를 넘으면 누락으로 보고 실시간 캔들 통계 gaps 에 집계).
+    처음 보는 마켓은 업비트 1분 캔들로 이전 캔들을 채운다.
+    실시간 캔들의 단위별 최근 캔들은 live_candles 공유 상태로 다른 워커에 전달한다.
+
+    Args:
+        markets: 마켓 코드 목록 (리스트 또는 콤마 구분 문자열)
+        count: 마켓별 조회할 체결 개수 (최대 500개)
+    """
+    markets = market_list(markets)
+    recorded = {}
+    builder = live_bars.get_builder()
+    for market in markets:
+        last_id = _last_trade_ids.get(market, 0)
+        trades, gap = await fetch_new_trades(market, count, last_id)
+        if gap:
+            builder.stats["gaps"] += 1
+        if not builder.has_market(market):
+            # 작업 시작 전 이력은 업비트 1분 캔들로 채움
+            before = min((t['timestamp'] for t in trades), default=int(time.time() * 1000))
+            builder.seed(market, await fetch_candles_minutes(1, market, min(builder.history, 200)), before)
+        builder.add_trades(trades)
+        new_trades = sorted((t for t in trades if t['sequential_id'] > last_id),
+                            key=lambda t: t['sequential_id'])
+        if new_trades:
+            journal.record(journal.TRADE, new_trades)
+            _last_trade_ids[market] = new_trades[-1]['sequential_id']
+        recorded[market] = len(new_trades)
+    shared_state.publish("trade_sync", recorded)
+    shared_state.publish("live_candles", {'candles': builder.snapshot(), 'stats': builder.stats})
+
+
+@traced("job balance_refresh")
+async def balance_refresh():
+    """전체 계좌 잔고 갱신 (이 워커의 잔고 구독자에게도 변화 전달)"""
+    accounts = await fetch_accounts()
+    get_tracker().apply(accounts)
+    shared_state.publish("balance_refresh", accounts)
+
+
+@traced("job wallet_status_sync")
+async def wallet_status_sync():
+    """
+    입출금 현황 갱신
+
+    화폐별 색인(app.trading.wallet)을 갱신하고 wallet_state / block_state 가 바뀐 화폐/네트워크를
+    알림 싱크로 보낸다. 다른 워커는 wallet_status 공유 상태에서 읽는다.
+    """
+    fetched_at = time.time()
+    rows = await fetch_wallet_status()
+    dispatch(get_wallets().update(rows, fetched_at))
+    shared_state.publish("wallet_status", {'wallets': rows, 'fetched_at': fetched_at})
+
+
+@traced("job history_sync")
+async def history_sync(market: Optional[str] = None, limit: int = 100):
+    """
+    종료된 주문(체결/취소) 내역 동기화
+
+    Args:
+        market: 마켓 코드 (없으면 전체 마켓)
+        limit: 조회 개수 (max: 1,000)
+    """
+    shared_state.publish("history_sync", await fetch_closed_orders(market, limit))
@@ -0,0 +1,16 @@
+import time
+from app.api.exchage.market import load_market_all
+from app.core.metrics import STARTUP_SECONDS
+
+async def warmup_caches():
+    """앱 시작 후 백그라운드에서 캐시 미리 채우기 (실패해도 첫 요청 시 다시 로드)"""
+    start = time.perf_counter()
+    try:
+        for is_details in (False, True):
+            await load_market_all(is_details)
+    except Exception as e:
+        print(f"Error in warmup_caches: {str(e)}")
+    finally:
+        elapsed = time.perf_counter() - start
+        STARTUP_SECONDS.labels("warmup").set(elapsed)
+        print(f"캐시 워밍업 완료 ({elapsed * 1000:.0f}ms)")
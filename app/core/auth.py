@@ -0,0 +1,34 @@
+"""
+업비트 API 인증 (JWT 서명)
+"""
+import uuid
+from typing import Callable, Dict, Optional
+
+from jwt import encode as jwt_encode
+
+from app.core.tracing import span
+
+
+def encode(payload: dict, secret_key: str) -> str:
+    """JWT 토큰 서명 (트레이싱 sign 스팬 기록)"""
+    with span("sign"):
+        return jwt_encode(payload, secret_key)
+
+
+def signer(access_key: str, secret_key: str, query: Optional[str] = None) -> Callable[[], Dict[str, str]]:
+    """
+    Authorization 헤더를 만드는 함수 (upstream.request 의 sign 인자)
+
+    호출할 때마다 nonce 를 새로 만들어 서명하므로 재시도/헤지 요청도 nonce 중복으로 거부되지 않는다.
+
+    Args:
+        access_key: 업비트 액세스 키
+        secret_key: 업비트 시크릿 키
+        query: 서명할 쿼리 문자열 (없으면 query 없이 서명)
+    """
+    def sign() -> Dict[str, str]:
+        payload = {'access_key': access_key, 'nonce': str(uuid.uuid4())}
+        if query is not None:
+            payload['query'] = query
+        return {"Authorization": f"Bearer {encode(payload, secret_key)}"}
+    return sign
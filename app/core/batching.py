@@ -0,0 +1,104 @@
+"""
+마켓 단위 요청 묶음 처리 (micro-batching)
+
+짧은 시간(window) 안에 들어온 마켓별 조회를 모아 여러 마켓을 받는 업비트 호출 한 번으로 처리하고,
+결과를 요청별로 나눠 돌려준다. 이미 대기 중인 마켓을 다시 요청하면 같은 결과를 기다린다.
+
+    batcher = MicroBatcher("ticker", lambda codes: fetch_ticker(",".join(codes)))
+    rows = await batcher.load(["KRW-BTC"])       # 5ms 안에 들어온 다른 요청과 함께 /ticker 한 번 호출
+
+묶은 호출이 400/404 로 실패하면(잘못된 마켓 코드가 섞인 경우) 절반씩 나눠 다시 호출해
+다른 요청에 오류가 전파되지 않도록 한다. 429(요청 수 제한) 등 다른 오류는 나누지 않고 묶음 전체를 실패시킨다.
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
+
+import requests
+
+from app.core.metrics import BATCH_KEYS
+from app.core.upstream import UpstreamNotFound
+
+# 묶음을 나눠 다시 호출하는 상태코드 (잘못된 코드가 섞인 경우, 429 는 나누면 호출만 늘어남)
+SPLIT_STATUS = (400, 404)
+
+
+class MicroBatcher:
+    def __init__(self, name: str, loader: Callable[[List[str]], Awaitable[List[Dict]]],
+                 window: float = 0.005, max_keys: int = 100, key: str = "market"):
+        """
+        Args:
+            name: 이름 (메트릭 라벨)
+            loader: 코드 목록을 받아 항목 목록을 반환하는 함수 (업비트 호출)
+            window: 요청을 모으는 시간 (초)
+            max_keys: 한 번에 호출할 최대 코드 수 (도달하면 바로 호출)
+            key: 항목의 코드 필드
+        """
+        self.name = name
+        self.loader = loader
+        self.window = window
+        self.max_keys = max_keys
+        self.key = key
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+
+    async def load(self, codes: Sequence[str]) -> List[Dict]:
+        """코드별 항목 (요청 순서 유지)"""
+        loop = asyncio.get_running_loop()
+        futures = []
+        for code in codes:
+            future = self._pending.get(code)
+            if future is None:
+                future = self._pending[code] = loop.create_future()
+                if len(self._pending) >= self.max_keys:
+                    self._flush()
+            futures.append(future)
+        if self._pending and self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        results = await asyncio.gather(*(asyncio.shield(f) for f in futures), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return results
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, {}
+        if pending:
+            task = asyncio.ensure_future(self._run(pending))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, pending: Dict[str, asyncio.Future]):
+        BATCH_KEYS.labels(self.name).observe(len(pending))
+        try:
+            rows = await self.loader(list(pending))
+        except requests.exceptions.HTTPError as e:
+            status = e.response.status_code if e.response is not None else 0
+            if len(pending) > 1 and status in SPLIT_STATUS:
+                # 절반씩 나눠 다시 호출해 문제 코드만 실패시킨다
+                items = list(pending.items())
+                half = len(items) // 2
+                await asyncio.gather(self._run(dict(items[:half])), self._run(dict(items[half:])))
+            else:
+                self._fail(pending, e)
+            return
+        except Exception as e:
+            self._fail(pending, e)
+            return
+        by_code = {row[self.key]: row for row in rows}
+        for code, future in pending.items():
+            if future.done():
+                continue
+            if code in by_code:
+                future.set_result(by_code[code])
+            else:
+                future.set_exception(UpstreamNotFound(f"{code} 항목이 응답에 없습니다"))
+
+    @staticmethod
+    def _fail(pending: Dict[str, asyncio.Future], error: Exception):
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
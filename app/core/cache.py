@@ -0,0 +1,142 @@
+"""
+TTL 캐시
+
+키별 만료 시간을 가진 메모리 캐시. 조회 결과는 upbit_cache_requests_total 메트릭에 기록된다.
+get_or_load 는 같은 키를 동시에 요청해도 업비트 호출은 한 번만 수행하고,
+stale_ttl 을 지정하면 업비트 장애로 갱신에 실패했을 때 만료 후 stale_ttl 이내의 값을 대신 반환한다.
+생성한 캐시는 이름으로 등록되어 cache_stats() 로 적중/만료 값 응답 수와 항목 나이를 조회할 수 있다.
+"""
+import asyncio
+import inspect
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Union
+
+from app.core.metrics import CACHE_REQUESTS, record_cache
+
+_MISSING = object()
+
+# 이름별 캐시 (통계 조회용)
+_caches: Dict[str, "TTLCache"] = {}
+
+
+class TTLCache:
+    def __init__(self, name: str, ttl: float, maxsize: int = 1024, stale_ttl: float = 0.0):
+        """
+        Args:
+            name: 캐시 이름 (메트릭 라벨)
+            ttl: 유효 시간 (초)
+            maxsize: 최대 항목 수 (초과 시 오래된 항목부터 제거)
+            stale_ttl: 갱신 실패 시 만료된 값을 대신 반환하는 최대 시간 (초, 0: 사용 안 함)
+        """
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._loading: Dict[Hashable, asyncio.Future] = {}
+        self.counts = {"hit": 0, "miss": 0, "stale": 0, "error": 0, "invalidate": 0}
+        _caches[name] = self
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is not None and entry[1] > time.monotonic():
+            record_cache(self.name, True)
+            self.counts["hit"] += 1
+            return entry[0]
+        record_cache(self.name, False)
+        self.counts["miss"] += 1
+        return default
+
+    def set(self, key: Hashable, value: Any):
+        self._data[key] = (value, time.monotonic() + self.ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def replace(self, key: Hashable, value: Any) -> bool:
+        """유효한 항목의 값만 바꿈 (만료 시각 유지, 없거나 만료된 키는 무시하고 False)"""
+        entry = self._data.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            return False
+        self._data[key] = (value, entry[1])
+        return True
+
+    def invalidate(self, key: Hashable = _MISSING):
+        """키 삭제 (키 미지정 시 전체 삭제)"""
+        self.counts["invalidate"] += 1
+        if key is _MISSING:
+            self._data.clear()
+        else:
+            self._data.pop(key, None)
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Union[Any, Awaitable[Any]]]) -> Any:
+        """
+        캐시 조회 후 없으면 loader 실행 결과를 저장해 반환
+
+        Args:
+            key: 캐시 키
+            loader: 값을 만드는 함수 (동기/비동기 모두 가능)
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        pending = self._loading.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        try:
+            value = loader()
+            if inspect.isawaitable(value):
+                value = await value
+            self.set(key, value)
+            future.set_result(value)
+            return value
+        except Exception as e:
+            entry = self._data.get(key)
+            if entry is not None and entry[1] + self.stale_ttl > time.monotonic():
+                CACHE_REQUESTS.labels(self.name, "stale").inc()
+                self.counts["stale"] += 1
+                future.set_result(entry[0])
+                return entry[0]
+            self.counts["error"] += 1
+            future.set_exception(e)
+            future.exception()  # 대기자가 없을 때 경고 방지
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # 대기자가 없을 때 경고 방지
+            raise
+        finally:
+            del self._loading[key]
+
+    def stats(self) -> Dict:
+        """
+        캐시 통계
+
+        Returns:
+            - hit / miss: 조회 적중/미적중 수
+            - stale: 갱신 실패로 만료된 값을 대신 응답한 수, error: 갱신 실패 후 오류를 전달한 수
+            - invalidate: 명시적 삭제 수
+            - size / expired: 보관 항목 수, 그중 유효 시간이 지난 항목 수
+            - max_age: 가장 오래된 항목의 나이 (초)
+        """
+        now = time.monotonic()
+        ages = [now - (expires - self.ttl) for _, expires in self._data.values()]
+        return {
+            "name": self.name,
+            "ttl": self.ttl,
+            "stale_ttl": self.stale_ttl,
+            **self.counts,
+            "size": len(self._data),
+            "expired": sum(1 for _, expires in self._data.values() if expires <= now),
+            "max_age": round(max(ages), 3) if ages else None,
+        }
+
+
+def cache_stats() -> List[Dict]:
+    """등록된 전체 캐시 통계"""
+    return [cache.stats() for cache in _caches.values()]
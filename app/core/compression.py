@@ -0,0 +1,140 @@
+"""
+응답 압축 (Accept-Encoding 협상)
+
+br(brotli 설치 시) > gzip 순으로 선택한다. 전체 본문 응답은 한 번에 압축하고,
+스트리밍 응답(NDJSON 등)은 청크마다 flush 해서 진행 상황이 지연되지 않도록 한다.
+"""
+import zlib
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - 선택 의존성
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "text/plain",
+    "text/html",
+    "text/csv",
+)
+
+
+def choose_encoding(accept_encoding: str) -> str:
+    """클라이언트 Accept-Encoding 에서 사용할 인코딩 선택 (없으면 빈 문자열)"""
+    accepted = set()
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.strip())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return ""
+
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._obj = brotli.Compressor(quality=brotli_quality)
+            self._compress = self._obj.process
+            self._flush = self._obj.flush
+            self._finish = self._obj.finish
+        else:
+            self._obj = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._compress = self._obj.compress
+            self._flush = lambda: self._obj.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = self._obj.flush
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compress(data) + self._flush()
+
+    def last(self, data: bytes) -> bytes:
+        return self._compress(data) + self._finish()
+
+
+class CompressionMiddleware:
+    """
+    응답 압축 ASGI 미들웨어
+
+    Args:
+        minimum_size: 이 크기(bytes) 미만의 단일 본문 응답은 압축하지 않음
+        gzip_level: gzip 압축 레벨
+        brotli_quality: brotli 압축 품질 (동적 응답이므로 속도 위주의 낮은 값 사용)
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 5, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept = ""
+        for key, value in scope["headers"]:
+            if key == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept) if accept else ""
+        if not encoding:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                headers = {k.lower(): v for k, v in start_message.get("headers", [])}
+                content_type = headers.get(b"content-type", b"").decode("latin-1")
+                compressible = (
+                    b"content-encoding" not in headers
+                    and content_type.split(";")[0].strip() in COMPRESSIBLE_TYPES
+                    and (more_body or len(body) >= self.minimum_size)
+                )
+                if not compressible:
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                vary = headers.get(b"vary")
+                raw_headers = [
+                    (k, v) for k, v in start_message.get("headers", [])
+                    if k.lower() not in (b"content-length", b"vary")
+                ]
+                raw_headers.append((b"content-encoding", encoding.encode()))
+                raw_headers.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+                if not more_body:
+                    body = compressor.last(body)
+                    raw_headers.append((b"content-length", str(len(body)).encode()))
+                    start_message["headers"] = raw_headers
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                start_message["headers"] = raw_headers
+                await send(start_message)
+
+            data = compressor.chunk(body) if more_body else compressor.last(body)
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
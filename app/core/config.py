@@ -0,0 +1,172 @@
+"""
+애플리케이션 설정
+
+.env 파일은 이 모듈에서 한 번만 로드하고, 모든 모듈은 get_settings() 로 설정을 조회한다.
+"""
+import os
+import tempfile
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+from dotenv import load_dotenv
+
+
+def _get_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass(frozen=True)
+class Settings:
+    # 업비트 API
+    upbit_api_url: str
+    access_key: Optional[str]
+    secret_key: Optional[str]
+
+    # 업비트 호출 안정성
+    upstream_connect_timeout: float  # 연결 타임아웃 (초)
+    upstream_timeout: float  # 기본 응답 타임아웃 (초)
+    upstream_timeouts: str  # 엔드포인트별 응답 타임아웃 (ex. /orders=10,/ticker=2)
+    upstream_retries: int  # GET 재시도 횟수
+    upstream_retry_backoff: float  # 재시도 대기 기준 시간 (초, 지수 증가 + 지터)
+    upstream_hedge_delay: float  # 시세 조회 응답이 이 시간(초) 안에 없으면 같은 요청을 한 번 더 보냄 (0: 사용 안 함)
+    upstream_breaker_failures: int  # 연속 실패 시 회로 차단 기준 횟수
+    upstream_breaker_reset: float  # 회로 차단 후 시험 호출까지 대기 시간 (초)
+    upstream_stale_ttl: float  # 업비트 장애 시 만료된 캐시를 대신 응답하는 최대 시간 (초)
+    batch_window: float  # 현재가/호가 요청을 모아 한 번에 호출하는 시간 (초, 0: 사용 안 함)
+
+    # 입출금
+    wallet_status_interval: float  # 입출금 현황 갱신 간격 (초, 스케줄러 작업)
+    wallet_status_max_age: float  # 입출금 현황이 이 시간(초)보다 오래되면 라우트에서 직접 조회
+    transfer_cache_ttls: str  # 입출금 정보 엔드포인트별 캐시 시간 (ex. withdraw_chance=5,coin_info=120)
+
+    # 잔고
+    balance_interval: float  # 잔고 변화 구독 중 기본 갱신 간격 (초)
+    balance_active_interval: float  # 잠긴 잔고(미체결 주문, 출금 대기)가 있을 때 갱신 간격 (초)
+
+    # 주문
+    order_validation: bool  # 주문 가능 정보로 주문을 미리 검증 (거부될 주문은 업비트 호출 없이 400)
+    order_chance_ttl: float  # 주문 가능 정보(/orders/chance) 캐시 유효 시간 (초)
+    order_poll_interval: float  # 접수된 주문의 체결 확인 첫 조회 간격 (초, 조회마다 두 배)
+    order_poll_max_interval: float  # 주문별 체결 확인 조회 간격 상한 (초)
+    order_latency_history: int  # 처리 시간을 보관하는 최근 주문 수
+    order_track_seconds: float  # 접수 후 체결 확인을 계속하는 최대 시간 (초)
+    order_unfilled_track_seconds: float  # 체결 없는 주문의 체결 확인을 계속하는 최대 시간 (초)
+
+    # 스케줄러
+    scheduler_enabled: bool
+    scheduler_start_delay: float  # 앱 시작 후 스케줄러 시작까지 대기 시간 (초)
+    scheduler_mode: str  # leader: 락을 얻은 워커 하나만 실행, all: 모든 워커에서 실행
+    scheduler_lock_file: str
+    leader_retry_interval: float  # 리더가 아닌 워커의 락 재시도 간격 (초)
+    shared_state_dir: str  # 워커 간 작업 결과 공유 디렉터리
+    scheduler_jobs_file: Optional[str]  # 작업 정의 JSON 파일 (기본 작업에 추가/덮어쓰기)
+
+    # 캐시
+    warmup_enabled: bool
+    market_cache_ttl: float  # 마켓 코드 캐시 유효 시간 (초)
+
+    # 공유 메모리 시세 스냅샷
+    snapshot_enabled: bool
+    snapshot_name: str
+    snapshot_capacity: int  # 최대 마켓 수
+    snapshot_interval: float  # 피더 갱신 간격 (초)
+    snapshot_max_age: float  # 이 시간(초)보다 오래된 스냅샷은 사용하지 않음
+    snapshot_orderbook_quotes: str  # 호가를 기록할 마켓 기준 화폐 (콤마 구분)
+
+    # 시세 저널
+    journal_enabled: bool
+    journal_dir: str
+    journal_max_bytes: int  # 세그먼트 최대 크기 (바이트)
+    journal_rotate_seconds: float  # 세그먼트 최대 기록 시간 (초)
+
+    # 로컬 캔들 집계
+    candle_history: int  # 단위별 보관 캔들 수
+    candle_max_lag: float  # 1분 캔들 수집이 이 시간(초) 이상 지연되면 최신 캔들은 업비트에서 조회
+    live_candle_history: int  # 체결 기반 실시간 캔들의 단위별 보관 캔들 수
+    live_candle_late: float  # 늦게 도착한 체결을 반영하는 허용 시간 (초)
+    live_candle_markets: str  # 기본 trade_sync 작업의 마켓 (콤마 구분, 빈 값: 작업 등록 안 함)
+    live_candle_interval: float  # 기본 trade_sync 작업 실행 간격 (초)
+
+    # 알림
+    alert_rules_file: Optional[str]  # 알림 규칙 JSON 파일 (없으면 유의/주의 지정 알림)
+    alert_webhook_url: Optional[str]
+
+    # 트레이싱 / 관리자
+    trace_sample_rate: float
+    trace_export_file: Optional[str]
+    trace_collector_url: Optional[str]
+    admin_token: Optional[str]
+
+
+@lru_cache()
+def get_settings() -> Settings:
+    """설정 조회 (최초 1회만 .env 로드)"""
+    load_dotenv()
+    return Settings(
+        upbit_api_url=os.getenv("UPBIT_API_URL", "https://api.upbit.com/v1"),
+        access_key=os.getenv("UPBIT_OPEN_API_ACCESS_KEY"),
+        secret_key=os.getenv("UPBIT_OPEN_API_SECRET_KEY"),
+        upstream_connect_timeout=float(os.getenv("UPSTREAM_CONNECT_TIMEOUT", "3.05")),
+        upstream_timeout=float(os.getenv("UPSTREAM_TIMEOUT", "5")),
+        upstream_timeouts=os.getenv("UPSTREAM_TIMEOUTS", ""),
+        upstream_retries=int(os.getenv("UPSTREAM_RETRIES", "2")),
+        upstream_retry_backoff=float(os.getenv("UPSTREAM_RETRY_BACKOFF", "0.1")),
+        upstream_hedge_delay=float(os.getenv("UPSTREAM_HEDGE_DELAY", "0")),
+        upstream_breaker_failures=int(os.getenv("UPSTREAM_BREAKER_FAILURES", "5")),
+        upstream_breaker_reset=float(os.getenv("UPSTREAM_BREAKER_RESET", "10")),
+        upstream_stale_ttl=float(os.getenv("UPSTREAM_STALE_TTL", "300")),
+        batch_window=float(os.getenv("BATCH_WINDOW", "0.005")),
+        wallet_status_interval=float(os.getenv("WALLET_STATUS_INTERVAL", "60")),
+        wallet_status_max_age=float(os.getenv("WALLET_STATUS_MAX_AGE", "180")),
+        transfer_cache_ttls=os.getenv("TRANSFER_CACHE_TTLS", ""),
+        balance_interval=float(os.getenv("BALANCE_INTERVAL", "30")),
+        balance_active_interval=float(os.getenv("BALANCE_ACTIVE_INTERVAL", "3")),
+        order_validation=_get_bool("ORDER_VALIDATION", True),
+        order_chance_ttl=float(os.getenv("ORDER_CHANCE_TTL", "3")),
+        order_poll_interval=float(os.getenv("ORDER_POLL_INTERVAL", "0.5")),
+        order_poll_max_interval=float(os.getenv("ORDER_POLL_MAX_INTERVAL", "30")),
+        order_latency_history=int(os.getenv("ORDER_LATENCY_HISTORY", "1000")),
+        order_track_seconds=float(os.getenv("ORDER_TRACK_SECONDS", "3600")),
+        order_unfilled_track_seconds=float(os.getenv("ORDER_UNFILLED_TRACK_SECONDS", "300")),
+        scheduler_enabled=_get_bool("SCHEDULER_ENABLED", True),
+        scheduler_start_delay=float(os.getenv("SCHEDULER_START_DELAY", "5")),
+        scheduler_mode=os.getenv("SCHEDULER_MODE", "leader"),
+        scheduler_lock_file=os.getenv(
+            "SCHEDULER_LOCK_FILE", os.path.join(tempfile.gettempdir(), "upbit-api", "scheduler.lock")
+        ),
+        leader_retry_interval=float(os.getenv("LEADER_RETRY_INTERVAL", "5")),
+        shared_state_dir=os.getenv(
+            "SHARED_STATE_DIR", os.path.join(tempfile.gettempdir(), "upbit-api", "shared")
+        ),
+        scheduler_jobs_file=os.getenv("SCHEDULER_JOBS_FILE"),
+        warmup_enabled=_get_bool("WARMUP_ENABLED", True),
+        market_cache_ttl=float(os.getenv("MARKET_CACHE_TTL", "30")),
+        snapshot_enabled=_get_bool("SNAPSHOT_ENABLED", False),
+        snapshot_name=os.getenv("SNAPSHOT_NAME", "upbit_snapshot"),
+        snapshot_capacity=int(os.getenv("SNAPSHOT_CAPACITY", "512")),
+        snapshot_interval=float(os.getenv("SNAPSHOT_INTERVAL", "2")),
+        snapshot_max_age=float(os.getenv("SNAPSHOT_MAX_AGE", "10")),
+        snapshot_orderbook_quotes=os.getenv("SNAPSHOT_ORDERBOOK_QUOTES", "KRW"),
+        journal_enabled=_get_bool("JOURNAL_ENABLED", False),
+        journal_dir=os.getenv(
+            "JOURNAL_DIR", os.path.join(tempfile.gettempdir(), "upbit-api", "journal")
+        ),
+        journal_max_bytes=int(os.getenv("JOURNAL_MAX_BYTES", str(64 * 1024 * 1024))),
+        journal_rotate_seconds=float(os.getenv("JOURNAL_ROTATE_SECONDS", "3600")),
+        candle_history=int(os.getenv("CANDLE_HISTORY", "400")),
+        candle_max_lag=float(os.getenv("CANDLE_MAX_LAG", "10")),
+        live_candle_history=int(os.getenv("LIVE_CANDLE_HISTORY", "200")),
+        live_candle_late=float(os.getenv("LIVE_CANDLE_LATE", "5")),
+        live_candle_markets=os.getenv("LIVE_CANDLE_MARKETS", ""),
+        live_candle_interval=float(os.getenv("LIVE_CANDLE_INTERVAL", "1")),
+        alert_rules_file=os.getenv("ALERT_RULES_FILE"),
+        alert_webhook_url=os.getenv("ALERT_WEBHOOK_URL"),
+        trace_sample_rate=float(os.getenv("TRACE_SAMPLE_RATE", "1.0")),
+        trace_export_file=os.getenv("TRACE_EXPORT_FILE"),
+        trace_collector_url=os.getenv("TRACE_COLLECTOR_URL"),
+        admin_token=os.getenv("ADMIN_TOKEN"),
+    )
@@ -0,0 +1,26 @@
+"""
+JSON 인코딩/디코딩
+
+orjson 이 설치되어 있으면 사용하고, 없으면 표준 json 모듈로 동작한다.
+dumps 는 항상 bytes(UTF-8)를 반환한다.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 선택 의존성
+    orjson = None
+
+
+if orjson is not None:
+    def loads(data):
+        return orjson.loads(data)
+
+    def dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+else:
+    def loads(data):
+        return json.loads(data)
+
+    def dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
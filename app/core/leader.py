@@ -0,0 +1,91 @@
+"""
+파일 락 기반 리더 선출
+
+여러 uvicorn 워커 중 락 파일을 먼저 잡은 프로세스 하나만 리더가 된다.
+락은 프로세스가 종료되면 OS가 해제하므로, 리더가 죽으면 다른 워커가 재시도 중에 락을 얻어
+리더를 이어받는다 (failover).
+"""
+import json
+import os
+import time
+from typing import Dict, Optional
+
+if os.name == "nt":  # pragma: no cover - Windows
+    import msvcrt
+
+    def _lock(fd: int) -> bool:
+        try:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def _unlock(fd: int):
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock(fd: int) -> bool:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    def _unlock(fd: int):
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+class FileLeaderElector:
+    def __init__(self, path: str):
+        """
+        Args:
+            path: 락 파일 경로 (모든 워커가 같은 경로를 사용해야 함)
+        """
+        self.path = path
+        self._fd: Optional[int] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._fd is not None
+
+    def try_acquire(self) -> bool:
+        """락 획득 시도 (획득하면 True, 이미 리더여도 True)"""
+        if self._fd is not None:
+            return True
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if not _lock(fd):
+            os.close(fd)
+            return False
+        self._fd = fd
+        self._write_info()
+        return True
+
+    def release(self):
+        if self._fd is None:
+            return
+        try:
+            _unlock(self._fd)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def _write_info(self):
+        # Windows 는 첫 바이트를 잠그므로 정보는 그 뒤에 기록
+        info = json.dumps({"pid": os.getpid(), "since": time.time()}).encode()
+        os.lseek(self._fd, 1, os.SEEK_SET)
+        os.write(self._fd, info)
+        os.ftruncate(self._fd, 1 + len(info))
+
+    def leader_info(self) -> Optional[Dict]:
+        """현재 리더 정보 (pid, since) - 리더가 없으면 None"""
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(1)
+                data = f.read()
+            return json.loads(data) if data else None
+        except (OSError, ValueError):
+            return None
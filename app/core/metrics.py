@@ -0,0 +1,359 @@
+"""
+Prometheus 텍스트 포맷 메트릭
+
+외부 라이브러리 없이 카운터/게이지/히스토그램을 기록하고 /metrics 에서 노출한다.
+요청 경로(hot path)에서는 라벨 조회(dict) + 버킷 탐색(bisect) 만 수행하도록 유지한다.
+"""
+import time
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+
+# 기본 지연시간 버킷 (초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """라벨 값에 해당하는 시계열 반환 (없으면 생성)"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name}: 라벨 개수가 맞지 않습니다 {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def clear(self):
+        with self._lock:
+            self._children.clear()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def expose(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def _samples(self):
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+            for key, child in list(self._children.items())
+        ]
+
+
+class _GaugeChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def _samples(self):
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+            for key, child in list(self._children.items())
+        ]
+
+
+class _HistogramChild:
+    __slots__ = ("upper_bounds", "counts", "sum", "count")
+
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        self.counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.upper_bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.upper_bounds = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.upper_bounds)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def _samples(self):
+        lines = []
+        for key, child in list(self._children.items()):
+            cumulative = 0
+            bounds = self.upper_bounds + (float("inf"),)
+            for bound, bucket_count in zip(bounds, list(child.counts)):
+                cumulative += bucket_count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+                )
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"이미 등록된 메트릭입니다: {metric.name}")
+        self._metrics[metric.name] = metric
+
+    def get(self, name: str) -> _Metric:
+        return self._metrics[name]
+
+    def generate_latest(self) -> str:
+        return "\n".join(m.expose() for m in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def generate_latest() -> str:
+    """등록된 전체 메트릭을 Prometheus 텍스트 포맷으로 반환"""
+    return REGISTRY.generate_latest()
+
+
+# ---------------------------------------------------------------------------
+# 애플리케이션 메트릭
+# ---------------------------------------------------------------------------
+
+HTTP_REQUESTS = Counter(
+    "upbit_http_requests_total",
+    "라우트별 요청 수",
+    ("method", "route", "status"),
+)
+HTTP_LATENCY = Histogram(
+    "upbit_http_request_duration_seconds",
+    "라우트별 요청 처리 시간",
+    ("method", "route"),
+)
+UPSTREAM_REQUESTS = Counter(
+    "upbit_upstream_requests_total",
+    "업비트 API 호출 수",
+    ("method", "endpoint", "status"),
+)
+UPSTREAM_LATENCY = Histogram(
+    "upbit_upstream_request_duration_seconds",
+    "업비트 API 엔드포인트별 응답 시간",
+    ("method", "endpoint"),
+)
+UPSTREAM_RETRIES = Counter(
+    "upbit_upstream_retries_total",
+    "업비트 API 재시도 수 (reason: 상태코드 또는 예외 이름)",
+    ("method", "endpoint", "reason"),
+)
+UPSTREAM_HEDGES = Counter(
+    "upbit_upstream_hedged_requests_total",
+    "지연된 시세 조회에 추가로 보낸 요청 수 (result: sent/won)",
+    ("endpoint", "result"),
+)
+UPSTREAM_BREAKER_STATE = Gauge(
+    "upbit_upstream_breaker_state",
+    "엔드포인트별 회로 차단기 상태 (0: 정상, 1: 차단, 2: 시험 호출)",
+    ("endpoint",),
+)
+BATCH_KEYS = Histogram(
+    "upbit_upstream_batch_keys",
+    "묶음 처리한 업비트 호출 한 번에 포함된 마켓 수",
+    ("batcher",),
+    buckets=(1, 2, 5, 10, 20, 50, 100),
+)
+RATE_LIMIT_REMAINING = Gauge(
+    "upbit_ratelimit_remaining",
+    "Remaining-Req 헤더 기준 남은 요청 수",
+    ("group", "window"),
+)
+RATE_LIMIT_WAIT = Histogram(
+    "upbit_ratelimit_wait_seconds",
+    "요청 수 제한 그룹별 호출 전 대기 시간",
+    ("group",),
+)
+CACHE_REQUESTS = Counter(
+    "upbit_cache_requests_total",
+    "캐시 조회 수 (result: hit/miss/stale)",
+    ("cache", "result"),
+)
+ORDER_LATENCY = Histogram(
+    "upbit_order_latency_seconds",
+    "주문 단계별 소요 시간 (stage: validate/sign/send/ack/submit/first_fill/fill/final)",
+    ("market", "ord_type", "stage"),
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 1800.0),
+)
+ORDER_REJECTS = Counter(
+    "upbit_order_rejected_total",
+    "사전 검증에서 거부한 주문 수 (reason: min_total/balance/ord_type/time_in_force 등)",
+    ("reason",),
+)
+JOB_DURATION = Histogram(
+    "upbit_scheduler_job_duration_seconds",
+    "스케줄러 작업 실행 시간",
+    ("job",),
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+JOB_RUNS = Counter(
+    "upbit_scheduler_job_runs_total",
+    "스케줄러 작업 실행 수 (result: success/error)",
+    ("job", "result"),
+)
+JOB_LAG = Histogram(
+    "upbit_scheduler_job_lag_seconds",
+    "예정 시각 대비 작업 시작 지연",
+    ("job",),
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0),
+)
+JOB_MISSED = Counter(
+    "upbit_scheduler_job_missed_total",
+    "실행되지 않은 작업 수 (reason: missed/max_instances)",
+    ("job", "reason"),
+)
+STARTUP_SECONDS = Gauge(
+    "upbit_startup_seconds",
+    "앱 시작 단계별 소요 시간 (phase: import/startup/warmup)",
+    ("phase",),
+)
+
+
+def record_rate_limit(header: str):
+    """
+    Remaining-Req 헤더 기록
+
+    Args:
+        header: 예) "group=default; min=1800; sec=29"
+    """
+    group = "default"
+    windows = []
+    for part in header.split(";"):
+        key, _, value = part.strip().partition("=")
+        if key == "group":
+            group = value
+        elif value.isdigit():
+            windows.append((key, int(value)))
+    for window, value in windows:
+        RATE_LIMIT_REMAINING.labels(group, window).set(value)
+
+
+def record_cache(cache: str, hit: bool):
+    """캐시 적중 여부 기록"""
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+class MetricsMiddleware:
+    """
+    라우트별 요청 수/지연시간/상태코드 기록 (ASGI 미들웨어)
+
+    route 라벨은 실제 경로가 아닌 라우트 템플릿(/api/upbit/candles/minutes/{unit})을
+    사용해 시계열 개수가 요청 값에 따라 늘어나지 않도록 한다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            HTTP_LATENCY.labels(method, path).observe(time.perf_counter() - start)
+            HTTP_REQUESTS.labels(method, path, str(status_code)).inc()
@@ -0,0 +1,56 @@
+"""
+샘플링 프로파일러
+
+별도 스레드에서 일정 간격으로 모든 스레드의 콜스택을 수집하고,
+flamegraph.pl / speedscope 에서 바로 열 수 있는 collapsed stack(folded) 포맷으로 반환한다.
+"""
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float = 0.005):
+        """
+        Args:
+            interval: 샘플링 간격 (초)
+        """
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.is_set():
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if thread_id not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.samples[";".join(reversed(stack))] += 1
+            self.sample_count += 1
+            time.sleep(self.interval)
+
+    def folded(self) -> str:
+        """collapsed stack 포맷 (한 줄에 "frame;frame;frame count")"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
@@ -0,0 +1,61 @@
+"""
+시세 응답 필드 선택(projection) / 컬럼형(columnar) 변환
+
+- fields: 필요한 필드만 남긴다 (ex. fields=market,trade_price,signed_change_rate)
+- layout=columns: 행(객체) 목록 대신 필드별 배열로 변환한다
+    [{"market": "KRW-BTC", "trade_price": 1}, ...] -> {"market": ["KRW-BTC", ...], "trade_price": [1, ...]}
+"""
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException
+
+from app.core import upstream
+from app.core.responses import FastJSONResponse, passthrough
+
+LAYOUTS = ("rows", "columns")
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """콤마 구분 필드 문자열을 목록으로 변환 (빈 값이면 None)"""
+    if not fields:
+        return None
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    return names or None
+
+
+def project(rows: List[Dict], fields: List[str]) -> List[Dict]:
+    """각 행에서 fields 에 해당하는 필드만 남긴다 (없는 필드는 제외)"""
+    return [{f: row[f] for f in fields if f in row} for row in rows]
+
+
+def to_columns(rows: List[Dict], fields: Optional[List[str]] = None) -> Dict[str, List]:
+    """행 목록을 필드별 배열로 변환 (fields 미지정 시 첫 행의 필드 순서 사용)"""
+    if fields is None:
+        fields = list(rows[0].keys()) if rows else []
+    return {f: [row.get(f) for row in rows] for f in fields}
+
+
+def shape_response(content: bytes, fields: Optional[str] = None, layout: str = "rows"):
+    """
+    업비트 응답을 요청 옵션에 맞게 반환
+
+    가공 옵션이 없으면 응답 바이트를 그대로 전달하고, 있을 때만 디코딩 후 가공한다.
+    """
+    if layout not in LAYOUTS:
+        raise HTTPException(status_code=400, detail=f"layout은 {', '.join(LAYOUTS)} 중 하나여야 합니다")
+    if not parse_fields(fields) and layout == "rows":
+        return passthrough(content)
+    return shape_data(upstream.decode(content), fields, layout)
+
+
+def shape_data(data, fields: Optional[str] = None, layout: str = "rows"):
+    """이미 디코딩된 데이터(캐시, 공유 메모리 등)를 요청 옵션에 맞게 반환"""
+    if layout not in LAYOUTS:
+        raise HTTPException(status_code=400, detail=f"layout은 {', '.join(LAYOUTS)} 중 하나여야 합니다")
+    names = parse_fields(fields)
+    rows = data if isinstance(data, list) else [data]
+    if names is not None:
+        rows = project(rows, names)
+    if layout == "columns":
+        return FastJSONResponse(to_columns(rows, names))
+    return FastJSONResponse(rows if isinstance(data, list) else rows[0])
@@ -0,0 +1,79 @@
+"""
+업비트 요청 수 제한 그룹별 토큰 버킷
+
+여러 업비트 호출을 동시에 보낼 때 그룹별 초당 허용 횟수 안에서만 보내도록 대기한다.
+(429 응답을 받은 뒤 재시도하는 대신, 보내기 전에 속도를 맞춤)
+
+    await ratelimit.acquire("order")   # 토큰이 생길 때까지 대기 후 호출
+
+Note:
+    - 제한은 워커(프로세스)별로 적용된다. 여러 워커로 실행하면 그룹 한도를 워커 수로 나눠 설정한다.
+    - 그룹별 한도는 업비트 Exchange API 기준 (default: 초당 30회, order: 초당 8회, order-cancel-all: 2초당 1회)
+"""
+import asyncio
+import time
+from typing import Dict, Tuple
+
+from app.core.metrics import RATE_LIMIT_WAIT
+
+# 그룹별 (초당 토큰 수, 최대 토큰 수)
+GROUP_LIMITS: Dict[str, Tuple[float, float]] = {
+    "default": (30.0, 30.0),
+    "order": (8.0, 8.0),
+    "order-cancel-all": (0.5, 1.0),
+}
+
+_buckets: Dict[str, "TokenBucket"] = {}
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        """
+        Args:
+            rate: 초당 채워지는 토큰 수
+            capacity: 최대 토큰 수 (한 번에 보낼 수 있는 요청 수)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = None
+        self._loop = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """토큰이 있으면 사용하고 True (대기하지 않음)"""
+        self._refill()
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return True
+        return False
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """토큰이 생길 때까지 대기 후 사용 (먼저 기다린 요청부터), 대기 시간(초) 반환"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # 이벤트 루프마다 잠금을 새로 만든다 (테스트/스레드별 루프)
+            self._lock, self._loop = asyncio.Lock(), loop
+        start = time.monotonic()
+        async with self._lock:
+            while not self.try_acquire(tokens):
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+        return time.monotonic() - start
+
+
+def get_bucket(group: str) -> TokenBucket:
+    bucket = _buckets.get(group)
+    if bucket is None:
+        rate, capacity = GROUP_LIMITS.get(group, GROUP_LIMITS["default"])
+        bucket = _buckets[group] = TokenBucket(rate, capacity)
+    return bucket
+
+
+async def acquire(group: str = "default"):
+    """그룹 토큰 1개 사용 (대기 시간은 upbit_ratelimit_wait_seconds 메트릭에 기록)"""
+    RATE_LIMIT_WAIT.labels(group).observe(await get_bucket(group).acquire())
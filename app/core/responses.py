@@ -0,0 +1,25 @@
+"""
+JSON 응답 클래스
+
+- RawJSONResponse: 업비트 응답 바이트를 재파싱/재직렬화 없이 그대로 전달
+- FastJSONResponse: 가공이 필요한 응답을 jsonutil.dumps(orjson)로 직렬화
+"""
+from fastapi.responses import Response
+
+from app.core import jsonutil
+
+
+class RawJSONResponse(Response):
+    media_type = "application/json"
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return jsonutil.dumps(content)
+
+
+def passthrough(content: bytes) -> RawJSONResponse:
+    """업비트 응답 본문을 그대로 반환 (JSON 파싱/직렬화 생략)"""
+    return RawJSONResponse(content=content)
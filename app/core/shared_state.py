@@ -0,0 +1,57 @@
+"""
+워커 간 작업 결과 공유
+
+리더 워커가 작업 결과를 JSON 파일로 기록(임시 파일 작성 후 교체)하면,
+다른 워커는 파일이 변경되었을 때만 다시 읽어 같은 결과를 제공한다.
+"""
+import os
+import tempfile
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from app.core import jsonutil
+from app.core.config import get_settings
+
+# 이름별 (mtime, 데이터) 캐시
+_cache: Dict[str, Tuple[float, Any]] = {}
+
+
+def _path(name: str) -> str:
+    return os.path.join(get_settings().shared_state_dir, f"{name}.json")
+
+
+def publish(name: str, data: Any):
+    """
+    작업 결과 기록
+
+    Args:
+        name: 결과 이름 (ex. market_monitor)
+        data: JSON 직렬화 가능한 값
+    """
+    directory = get_settings().shared_state_dir
+    os.makedirs(directory, exist_ok=True)
+    payload = jsonutil.dumps({"updated_at": time.time(), "pid": os.getpid(), "data": data})
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=f".{name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+        os.replace(tmp, _path(name))
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def read(name: str) -> Optional[Dict]:
+    """작업 결과 조회 (updated_at, pid, data) - 아직 결과가 없으면 None"""
+    path = _path(name)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    cached = _cache.get(name)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(path, "rb") as f:
+        value = jsonutil.loads(f.read())
+    _cache[name] = (mtime, value)
+    return value
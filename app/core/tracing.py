@@ -0,0 +1,236 @@
+"""
+경량 트레이싱
+
+요청(또는 스케줄러 작업)마다 루트 스팬을 열고, 그 안에서 JWT 서명 / 업비트 호출 /
+JSON 디코딩 / 후처리 구간을 자식 스팬으로 기록한다.
+완료된 트레이스는 최근 목록(메모리)에 보관되며, 설정에 따라 파일(JSON Lines)이나
+수집기(HTTP POST)로 내보낸다.
+
+환경 변수 (app.core.config):
+    TRACE_SAMPLE_RATE: 샘플링 비율 (0.0 ~ 1.0, default: 1.0)
+    TRACE_EXPORT_FILE: 트레이스를 기록할 JSON Lines 파일 경로
+    TRACE_COLLECTOR_URL: 트레이스를 전송할 수집기 URL
+"""
+import json
+import queue
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Dict, List, Optional
+
+import requests
+
+from app.core.config import get_settings
+
+settings = get_settings()
+TRACE_SAMPLE_RATE = settings.trace_sample_rate
+
+# 최근 완료된 트레이스 (조회용)
+RECENT_TRACES: deque = deque(maxlen=200)
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start", "_start_perf",
+                 "duration", "attributes", "error")
+
+    def __init__(self, trace_id: str, parent_id: Optional[str], name: str, attributes: Dict):
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.start = time.time()
+        self._start_perf = time.perf_counter()
+        self.duration = 0.0
+        self.attributes = attributes
+        self.error = None
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round(self.duration * 1000, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _Trace:
+    __slots__ = ("trace_id", "sampled", "spans")
+
+    def __init__(self, sampled: bool):
+        self.trace_id = uuid.uuid4().hex if sampled else ""
+        self.sampled = sampled
+        self.spans: List[Span] = []
+
+
+_current: ContextVar = ContextVar("upbit_trace", default=None)
+
+
+def current_trace_id() -> Optional[str]:
+    """현재 컨텍스트의 트레이스 ID (샘플링되지 않았으면 None)"""
+    current = _current.get()
+    if current is None or not current[0].sampled:
+        return None
+    return current[0].trace_id
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    스팬 기록
+
+    현재 트레이스가 없으면 새 루트 스팬을 만들고, 루트 스팬이 끝날 때 트레이스를 내보낸다.
+
+    Args:
+        name: 스팬 이름 (ex. upstream, sign, decode)
+        **attributes: 스팬 속성
+    """
+    current = _current.get()
+    if current is None:
+        trace = _Trace(random.random() < TRACE_SAMPLE_RATE)
+        parent = None
+    else:
+        trace, parent = current
+
+    if not trace.sampled:
+        token = _current.set((trace, None)) if current is None else None
+        try:
+            yield None
+        finally:
+            if token is not None:
+                _current.reset(token)
+        return
+
+    s = Span(trace.trace_id, parent.span_id if parent else None, name, attributes)
+    token = _current.set((trace, s))
+    try:
+        yield s
+    except BaseException as e:
+        s.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        s.duration = time.perf_counter() - s._start_perf
+        _current.reset(token)
+        trace.spans.append(s)
+        if parent is None:
+            _finish(trace)
+
+
+def traced(name: str):
+    """코루틴 함수 실행 구간을 스팬으로 기록하는 데코레이터"""
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            with span(name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _finish(trace: _Trace):
+    spans = [s.to_dict() for s in trace.spans]
+    RECENT_TRACES.append(spans)
+    exporter = _get_exporter()
+    if exporter is not None:
+        exporter.submit(spans)
+
+
+def recent_traces(limit: int = 50, min_duration_ms: float = 0.0) -> List[List[Dict]]:
+    """최근 트레이스 목록 (루트 스팬 기준 최신순)"""
+    result = []
+    for spans in reversed(RECENT_TRACES):
+        root = spans[-1]
+        if root["duration_ms"] >= min_duration_ms:
+            result.append(spans)
+            if len(result) >= limit:
+                break
+    return result
+
+
+class _Exporter:
+    """백그라운드 스레드에서 파일/수집기로 트레이스 전송 (요청 경로를 막지 않음)"""
+
+    def __init__(self, path: Optional[str], url: Optional[str]):
+        self.path = path
+        self.url = url
+        self.queue: queue.Queue = queue.Queue(maxsize=10000)
+        threading.Thread(target=self._run, name="trace-exporter", daemon=True).start()
+
+    def submit(self, spans: List[Dict]):
+        try:
+            self.queue.put_nowait(spans)
+        except queue.Full:
+            pass
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < 100:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                if self.path:
+                    with open(self.path, "a", encoding="utf-8") as f:
+                        for spans in batch:
+                            for s in spans:
+                                f.write(json.dumps(s, ensure_ascii=False) + "\n")
+                if self.url:
+                    requests.post(
+                        self.url,
+                        json={"spans": [s for spans in batch for s in spans]},
+                        timeout=5
+                    )
+            except Exception as e:
+                print(f"Error in trace exporter: {str(e)}")
+
+
+_exporter: Optional[_Exporter] = None
+
+
+def _get_exporter() -> Optional[_Exporter]:
+    """내보내기 설정이 있을 때만 최초 호출 시 전송 스레드 생성"""
+    global _exporter
+    if _exporter is None and (settings.trace_export_file or settings.trace_collector_url):
+        _exporter = _Exporter(settings.trace_export_file, settings.trace_collector_url)
+    return _exporter
+
+
+class TracingMiddleware:
+    """요청마다 루트 스팬을 열고 응답 헤더(X-Trace-Id)로 트레이스 ID를 반환 (ASGI 미들웨어)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with span("request", method=scope["method"], path=scope["path"]) as root:
+            async def send_wrapper(message):
+                if root is not None and message["type"] == "http.response.start":
+                    root.set_attribute("status", message["status"])
+                    message.setdefault("headers", [])
+                    message["headers"] = list(message["headers"]) + [
+                        (b"x-trace-id", root.trace_id.encode())
+                    ]
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+            if root is not None:
+                route = scope.get("route")
+                root.name = f"{scope['method']} {getattr(route, 'path', scope['path'])}"
@@ -0,0 +1,305 @@
+"""
+업비트 API 호출 공통 모듈
+
+모든 라우터의 업비트 호출은 이 모듈을 거친다.
+- requests.Session 재사용으로 커넥션(keep-alive) 유지
+- 엔드포인트별 응답 시간/상태코드, Remaining-Req 헤더 메트릭 기록
+- 호출/디코딩 구간 트레이싱 스팬(upstream, decode) 기록
+- 엔드포인트별 타임아웃, GET 재시도(지수 대기 + 지터), 시세 조회 헤지 요청, 엔드포인트별 회로 차단
+
+재시도는 멱등인 GET 만 한다. 주문/출금 등 POST/DELETE 는 서버에 요청이 전달되지 않은 것이
+확실한 연결 타임아웃(ConnectTimeout)일 때만 다시 보낸다.
+인증 요청은 JWT nonce 를 다시 쓸 수 없으므로 sign(시도마다 인증 헤더 생성)을 넘긴 경우에만 재시도한다.
+호출은 블로킹이므로 async 라우트에서는 asyncio.to_thread 로 실행한다.
+"""
+import contextvars
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from fastapi import HTTPException
+
+from app.core import jsonutil
+from app.core.config import get_settings
+from app.core.metrics import (
+    UPSTREAM_BREAKER_STATE, UPSTREAM_HEDGES, UPSTREAM_LATENCY, UPSTREAM_REQUESTS, UPSTREAM_RETRIES,
+    record_rate_limit,
+)
+from app.core.tracing import span
+
+UPBIT_API_URL = get_settings().upbit_api_url
+
+# 엔드포인트(경로 접두사)별 기본 응답 타임아웃 (초) - UPSTREAM_TIMEOUTS 로 덮어쓰기
+TIMEOUTS = {
+    "/ticker": 3.0,
+    "/orderbook": 3.0,
+    "/trades/ticks": 3.0,
+    "/candles": 5.0,
+    "/orders": 10.0,
+    "/withdraws": 10.0,
+    "/deposits": 10.0,
+}
+# 헤지 요청 대상 (시세 조회)
+HEDGE_ENDPOINTS = ("/ticker", "/orderbook", "/trades/ticks", "/candles", "/market/all")
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS")
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MAX_BACKOFF = 2.0
+
+_session = None
+_executor = None
+_timeouts: Optional[Dict[str, float]] = None
+_breakers: Dict[str, "CircuitBreaker"] = {}
+_breakers_lock = threading.Lock()
+
+
+class UpstreamUnavailable(requests.exceptions.ConnectionError):
+    """회로 차단 중이라 업비트를 호출하지 않음"""
+
+
+class UpstreamNotFound(LookupError):
+    """업비트 응답에 요청한 코드가 없음 (잘못된 코드에 대한 업비트 404 와 같게 처리)"""
+
+
+class CircuitBreaker:
+    """
+    엔드포인트 회로 차단기
+
+    연속 failures 회 실패(연결 오류/타임아웃/5xx)하면 reset 초 동안 호출하지 않고 바로 실패한다.
+    이후 한 번의 시험 호출이 성공하면 정상 상태로 돌아가고, 실패하면 다시 차단한다.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 0, 1, 2
+
+    def __init__(self, endpoint: str, failures: int, reset: float):
+        self.endpoint = endpoint
+        self.failures = failures
+        self.reset = reset
+        self.state = self.CLOSED
+        self._count = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset:
+                self._set(self.HALF_OPEN)
+                return True
+            return False
+
+    def record(self, success: bool):
+        with self._lock:
+            if success:
+                self._count = 0
+                if self.state != self.CLOSED:
+                    self._set(self.CLOSED)
+                return
+            self._count += 1
+            if self.state == self.HALF_OPEN or self._count >= self.failures:
+                self._opened_at = time.monotonic()
+                self._set(self.OPEN)
+
+    def _set(self, state: int):
+        self.state = state
+        UPSTREAM_BREAKER_STATE.labels(self.endpoint).set(state)
+
+
+def get_session() -> requests.Session:
+    """공용 세션 (최초 호출 시 생성)"""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+    return _session
+
+
+def endpoint_of(url: str) -> str:
+    """메트릭 라벨용 엔드포인트 경로 (ex. https://api.upbit.com/v1/ticker -> /ticker)"""
+    if url.startswith(UPBIT_API_URL):
+        return url[len(UPBIT_API_URL):].split("?", 1)[0] or "/"
+    return urlsplit(url).path or "/"
+
+
+def get_breaker(endpoint: str) -> CircuitBreaker:
+    breaker = _breakers.get(endpoint)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(endpoint)
+            if breaker is None:
+                settings = get_settings()
+                breaker = _breakers[endpoint] = CircuitBreaker(
+                    endpoint, settings.upstream_breaker_failures, settings.upstream_breaker_reset
+                )
+    return breaker
+
+
+def timeout_for(endpoint: str) -> tuple:
+    """(연결, 응답) 타임아웃 - 가장 길게 일치하는 경로 접두사 기준"""
+    global _timeouts
+    settings = get_settings()
+    if _timeouts is None:
+        timeouts = dict(TIMEOUTS)
+        for item in settings.upstream_timeouts.split(","):
+            if "=" in item:
+                prefix, seconds = item.split("=", 1)
+                timeouts[prefix.strip()] = float(seconds)
+        _timeouts = timeouts
+    matched = max((p for p in _timeouts if endpoint.startswith(p)), key=len, default=None)
+    read = _timeouts[matched] if matched else settings.upstream_timeout
+    return (settings.upstream_connect_timeout, read)
+
+
+def _retryable_error(error: Exception, idempotent: bool) -> bool:
+    if idempotent:
+        return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+    return isinstance(error, requests.exceptions.ConnectTimeout)
+
+
+def request(method: str, url: str, retry: Optional[bool] = None, hedge: Optional[bool] = None,
+            sign: Optional[Callable[[], Dict[str, str]]] = None, **kwargs) -> requests.Response:
+    """
+    업비트 API 호출
+
+    Args:
+        method: HTTP 메서드
+        url: 요청 URL
+        retry: 재시도 여부 (기본: GET 만 재시도, False 면 재시도 안 함)
+        hedge: 헤지 요청 여부 (기본: UPSTREAM_HEDGE_DELAY > 0 이고 시세 조회 GET 일 때)
+        sign: 시도마다 인증 헤더를 새로 만드는 함수 (없이 Authorization 헤더만 넘기면 재시도/헤지 안 함)
+        **kwargs: requests.Session.request 인자 (params, json, headers, timeout 등)
+
+    Raises:
+        UpstreamUnavailable: 회로 차단 중
+    """
+    settings = get_settings()
+    endpoint = endpoint_of(url)
+    kwargs.setdefault("timeout", timeout_for(endpoint))
+    idempotent = method.upper() in IDEMPOTENT_METHODS
+    headers = kwargs.pop("headers", None) or {}
+    # 이미 서명한 요청을 다시 보내면 nonce 중복으로 거부됨
+    presigned = sign is None and "Authorization" in headers
+    attempts = 1 + settings.upstream_retries if retry is not False and not presigned else 1
+    if hedge is None:
+        hedge = (idempotent and sign is None and not presigned and settings.upstream_hedge_delay > 0
+                 and endpoint.startswith(HEDGE_ENDPOINTS))
+    breaker = get_breaker(endpoint)
+
+    for attempt in range(attempts):
+        if not breaker.allow():
+            raise UpstreamUnavailable(f"업비트 {endpoint} 호출이 일시 중단되었습니다 (연속 실패)")
+        kwargs["headers"] = {**headers, **sign()} if sign is not None else headers
+        last = attempt == attempts - 1
+        try:
+            if hedge:
+                response = _send_hedged(method, url, endpoint, settings.upstream_hedge_delay, **kwargs)
+            else:
+                response = _send(method, url, endpoint, **kwargs)
+        except requests.exceptions.RequestException as e:
+            breaker.record(False)
+            if last or not _retryable_error(e, idempotent):
+                raise
+            reason = type(e).__name__
+        else:
+            breaker.record(response.status_code < 500)
+            if last or not idempotent or response.status_code not in RETRY_STATUSES:
+                return response
+            reason = str(response.status_code)
+        UPSTREAM_RETRIES.labels(method, endpoint, reason).inc()
+        # 지수 증가 대기 + 전체 지터 (동시에 실패한 요청이 같은 시각에 몰리지 않도록)
+        time.sleep(random.uniform(0, min(MAX_BACKOFF, settings.upstream_retry_backoff * 2 ** attempt)))
+
+
+def _send_hedged(method: str, url: str, endpoint: str, delay: float, **kwargs) -> requests.Response:
+    """delay 초 안에 응답이 없으면 같은 요청을 한 번 더 보내고 먼저 온 응답 사용"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="upstream-hedge")
+    first = _executor.submit(contextvars.copy_context().run, _send, method, url, endpoint, **kwargs)
+    try:
+        return first.result(timeout=delay)
+    except FutureTimeout:
+        pass
+    second = _executor.submit(contextvars.copy_context().run, _send, method, url, endpoint, **kwargs)
+    UPSTREAM_HEDGES.labels(endpoint, "sent").inc()
+    pending = {first, second}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                response = future.result()
+            except requests.exceptions.RequestException as e:
+                error = e
+                continue
+            if future is second:
+                UPSTREAM_HEDGES.labels(endpoint, "won").inc()
+            return response
+    raise error
+
+
+def _send(method: str, url: str, endpoint: str, **kwargs) -> requests.Response:
+    start = time.perf_counter()
+    status = "error"
+    try:
+        with span("upstream", method=method, endpoint=endpoint) as s:
+            response = get_session().request(method, url, **kwargs)
+            status = str(response.status_code)
+            if s is not None:
+                s.set_attribute("status", response.status_code)
+                s.set_attribute("bytes", len(response.content))
+        remaining = response.headers.get("Remaining-Req")
+        if remaining:
+            record_rate_limit(remaining)
+        return response
+    finally:
+        UPSTREAM_LATENCY.labels(method, endpoint).observe(time.perf_counter() - start)
+        UPSTREAM_REQUESTS.labels(method, endpoint, status).inc()
+
+
+def error_response(error: Exception) -> HTTPException:
+    """
+    라우트 예외를 응답 상태코드로 변환
+
+    - 업비트 4xx 응답: 같은 상태코드, 5xx 응답/연결 오류: 502
+    - 응답 타임아웃: 504, 회로 차단 중: 503, 응답에 요청한 코드가 없음: 404
+    - 그 외(요청 값 오류 등): 400
+    """
+    if isinstance(error, HTTPException):
+        return error
+    if isinstance(error, UpstreamUnavailable):
+        status = 503
+    elif isinstance(error, requests.exceptions.Timeout):
+        status = 504
+    elif isinstance(error, UpstreamNotFound):
+        status = 404
+    elif isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        status = error.response.status_code if error.response.status_code < 500 else 502
+    elif isinstance(error, requests.exceptions.RequestException):
+        status = 502
+    else:
+        status = 400
+    return HTTPException(status_code=status, detail=str(error))
+
+
+def decode(response):
+    """응답(또는 응답 본문 bytes) JSON 디코딩 (트레이싱 decode 스팬 기록)"""
+    content = response if isinstance(response, (bytes, bytearray)) else response.content
+    with span("decode"):
+        return jsonutil.loads(content)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def delete(url: str, **kwargs) -> requests.Response:
+    return request("DELETE", url, **kwargs)
@@ -0,0 +1,338 @@
+"""
+마켓 상태 변화 알림
+
+이전 조회 결과(마켓별 유의/주의 상태, 현재가)를 보관하고 새 조회 결과와 비교해
+바뀐 마켓에서만 전이(transition)를 만든다. 규칙은 이벤트 종류/마켓별로 색인해 두므로
+규칙 평가 비용은 전체 마켓 수가 아니라 변화 수에 비례한다.
+
+전이 종류 (event):
+    warning_on / warning_off: 유의 종목 지정/해제
+    caution_on / caution_off: 주의 종목 유형(PRICE_FLUCTUATIONS 등) 지정/해제
+    price_above / price_below: 규칙의 가격(price)을 상향/하향 돌파
+    listed / delisted: 마켓 추가/삭제
+
+입출금 현황 변화(wallet_state / block_state, rule: wallet_status)는 app.trading.wallet 에서 만들어
+같은 싱크로 보낸다 (market 에 화폐 코드, prev / state 에 이전/현재 상태).
+
+규칙 파일 (ALERT_RULES_FILE, JSON 목록):
+    [{"name": "btc-100m", "event": "price_above", "markets": ["KRW-BTC"], "price": 100000000,
+      "sinks": ["log", "webhook"]},
+     {"name": "krw-caution", "event": "caution_on", "quote": "KRW", "caution": "PRICE_FLUCTUATIONS"}]
+"""
+import json
+import queue
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import requests
+
+from app.core import shared_state
+from app.core.config import get_settings
+
+EVENTS = ("warning_on", "warning_off", "caution_on", "caution_off",
+          "price_above", "price_below", "listed", "delisted")
+
+# 주의 종목 유형 (market_event.caution 키)
+CAUTION_TYPES = ("PRICE_FLUCTUATIONS", "TRADING_VOLUME_SOARING", "DEPOSIT_AMOUNT_SOARING",
+                 "GLOBAL_PRICE_DIFFERENCES", "CONCENTRATION_OF_SMALL_ACCOUNTS")
+
+
+@dataclass(frozen=True)
+class AlertRule:
+    name: str
+    event: str
+    markets: Optional[FrozenSet[str]] = None  # 없으면 전체 마켓
+    quote: Optional[str] = None  # 마켓 기준 화폐 (ex. KRW)
+    caution: Optional[str] = None  # caution_on/off 에서 특정 유형만
+    price: Optional[float] = None  # price_above/below 기준 가격
+    sinks: Tuple[str, ...] = ("log", "push")
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "AlertRule":
+        event = data["event"]
+        if event not in EVENTS:
+            raise ValueError(f"지원하지 않는 이벤트입니다: {event}")
+        if event in ("price_above", "price_below") and data.get("price") is None:
+            raise ValueError(f"{event} 규칙은 price 가 필요합니다")
+        if data.get("caution") and data["caution"] not in CAUTION_TYPES:
+            raise ValueError(f"지원하지 않는 주의 유형입니다: {data['caution']}")
+        markets = data.get("markets")
+        return cls(
+            name=data.get("name", event),
+            event=event,
+            markets=frozenset(markets) if markets else None,
+            quote=data.get("quote"),
+            caution=data.get("caution"),
+            price=float(data["price"]) if data.get("price") is not None else None,
+            sinks=tuple(data.get("sinks", ("log", "push"))),
+        )
+
+    def matches(self, market: str, caution: Optional[str]) -> bool:
+        if self.markets is not None and market not in self.markets:
+            return False
+        if self.quote is not None and not market.startswith(self.quote + "-"):
+            return False
+        if self.caution is not None and caution != self.caution:
+            return False
+        return True
+
+
+# 기본 규칙: 유의/주의 종목 지정
+DEFAULT_RULES = (
+    AlertRule("warning", "warning_on"),
+    AlertRule("caution", "caution_on"),
+)
+
+
+class MarketState:
+    __slots__ = ("warning", "cautions", "price")
+
+    def __init__(self, warning: bool, cautions: FrozenSet[str], price: Optional[float]):
+        self.warning = warning
+        self.cautions = cautions
+        self.price = price
+
+    def __eq__(self, other):
+        return (self.warning == other.warning and self.cautions == other.cautions
+                and self.price == other.price)
+
+
+def market_states(markets: Iterable[Dict], tickers: Iterable[Dict] = ()) -> Dict[str, MarketState]:
+    """
+    마켓 코드(isDetails=true) + 현재가 응답으로 마켓별 상태 생성
+
+    Args:
+        markets: /market/all?isDetails=true 응답
+        tickers: /ticker 응답 (없는 마켓은 가격 비교를 하지 않음)
+    """
+    prices = {t["market"]: t["trade_price"] for t in tickers}
+    states = {}
+    for m in markets:
+        event = m.get("market_event") or {}
+        caution = event.get("caution") or {}
+        states[m["market"]] = MarketState(
+            bool(event.get("warning")),
+            frozenset(k for k, v in caution.items() if v),
+            prices.get(m["market"]),
+        )
+    return states
+
+
+class AlertEngine:
+    """
+    마켓 상태 비교 및 규칙 평가
+
+    첫 update 는 기준 상태만 기록하고 알림을 만들지 않는다.
+    """
+
+    def __init__(self, rules: Iterable[AlertRule] = DEFAULT_RULES):
+        self.rules = list(rules)
+        self._by_event: Dict[str, List[AlertRule]] = defaultdict(list)
+        self._price_by_market: Dict[Optional[str], List[AlertRule]] = defaultdict(list)
+        for rule in self.rules:
+            if rule.event in ("price_above", "price_below"):
+                if rule.markets is None:
+                    self._price_by_market[None].append(rule)
+                else:
+                    for market in rule.markets:
+                        self._price_by_market[market].append(rule)
+            else:
+                self._by_event[rule.event].append(rule)
+        self._states: Optional[Dict[str, MarketState]] = None
+
+    def update(self, states: Dict[str, MarketState]) -> List[Dict]:
+        """
+        새 상태 반영 후 규칙에 걸린 알림 목록 반환
+
+        Returns:
+            - rule / event / market: 규칙 이름, 전이 종류, 마켓 코드
+            - caution: 주의 유형 (caution_on/off)
+            - price / prev_price / threshold: 현재가, 이전 가격, 돌파한 가격 (price_above/below)
+            - sinks: 전달할 싱크 목록
+        """
+        previous, self._states = self._states, states
+        if previous is None:
+            return []
+
+        alerts = []
+        listed = 0
+        for market, new in states.items():
+            old = previous.get(market)
+            if old is None:
+                listed += 1
+                self._emit(alerts, "listed", market, new)
+            elif old != new:
+                self._diff(alerts, market, old, new)
+        # 새 마켓을 제외한 수가 이전보다 적을 때만 삭제된 마켓 탐색
+        if len(states) - listed < len(previous):
+            for market in previous.keys() - states.keys():
+                self._emit(alerts, "delisted", market, previous[market])
+        return alerts
+
+    def _diff(self, alerts: List[Dict], market: str, old: MarketState, new: MarketState):
+        if old.warning != new.warning:
+            self._emit(alerts, "warning_on" if new.warning else "warning_off", market, new)
+        if old.cautions != new.cautions:
+            for caution in new.cautions - old.cautions:
+                self._emit(alerts, "caution_on", market, new, caution=caution)
+            for caution in old.cautions - new.cautions:
+                self._emit(alerts, "caution_off", market, new, caution=caution)
+        if old.price != new.price and old.price is not None and new.price is not None:
+            rules = self._price_by_market.get(market, []) + self._price_by_market.get(None, [])
+            for rule in rules:
+                if not rule.matches(market, None):
+                    continue
+                if rule.event == "price_above" and old.price < rule.price <= new.price:
+                    alerts.append(self._alert(rule, market, new, prev_price=old.price))
+                elif rule.event == "price_below" and old.price > rule.price >= new.price:
+                    alerts.append(self._alert(rule, market, new, prev_price=old.price))
+
+    def _emit(self, alerts: List[Dict], event: str, market: str, state: MarketState,
+              caution: Optional[str] = None):
+        for rule in self._by_event.get(event, ()):
+            if rule.matches(market, caution):
+                alerts.append(self._alert(rule, market, state, event=event, caution=caution))
+
+    @staticmethod
+    def _alert(rule: AlertRule, market: str, state: MarketState, event: Optional[str] = None,
+               caution: Optional[str] = None, prev_price: Optional[float] = None) -> Dict:
+        alert = {
+            "time": time.time(),
+            "rule": rule.name,
+            "event": event or rule.event,
+            "market": market,
+            "price": state.price,
+            "sinks": rule.sinks,
+        }
+        if caution is not None:
+            alert["caution"] = caution
+        if prev_price is not None:
+            alert["prev_price"] = prev_price
+            alert["threshold"] = rule.price
+        return alert
+
+
+# ---------------------------------------------------------------------------
+# 싱크
+# ---------------------------------------------------------------------------
+
+class LogSink:
+    """표준 출력으로 알림 출력"""
+
+    def emit(self, alerts: List[Dict]):
+        for a in alerts:
+            if "state" in a:
+                detail = f"{a.get('net_type')} {a['prev']} -> {a['state']}"
+            else:
+                detail = a.get("caution") or (f"{a.get('prev_price')} -> {a['price']}"
+                                              if "threshold" in a else a.get("price"))
+            print(f"[알림] {a['market']} {a['event']} ({a['rule']}) {detail}")
+
+
+class WebhookSink:
+    """웹훅 URL 로 알림 전송 (백그라운드 스레드 - 스케줄러 작업을 막지 않음)"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.queue: queue.Queue = queue.Queue(maxsize=1000)
+        threading.Thread(target=self._run, name="alert-webhook", daemon=True).start()
+
+    def emit(self, alerts: List[Dict]):
+        try:
+            self.queue.put_nowait(alerts)
+        except queue.Full:
+            pass
+
+    def _run(self):
+        while True:
+            alerts = self.queue.get()
+            try:
+                requests.post(self.url, json={"alerts": alerts}, timeout=5)
+            except Exception as e:
+                print(f"Error in alert webhook: {str(e)}")
+
+
+class PushSink:
+    """
+    최근 알림을 공유 상태(alerts)에 기록
+
+    모든 워커에서 GET /api/upbit/alerts, /api/upbit/alerts/stream 으로 조회/구독할 수 있다.
+    """
+
+    def __init__(self, name: str = "alerts", maxlen: int = 200):
+        self.name = name
+        self.maxlen = maxlen
+        previous = shared_state.read(name)
+        self.recent: List[Dict] = list(previous["data"]) if previous else []
+        self.last_id = self.recent[-1]["id"] if self.recent else 0
+
+    def emit(self, alerts: List[Dict]):
+        for a in alerts:
+            self.last_id += 1
+            self.recent.append({"id": self.last_id, **a})
+        del self.recent[:-self.maxlen]
+        shared_state.publish(self.name, self.recent)
+
+
+_sinks: Dict[str, object] = {}
+
+
+def register_sink(name: str, sink):
+    """싱크 등록 (emit(alerts) 메서드를 가진 객체)"""
+    _sinks[name] = sink
+
+
+def get_sink(name: str):
+    """싱크 조회 (기본 싱크는 최초 조회 시 생성)"""
+    sink = _sinks.get(name)
+    if sink is None:
+        if name == "log":
+            sink = LogSink()
+        elif name == "push":
+            sink = PushSink()
+        elif name == "webhook" and get_settings().alert_webhook_url:
+            sink = WebhookSink(get_settings().alert_webhook_url)
+        else:
+            return None
+        _sinks[name] = sink
+    return sink
+
+
+def dispatch(alerts: List[Dict]):
+    """알림을 규칙에 지정된 싱크별로 모아 전달"""
+    by_sink: Dict[str, List[Dict]] = defaultdict(list)
+    for a in alerts:
+        item = {k: v for k, v in a.items() if k != "sinks"}
+        for name in a["sinks"]:
+            by_sink[name].append(item)
+    for name, items in by_sink.items():
+        sink = get_sink(name)
+        if sink is None:
+            continue
+        try:
+            sink.emit(items)
+        except Exception as e:
+            print(f"Error in alert sink {name}: {str(e)}")
+
+
+def load_rules() -> List[AlertRule]:
+    """알림 규칙 조회 (ALERT_RULES_FILE 이 없으면 기본 규칙)"""
+    path = get_settings().alert_rules_file
+    if not path:
+        return list(DEFAULT_RULES)
+    with open(path, encoding="utf-8") as f:
+        return [AlertRule.from_dict(item) for item in json.load(f)]
+
+
+_engine: Optional[AlertEngine] = None
+
+
+def get_engine() -> AlertEngine:
+    """알림 엔진 (최초 호출 시 규칙 로드)"""
+    global _engine
+    if _engine is None:
+        _engine = AlertEngine(load_rules())
+    return _engine
@@ -0,0 +1,187 @@
+"""
+체결 기반 실시간 분 캔들
+
+체결 내역(trades/ticks 폴링, trade_sync 작업)을 받아 마켓/분 단위별 OHLCV 캔들을 직접 만든다.
+진행 중인 캔들도 체결마다 갱신되므로 차트/전략은 업비트 호출 없이 현재 캔들을 볼 수 있다.
+처음 보는 마켓은 업비트 1분 캔들로 이전 캔들을 채운다 (seed).
+
+- 체결은 도착 순서와 관계없이 체결 시각(timestamp)의 캔들에 반영하고,
+  시가/종가는 체결 번호(sequential_id) 순서로 정한다 (늦게 도착한 이전 체결이 종가를 바꾸지 않음).
+- 이미 반영한 체결 번호는 다시 반영하지 않는다 (폴링 구간이 겹쳐도 중복 없음).
+- 마켓별 최신 체결 시각(watermark)에서 late 초 이전에 끝난 캔들은 확정으로 보고,
+  그 캔들에 속하는 늦은 체결은 버린다 (통계 late 에 집계).
+
+    builder = get_builder()
+    builder.seed("KRW-BTC", candles, before)   # /candles/minutes/1 응답 (첫 체결 이전 캔들)
+    builder.add_trades(trades)                 # /trades/ticks 응답
+    builder.candles("KRW-BTC", 1, count=60)    # 1분 캔들 60개 (최신순, 업비트 응답 형식)
+"""
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import get_settings
+from app.market.candles import MINUTE_UNITS, Bar, Series, bucket_end, bucket_start, parse_time, to_candle
+
+# 마켓별로 기억하는 최근 체결 번호 수 (중복 체결 판별용)
+SEEN_TRADES = 5000
+# 공유 상태로 다른 워커에 전달하는 단위별 최근 캔들 수
+SHARED_BARS = 60
+
+
+class BarBuilder:
+    """
+    마켓/분 단위별 실시간 캔들
+
+    Args:
+        units: 만들 분 단위 목록
+        history: 단위별 보관 캔들 수
+        late: 늦은 체결 허용 시간 (초)
+    """
+
+    def __init__(self, units: Iterable[int] = MINUTE_UNITS, history: int = 200, late: float = 5.0):
+        self.units = tuple(units)
+        self.history = history
+        self.late_ms = int(late * 1000)
+        self.series: Dict[str, Dict[int, Series]] = {}
+        self.watermark: Dict[str, int] = {}
+        self._seen: Dict[str, Tuple[Set[int], Deque[int]]] = {}
+        self.stats = {"trades": 0, "duplicates": 0, "reordered": 0, "late": 0, "gaps": 0}
+
+    def _is_duplicate(self, market: str, trade_id: int) -> bool:
+        seen = self._seen.get(market)
+        if seen is None:
+            seen = self._seen[market] = (set(), deque())
+        ids, order = seen
+        if trade_id in ids:
+            return True
+        ids.add(trade_id)
+        order.append(trade_id)
+        if len(order) > SEEN_TRADES:
+            ids.discard(order.popleft())
+        return False
+
+    def add(self, trade: Dict) -> bool:
+        """
+        체결 한 건 반영
+
+        Returns:
+            반영 여부 (중복/확정된 캔들의 늦은 체결이면 False)
+        """
+        market = trade["market"]
+        trade_id = trade["sequential_id"]
+        if self._is_duplicate(market, trade_id):
+            self.stats["duplicates"] += 1
+            return False
+        ts = trade["timestamp"]
+        watermark = self.watermark.get(market, ts)
+        if ts < watermark:
+            if bucket_end(self.units[0], bucket_start(self.units[0], ts)) <= watermark - self.late_ms:
+                self.stats["late"] += 1
+                return False
+            self.stats["reordered"] += 1
+        else:
+            self.watermark[market] = ts
+
+        series = self._series(market)
+        price, volume = trade["trade_price"], trade["trade_volume"]
+        tick = Bar(ts, price, price, price, price, volume, price * volume, ts, trade_id, trade_id)
+        for unit in self.units:
+            start = bucket_start(unit, ts)
+            bar = series[unit].get(start)
+            if bar is None:
+                series[unit].put(tick.copy(start))
+            else:
+                bar.merge(tick)
+        self.stats["trades"] += 1
+        return True
+
+    def _series(self, market: str) -> Dict[int, Series]:
+        series = self.series.get(market)
+        if series is None:
+            series = self.series[market] = {unit: Series(self.history) for unit in self.units}
+        return series
+
+    def has_market(self, market: str) -> bool:
+        return market in self.series
+
+    def seed(self, market: str, candles: Iterable[Dict], before: int) -> int:
+        """
+        업비트 1분 캔들로 작업 시작 전 캔들 채우기
+
+        Args:
+            market: 마켓 코드
+            candles: /candles/minutes/1 응답
+            before: 체결로 만들 첫 시각 (ms, 이 시각이 속한 1분 캔들부터는 제외해 거래량 중복 방지)
+
+        Returns:
+            반영한 1분 캔들 수
+
+        Note:
+            채운 캔들의 시가/종가 순서(first/last)는 캔들 시작 시각(ms)이고 체결 번호보다 항상 작으므로,
+            이후 체결은 종가만 바꾼다.
+        """
+        series = self._series(market)
+        cutoff = bucket_start(1, before)
+        bars = sorted((Bar.from_candle(c) for c in candles), key=lambda b: b.start)
+        seeded = 0
+        for bar in bars:
+            if bar.start >= cutoff:
+                continue
+            for unit in self.units:
+                start = bucket_start(unit, bar.start)
+                existing = series[unit].get(start)
+                if existing is None:
+                    series[unit].put(bar.copy(start))
+                else:
+                    existing.merge(bar)
+            seeded += 1
+        return seeded
+
+    def add_trades(self, trades: Iterable[Dict]) -> int:
+        """체결 목록 반영 (업비트 응답은 최신순이므로 오래된 체결부터 반영), 반영한 체결 수 반환"""
+        ordered = sorted(trades, key=lambda t: t["sequential_id"])
+        return sum(self.add(t) for t in ordered)
+
+    def candles(self, market: str, unit: int, count: int = 1, to: Optional[str] = None) -> Optional[List[Dict]]:
+        """
+        캔들 조회 (업비트 분 캔들 응답 형식, 최신순 - 첫 캔들은 진행 중일 수 있음)
+
+        Args:
+            market: 마켓 코드
+            unit: 분 단위
+            count: 캔들 개수
+            to: 마지막 캔들 시각 (이 시각 이전에 시작한 캔들)
+
+        Returns:
+            캔들 목록 (체결을 받은 적 없는 마켓/단위는 None)
+        """
+        series = self.series.get(market, {}).get(unit)
+        if series is None:
+            return None
+        if count <= 0:
+            return []
+        starts = series.starts
+        if to:
+            to_ms = parse_time(to)
+            starts = [s for s in starts if s < to_ms]
+        bars = [series.bars[s] for s in reversed(starts[-count:])]
+        return [to_candle(market, unit, bars, i) for i in range(len(bars))]
+
+    def snapshot(self, count: int = SHARED_BARS) -> Dict[str, Dict[str, List[Dict]]]:
+        """마켓/단위별 최근 캔들 (공유 상태 기록용, 단위는 문자열 키)"""
+        return {
+            market: {str(unit): self.candles(market, unit, count) for unit in self.units}
+            for market in self.series
+        }
+
+
+_builder: Optional[BarBuilder] = None
+
+
+def get_builder() -> BarBuilder:
+    """프로세스 공용 실시간 캔들"""
+    global _builder
+    if _builder is None:
+        settings = get_settings()
+        _builder = BarBuilder(history=settings.live_candle_history, late=settings.live_candle_late)
+    return _builder
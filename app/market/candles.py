@@ -0,0 +1,320 @@
+"""
+1분 캔들 기반 로컬 캔들 집계
+
+수집한 1분 캔들(candle_sync 작업)로 분(3, 5, 10, 15, 30, 60, 240)/일/주/월 캔들을 직접 만들어
+/candles/* 라우트가 업비트 추가 호출 없이 응답할 수 있게 한다.
+
+- 1분 캔들이 들어올 때마다 해당 시각이 속한 모든 단위의 캔들(진행 중인 캔들 포함)을 증분 갱신한다.
+  같은 분 캔들이 다시 들어오면 이전 값과의 차이만큼 거래량/거래대금을 반영한다.
+- 캔들 경계는 업비트와 같다: 분 캔들은 UTC 기준 단위 배수, 일 캔들은 KST 09:00 (UTC 00:00),
+  주 캔들은 월요일 KST 09:00, 월 캔들은 매월 1일 KST 09:00 에 시작한다.
+- 마켓별로 1분 캔들을 빠짐없이 수집한 구간(coverage)을 기록하고, 요청한 캔들이 모두 이 구간 안에
+  있을 때만 로컬에서 응답한다 (체결이 없던 구간은 업비트와 마찬가지로 캔들이 없다).
+  그 외에는 None 을 반환해 라우트가 업비트로 조회한다.
+
+    store = get_store()
+    store.ingest("KRW-BTC", candles, fetched_at)     # /candles/minutes/1 응답 (최신순)
+    store.query("KRW-BTC", 15, count=10)             # 15분 캔들 10개 (최신순, 업비트 응답 형식)
+    store.query("KRW-BTC", "days", count=3, to="2024-01-03T00:00:00Z")
+"""
+import time
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from app.core import shared_state
+from app.core.config import get_settings
+
+MINUTE_UNITS = (1, 3, 5, 10, 15, 30, 60, 240)
+PERIODS = ("days", "weeks", "months")
+RESOLUTIONS = MINUTE_UNITS + PERIODS
+
+# 1분 캔들 최소 보관 개수 (같은 분 캔들 재수신 시 이전 값 비교용, 하루치)
+MINUTE_HISTORY = 1440
+DAY_MS = 86_400_000
+KST = timedelta(hours=9)
+
+Resolution = Union[int, str]
+
+
+def _to_ms(dt: datetime) -> int:
+    return int(dt.replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def _from_ms(ms: int) -> datetime:
+    return datetime(1970, 1, 1) + timedelta(milliseconds=ms)
+
+
+def parse_time(value: str) -> int:
+    """
+    업비트 to 파라미터 형식의 시각을 UTC epoch ms 로 변환
+
+    ISO 8601 (2024-01-01T00:00:00Z, 2024-01-01T09:00:00+09:00) 또는 2024-01-01 00:00:00 (UTC)
+    """
+    dt = datetime.fromisoformat(value.strip().replace("Z", "+00:00").replace(" ", "T"))
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return _to_ms(dt)
+
+
+def bucket_start(resolution: Resolution, ms: int) -> int:
+    """ms 가 속한 캔들의 시작 시각 (UTC epoch ms)"""
+    if resolution in MINUTE_UNITS:
+        return ms - ms % (resolution * 60_000)
+    day = ms // DAY_MS
+    if resolution == "days":
+        return day * DAY_MS
+    if resolution == "weeks":
+        # 1970-01-01 은 목요일 -> 월요일 기준 요일 번호 (day + 3) % 7
+        return (day - (day + 3) % 7) * DAY_MS
+    dt = _from_ms(ms)
+    return _to_ms(datetime(dt.year, dt.month, 1))
+
+
+def bucket_end(resolution: Resolution, start: int) -> int:
+    """start 에 시작한 캔들의 다음 캔들 시작 시각"""
+    if resolution in MINUTE_UNITS:
+        return start + resolution * 60_000
+    if resolution == "days":
+        return start + DAY_MS
+    if resolution == "weeks":
+        return start + 7 * DAY_MS
+    dt = _from_ms(start)
+    year, month = (dt.year + 1, 1) if dt.month == 12 else (dt.year, dt.month + 1)
+    return _to_ms(datetime(year, month, 1))
+
+
+class Bar:
+    """캔들 하나 (first/last: 시가/종가를 제공한 1분 캔들의 시작 시각)"""
+
+    __slots__ = ("start", "open", "high", "low", "close", "volume", "value", "timestamp", "first", "last")
+
+    def __init__(self, start: int, open_: float, high: float, low: float, close: float,
+                 volume: float, value: float, timestamp: int, first: int, last: int):
+        self.start = start
+        self.open = open_
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.value = value
+        self.timestamp = timestamp
+        self.first = first
+        self.last = last
+
+    @classmethod
+    def from_candle(cls, candle: Dict) -> "Bar":
+        """업비트 분 캔들 응답 한 건"""
+        start = parse_time(candle["candle_date_time_utc"])
+        return cls(start, candle["opening_price"], candle["high_price"], candle["low_price"],
+                   candle["trade_price"], candle["candle_acc_trade_volume"],
+                   candle["candle_acc_trade_price"], candle["timestamp"], start, start)
+
+    def copy(self, start: int) -> "Bar":
+        return Bar(start, self.open, self.high, self.low, self.close, self.volume,
+                   self.value, self.timestamp, self.first, self.last)
+
+    def merge(self, bar: "Bar", previous: Optional["Bar"] = None):
+        """
+        1분 캔들 반영
+
+        Args:
+            bar: 새 1분 캔들
+            previous: 같은 분의 이전 값 (재수신인 경우, 거래량/거래대금은 차이만 더함)
+        """
+        if bar.high > self.high:
+            self.high = bar.high
+        if bar.low < self.low:
+            self.low = bar.low
+        if bar.first <= self.first:
+            self.open, self.first = bar.open, bar.first
+        if bar.last >= self.last:
+            self.close, self.last = bar.close, bar.last
+        if bar.timestamp > self.timestamp:
+            self.timestamp = bar.timestamp
+        self.volume += bar.volume - (previous.volume if previous else 0.0)
+        self.value += bar.value - (previous.value if previous else 0.0)
+
+
+class Series:
+    """단위별 캔들 (시작 시각 정렬 목록 + 맵, 오래된 캔들부터 삭제)"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.starts: List[int] = []
+        self.bars: Dict[int, Bar] = {}
+
+    def get(self, start: int) -> Optional[Bar]:
+        return self.bars.get(start)
+
+    def put(self, bar: Bar):
+        if bar.start not in self.bars:
+            if not self.starts or bar.start > self.starts[-1]:
+                self.starts.append(bar.start)
+            else:
+                insort(self.starts, bar.start)
+            if len(self.starts) > self.limit:
+                for start in self.starts[:-self.limit]:
+                    del self.bars[start]
+                del self.starts[:-self.limit]
+        self.bars[bar.start] = bar
+
+
+def to_candle(market: str, resolution: Resolution, bars: List[Bar], index: int) -> Dict:
+    """bars[index] 를 업비트 캔들 응답 형식으로 변환 (일 캔들의 전일 종가는 bars[index + 1])"""
+    bar = bars[index]
+    start = _from_ms(bar.start)
+    candle = {
+        "market": market,
+        "candle_date_time_utc": start.strftime("%Y-%m-%dT%H:%M:%S"),
+        "candle_date_time_kst": (start + KST).strftime("%Y-%m-%dT%H:%M:%S"),
+        "opening_price": bar.open,
+        "high_price": bar.high,
+        "low_price": bar.low,
+        "trade_price": bar.close,
+        "timestamp": bar.timestamp,
+        "candle_acc_trade_price": bar.value,
+        "candle_acc_trade_volume": bar.volume,
+    }
+    if resolution in MINUTE_UNITS:
+        candle["unit"] = resolution
+    elif resolution == "days":
+        prev_close = bars[index + 1].close
+        candle["prev_closing_price"] = prev_close
+        candle["change_price"] = bar.close - prev_close
+        candle["change_rate"] = (bar.close - prev_close) / prev_close if prev_close else 0.0
+    else:
+        candle["first_day_of_period"] = start.strftime("%Y-%m-%d")
+    return candle
+
+
+class MarketCandles:
+    """마켓 하나의 단위별 캔들과 1분 캔들 수집 구간"""
+
+    def __init__(self, history: int):
+        self.series: Dict[Resolution, Series] = {
+            res: Series(max(history, MINUTE_HISTORY) if res == 1 else history) for res in RESOLUTIONS
+        }
+        # 1분 캔들을 빠짐없이 수집한 구간 [시작, 끝] (UTC epoch ms)
+        self.coverage: Optional[Tuple[int, int]] = None
+
+    def add(self, bar: Bar):
+        minutes = self.series[1]
+        previous = minutes.get(bar.start)
+        if previous is None and len(minutes.starts) >= minutes.limit and bar.start < minutes.starts[0]:
+            # 보관 기간이 지나 이전 값을 알 수 없는 분 캔들 (상위 단위에 중복 반영될 수 있으므로 무시)
+            return
+        minutes.put(bar)
+        for res in RESOLUTIONS[1:]:
+            start = bucket_start(res, bar.start)
+            series = self.series[res]
+            agg = series.get(start)
+            if agg is None:
+                series.put(bar.copy(start))
+            else:
+                agg.merge(bar, previous)
+
+    def cover(self, start: int, end: int):
+        """[start, end] 구간의 1분 캔들을 모두 받았음을 기록"""
+        if self.coverage is None or start > self.coverage[1]:
+            # 이전 구간과 이어지지 않으면 새 구간부터 다시 시작
+            self.coverage = (start, end)
+        elif end >= self.coverage[0]:
+            self.coverage = (min(start, self.coverage[0]), max(end, self.coverage[1]))
+
+
+class CandleStore:
+    """
+    마켓별 로컬 캔들 저장소
+
+    Args:
+        history: 단위별 보관 캔들 수 (1분 캔들은 최소 하루치)
+        max_lag: 마지막 수집 시각이 이보다 오래되면(초) 최신 캔들을 로컬에서 응답하지 않음
+    """
+
+    def __init__(self, history: int = 400, max_lag: float = 10.0):
+        self.history = history
+        self.max_lag_ms = int(max_lag * 1000)
+        self.markets: Dict[str, MarketCandles] = {}
+        self._shared_at = None
+
+    def ingest(self, market: str, candles: Iterable[Dict], fetched_at: float):
+        """
+        1분 캔들 응답 반영
+
+        Args:
+            market: 마켓 코드
+            candles: /candles/minutes/1 응답 (to 없이 조회한 최근 캔들)
+            fetched_at: 조회 시작 시각 (epoch 초) - 가장 오래된 캔들부터 이 시각까지를 수집 구간으로 기록
+        """
+        bars = [Bar.from_candle(c) for c in candles]
+        if not bars:
+            return
+        state = self.markets.get(market)
+        if state is None:
+            state = self.markets[market] = MarketCandles(self.history)
+        for bar in sorted(bars, key=lambda b: b.start):
+            state.add(bar)
+        state.cover(min(b.start for b in bars), int(fetched_at * 1000))
+
+    def sync_shared(self):
+        """다른 워커(리더)의 candle_sync 결과가 갱신되었으면 반영"""
+        result = shared_state.read("candle_sync")
+        if result is None or result["updated_at"] == self._shared_at:
+            return
+        self._shared_at = result["updated_at"]
+        data = result["data"]
+        if data.get("unit") != 1 or "fetched_at" not in data:
+            return
+        for market, candles in data["candles"].items():
+            self.ingest(market, candles, data["fetched_at"])
+
+    def query(self, market: str, resolution: Resolution, count: int = 1,
+              to: Optional[str] = None, now: Optional[float] = None) -> Optional[List[Dict]]:
+        """
+        캔들 조회 (업비트 응답 형식, 최신순)
+
+        Args:
+            market: 마켓 코드
+            resolution: 분 단위(1, 3, 5, 10, 15, 30, 60, 240) 또는 days/weeks/months
+            count: 캔들 개수
+            to: 마지막 캔들 시각 (이 시각 이전에 시작한 캔들, 업비트 to 파라미터 형식)
+            now: 현재 시각 (epoch 초, 테스트용)
+
+        Returns:
+            요청 범위가 모두 수집 구간 안에 있으면 캔들 목록, 아니면 None
+        """
+        state = self.markets.get(market)
+        if state is None or state.coverage is None or resolution not in state.series:
+            return None
+        series = state.series[resolution]
+        to_ms = parse_time(to) if to else None
+        end = bisect_left(series.starts, to_ms) if to_ms is not None else len(series.starts)
+        # 일 캔들은 전일 종가 계산을 위해 한 개 더 필요
+        need = count + 1 if resolution == "days" else count
+        if end < need:
+            return None
+        starts = series.starts[end - need:end]
+        covered_from, covered_to = state.coverage
+        if starts[0] < covered_from:
+            return None
+        now_ms = int((now if now is not None else time.time()) * 1000)
+        required = now_ms - self.max_lag_ms
+        if to_ms is not None:
+            required = min(required, max(to_ms, bucket_end(resolution, starts[-1])))
+        if covered_to < required:
+            return None
+        bars = [series.bars[s] for s in reversed(starts)]
+        return [to_candle(market, resolution, bars, i) for i in range(count)]
+
+
+_store: Optional[CandleStore] = None
+
+
+def get_store() -> CandleStore:
+    """프로세스 공용 캔들 저장소"""
+    global _store
+    if _store is None:
+        settings = get_settings()
+        _store = CandleStore(settings.candle_history, settings.candle_max_lag)
+    return _store
@@ -0,0 +1,381 @@
+"""
+시세 저널 (append-only 바이너리 기록 / 재생)
+
+현재가, 호가, 체결 이벤트를 길이 접두(length-prefixed) 바이너리 레코드로 세그먼트 파일에 덧붙여 기록하고,
+기록 시각 범위를 지정해 원래 속도(또는 배속)로 재생한다. 연구용 과거 데이터 수집과
+운영 중 발생한 상황을 오프라인에서 재현하는 데 사용한다.
+
+파일 구성 (디렉터리 하나에 세그먼트 여러 개, 파일 이름 = 세그먼트 시작 시각(ms)):
+    {start_ms}.jrn: 파일 헤더(magic, version, start) + 레코드
+    {start_ms}.idx: 체크포인트 (기록 시각, 레코드 오프셋) - checkpoint_bytes 마다 하나
+
+레코드 (little-endian):
+    길이(I) | crc32(I) | 종류(B) | 기록 시각(d) | 마켓(16s) | 본문(종류별 struct)
+
+세그먼트는 크기(max_bytes) 또는 시간(rotate_seconds)이 넘으면 새 파일로 교체한다.
+같은 밀리초에 교체해 파일 이름이 겹치면 기존 파일에 덧붙이지 않고 다음 밀리초 이름으로 새로 만든다.
+기록 중 종료되어 마지막 레코드가 잘렸거나 crc 가 맞지 않으면 그 지점에서 세그먼트 읽기를 멈춘다.
+"""
+import asyncio
+import os
+import struct
+import time
+import zlib
+from bisect import bisect_right
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from app.core.config import get_settings
+from app.market.shared_snapshot import (
+    CHANGES, TICKER_FLOATS, TICKER_INTS, TICKER_STRINGS, _decode, _encode,
+)
+
+MAGIC = b"UPBJ"
+VERSION = 1
+
+FILE_HEADER = struct.Struct("<4sHd")
+RECORD = struct.Struct("<IIBd16s")
+CHECKPOINT = struct.Struct("<dQ")
+
+TICKER, ORDERBOOK, TRADE = 1, 2, 3
+TYPE_NAMES = {TICKER: "ticker", ORDERBOOK: "orderbook", TRADE: "trade"}
+
+# 현재가: change 코드, 문자열 필드, 정수 필드, 실수 필드 (공유 메모리 스냅샷과 같은 필드)
+TICKER_BODY = struct.Struct(
+    "<B" + "".join(f"{size}s" for _, size in TICKER_STRINGS)
+    + "q" * len(TICKER_INTS) + "d" * len(TICKER_FLOATS)
+)
+# 호가: timestamp, total_ask_size, total_bid_size, 호가 단위 수 + 단위별 (ask_price, bid_price, ask_size, bid_size)
+ORDERBOOK_HEAD = struct.Struct("<qddB")
+ORDERBOOK_UNIT = struct.Struct("<dddd")
+# 체결: timestamp, trade_price, trade_volume, ask_bid(0: ASK, 1: BID), sequential_id
+TRADE_BODY = struct.Struct("<qddBq")
+
+
+def _encode_ticker(t: Dict) -> bytes:
+    values = [CHANGES.index(t["change"]) if t.get("change") in CHANGES else 0]
+    values += [_encode(t.get(name), size) for name, size in TICKER_STRINGS]
+    values += [int(t.get(name) or 0) for name in TICKER_INTS]
+    values += [float(t.get(name) or 0.0) for name in TICKER_FLOATS]
+    return TICKER_BODY.pack(*values)
+
+
+def _decode_ticker(market: str, body: bytes) -> Dict:
+    values = TICKER_BODY.unpack(body)
+    n_strings = len(TICKER_STRINGS)
+    n_ints = len(TICKER_INTS)
+    row = {"market": market, "change": CHANGES[values[0]]}
+    row.update((name, _decode(v)) for (name, _), v in zip(TICKER_STRINGS, values[1:1 + n_strings]))
+    row.update(zip(TICKER_INTS, values[1 + n_strings:1 + n_strings + n_ints]))
+    row.update(zip(TICKER_FLOATS, values[1 + n_strings + n_ints:]))
+    return row
+
+
+def _encode_orderbook(ob: Dict) -> bytes:
+    units = ob.get("orderbook_units", [])[:255]
+    parts = [ORDERBOOK_HEAD.pack(
+        int(ob.get("timestamp") or 0), float(ob.get("total_ask_size") or 0.0),
+        float(ob.get("total_bid_size") or 0.0), len(units),
+    )]
+    parts += [ORDERBOOK_UNIT.pack(u["ask_price"], u["bid_price"], u["ask_size"], u["bid_size"])
+              for u in units]
+    return b"".join(parts)
+
+
+def _decode_orderbook(market: str, body: bytes) -> Dict:
+    timestamp, total_ask, total_bid, n_units = ORDERBOOK_HEAD.unpack_from(body)
+    units = []
+    for i in range(n_units):
+        ask_price, bid_price, ask_size, bid_size = ORDERBOOK_UNIT.unpack_from(
+            body, ORDERBOOK_HEAD.size + i * ORDERBOOK_UNIT.size
+        )
+        units.append({"ask_price": ask_price, "bid_price": bid_price,
+                      "ask_size": ask_size, "bid_size": bid_size})
+    return {"market": market, "timestamp": timestamp, "total_ask_size": total_ask,
+            "total_bid_size": total_bid, "orderbook_units": units}
+
+
+def _encode_trade(t: Dict) -> bytes:
+    return TRADE_BODY.pack(
+        int(t.get("timestamp") or 0), float(t["trade_price"]), float(t["trade_volume"]),
+        1 if t.get("ask_bid") == "BID" else 0, int(t.get("sequential_id") or 0),
+    )
+
+
+def _decode_trade(market: str, body: bytes) -> Dict:
+    timestamp, price, volume, ask_bid, sequential_id = TRADE_BODY.unpack(body)
+    dt = datetime.fromtimestamp(timestamp / 1000, timezone.utc)
+    return {"market": market, "trade_date_utc": dt.strftime("%Y-%m-%d"),
+            "trade_time_utc": dt.strftime("%H:%M:%S"), "timestamp": timestamp,
+            "trade_price": price, "trade_volume": volume,
+            "ask_bid": "BID" if ask_bid else "ASK", "sequential_id": sequential_id}
+
+
+ENCODERS = {TICKER: _encode_ticker, ORDERBOOK: _encode_orderbook, TRADE: _encode_trade}
+DECODERS = {TICKER: _decode_ticker, ORDERBOOK: _decode_orderbook, TRADE: _decode_trade}
+
+
+def _segments(directory: str) -> List[Tuple[float, str]]:
+    """(시작 시각, .jrn 경로) 목록 (시작 시각 순)"""
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    result = []
+    for name in names:
+        stem, ext = os.path.splitext(name)
+        if ext == ".jrn" and stem.isdigit():
+            result.append((int(stem) / 1000, os.path.join(directory, name)))
+    return sorted(result)
+
+
+class JournalWriter:
+    """
+    저널 기록 (프로세스 하나 - 스케줄러 리더 - 에서만 사용)
+
+    Args:
+        directory: 세그먼트 디렉터리
+        max_bytes: 세그먼트 최대 크기 (초과 시 교체)
+        rotate_seconds: 세그먼트 최대 기록 시간 (초과 시 교체)
+        checkpoint_bytes: 체크포인트 간격 (바이트)
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 64 * 1024 * 1024,
+                 rotate_seconds: float = 3600, checkpoint_bytes: int = 256 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.checkpoint_bytes = checkpoint_bytes
+        self._file = None
+        self._index = None
+        self._started = 0.0
+        self._size = 0
+        self._last_checkpoint = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _open(self, now: float):
+        self.close()
+        start_ms = int(now * 1000)
+        while True:
+            base = os.path.join(self.directory, f"{start_ms:013d}")
+            try:
+                fd = os.open(base + ".jrn", os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+                break
+            except FileExistsError:
+                start_ms += 1
+        self._file = os.fdopen(fd, "wb")
+        self._index = open(base + ".idx", "wb")
+        self._file.write(FILE_HEADER.pack(MAGIC, VERSION, now))
+        self._started = now
+        self._size = FILE_HEADER.size
+        self._last_checkpoint = -self.checkpoint_bytes
+
+    def append(self, kind: int, events: Iterable[Dict], recorded_at: Optional[float] = None) -> int:
+        """
+        같은 종류의 이벤트 여러 개 기록 (호출마다 한 번 flush)
+
+        Args:
+            kind: TICKER / ORDERBOOK / TRADE
+            events: 업비트 응답 형식의 이벤트 목록 (market 필드 필수)
+            recorded_at: 기록 시각 (default: 현재 시각)
+
+        Returns:
+            기록한 레코드 수
+        """
+        now = time.time() if recorded_at is None else recorded_at
+        if (self._file is None or self._size >= self.max_bytes
+                or now - self._started >= self.rotate_seconds):
+            self._open(now)
+
+        encode = ENCODERS[kind]
+        chunks = []
+        count = 0
+        for event in events:
+            if self._size - self._last_checkpoint >= self.checkpoint_bytes:
+                self._index.write(CHECKPOINT.pack(now, self._size))
+                self._last_checkpoint = self._size
+            body = encode(event)
+            record = RECORD.pack(len(body), zlib.crc32(body), kind, now,
+                                 _encode(event["market"], 16)) + body
+            chunks.append(record)
+            self._size += len(record)
+            count += 1
+        self._file.write(b"".join(chunks))
+        self._file.flush()
+        self._index.flush()
+        return count
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._index.close()
+            self._file = self._index = None
+
+
+class JournalReader:
+    """저널 읽기 / 재생"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def read(self, start: float = 0.0, end: float = float("inf"),
+             kinds: Optional[Sequence[int]] = None,
+             markets: Optional[Sequence[str]] = None) -> Iterator[Tuple[float, int, Dict]]:
+        """
+        기록 시각 범위의 이벤트 조회
+
+        Args:
+            start / end: 기록 시각 범위 (Unix timestamp, start 이상 end 미만)
+            kinds: 조회할 종류 (TICKER / ORDERBOOK / TRADE, 없으면 전체)
+            markets: 조회할 마켓 코드 (없으면 전체)
+
+        Returns:
+            (기록 시각, 종류, 이벤트) 반복자
+        """
+        kinds = set(kinds) if kinds else None
+        market_keys = {_encode(m, 16).ljust(16, b"\0") for m in markets} if markets else None
+        segments = _segments(self.directory)
+        for i, (seg_start, path) in enumerate(segments):
+            if seg_start >= end:
+                break
+            # 다음 세그먼트가 start 이전에 시작했으면 이 세그먼트는 범위 밖
+            if i + 1 < len(segments) and segments[i + 1][0] <= start:
+                continue
+            for item in self._read_segment(path, start, end, kinds, market_keys):
+                yield item
+
+    def _seek_offset(self, path: str, start: float) -> int:
+        """start 이전의 마지막 체크포인트 오프셋"""
+        try:
+            with open(path[:-4] + ".idx", "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return FILE_HEADER.size
+        n = len(data) // CHECKPOINT.size
+        times = [CHECKPOINT.unpack_from(data, i * CHECKPOINT.size)[0] for i in range(n)]
+        pos = bisect_right(times, start) - 1
+        # 같은 기록 시각의 레코드가 여러 체크포인트에 걸칠 수 있으므로 start 미만 체크포인트부터 읽음
+        while pos > 0 and times[pos] >= start:
+            pos -= 1
+        if pos < 0:
+            return FILE_HEADER.size
+        return CHECKPOINT.unpack_from(data, pos * CHECKPOINT.size)[1]
+
+    def _read_segment(self, path: str, start: float, end: float, kinds, market_keys):
+        with open(path, "rb") as f:
+            header = f.read(FILE_HEADER.size)
+            if len(header) < FILE_HEADER.size or FILE_HEADER.unpack(header)[0] != MAGIC:
+                return
+            f.seek(self._seek_offset(path, start))
+            while True:
+                head = f.read(RECORD.size)
+                if len(head) < RECORD.size:
+                    return
+                length, crc, kind, recorded_at, market = RECORD.unpack(head)
+                body = f.read(length)
+                if len(body) < length or zlib.crc32(body) != crc:
+                    return  # 잘린(기록 중 종료된) 레코드
+                if recorded_at < start:
+                    continue
+                if recorded_at >= end:
+                    return
+                if kinds is not None and kind not in kinds:
+                    continue
+                if market_keys is not None and market not in market_keys:
+                    continue
+                yield recorded_at, kind, DECODERS[kind](_decode(market), body)
+
+    async def replay(self, start: float = 0.0, end: float = float("inf"), speed: float = 1.0,
+                     kinds: Optional[Sequence[int]] = None, markets: Optional[Sequence[str]] = None):
+        """
+        기록 간격을 유지하며 이벤트 재생 (async generator)
+
+        Args:
+            speed: 재생 배속 (1.0: 원래 속도, 10.0: 10배속, 0: 대기 없이 재생)
+        """
+        first = None
+        origin = time.monotonic()
+        for recorded_at, kind, event in self.read(start, end, kinds, markets):
+            if first is None:
+                first = recorded_at
+            if speed > 0:
+                delay = (recorded_at - first) / speed - (time.monotonic() - origin)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            yield recorded_at, kind, event
+
+
+_writer: Optional[JournalWriter] = None
+
+
+def get_writer() -> Optional[JournalWriter]:
+    """설정(JOURNAL_ENABLED)에 따른 저널 기록기 (비활성화 시 None)"""
+    global _writer
+    settings = get_settings()
+    if _writer is None and settings.journal_enabled:
+        _writer = JournalWriter(settings.journal_dir, settings.journal_max_bytes,
+                                settings.journal_rotate_seconds)
+    return _writer
+
+
+def close_writer():
+    """이미 만든 저널 기록기만 닫음 (종료 시 새 기록기/세그먼트를 만들지 않음)"""
+    global _writer
+    if _writer is not None:
+        _writer.close()
+        _writer = None
+
+
+def record(kind: int, events: Iterable[Dict]):
+    """저널이 활성화되어 있으면 이벤트 기록 (실패해도 호출한 작업은 계속 진행)"""
+    writer = get_writer()
+    if writer is None:
+        return
+    try:
+        writer.append(kind, events)
+    except Exception as e:
+        print(f"Error in journal: {str(e)}")
+
+
+def _parse_time(value: Optional[str], default: float) -> float:
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def main(argv: Optional[List[str]] = None):
+    """저널 재생 (JSON Lines 출력)"""
+    import argparse
+    import sys
+
+    from app.core import jsonutil
+
+    parser = argparse.ArgumentParser(description="시세 저널 재생")
+    parser.add_argument("directory")
+    parser.add_argument("--start", help="시작 시각 (ISO 8601 또는 Unix timestamp)")
+    parser.add_argument("--end", help="종료 시각 (ISO 8601 또는 Unix timestamp)")
+    parser.add_argument("--speed", type=float, default=0.0, help="재생 배속 (0: 대기 없이 출력)")
+    parser.add_argument("--kind", action="append", choices=list(TYPE_NAMES.values()))
+    parser.add_argument("--market", action="append")
+    args = parser.parse_args(argv)
+
+    names = {v: k for k, v in TYPE_NAMES.items()}
+    kinds = [names[k] for k in args.kind] if args.kind else None
+    reader = JournalReader(args.directory)
+
+    async def run():
+        async for recorded_at, kind, event in reader.replay(
+            _parse_time(args.start, 0.0), _parse_time(args.end, float("inf")),
+            args.speed, kinds, args.market,
+        ):
+            line = jsonutil.dumps({"recorded_at": recorded_at, "type": TYPE_NAMES[kind], "event": event})
+            sys.stdout.buffer.write(line + b"\n")
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+호가 단계 집계 (NumPy)
+
+여러 마켓의 호가를 (마켓 수 x 호가 단계) 배열로 옮겨 한 번에 가격 구간별로 합치고 상위 단계만 남긴다.
+
+- group_by_price: 가격 구간 크기 - 매도 호가는 올림, 매수 호가는 내림으로 구간 가격을 정한다
+  (ex. 10000 이면 KRW-BTC 호가를 1만원 단위로 합산)
+- depth: 남길 호가 단계 수 (구간 집계 후 기준)
+
+    aggregate_orderbooks(orderbooks, depth=5, group_by_price=10000)
+
+응답 형식은 /orderbook 과 같다. 매도/매수 단계 수가 다르면 부족한 쪽은 가격/잔량을 null 로 채우며,
+total_ask_size / total_bid_size 는 집계 전 전체 잔량을 유지한다.
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+def _to_arrays(orderbooks: List[Dict]) -> Tuple[np.ndarray, ...]:
+    """(마켓 수 x 최대 단계 수) 가격/잔량 배열 (단계가 적은 마켓은 NaN 으로 채움)"""
+    levels = max((len(ob["orderbook_units"]) for ob in orderbooks), default=0)
+    shape = (len(orderbooks), levels)
+    arrays = tuple(np.full(shape, np.nan) for _ in range(4))
+    ask_price, ask_size, bid_price, bid_size = arrays
+    for i, ob in enumerate(orderbooks):
+        units = ob["orderbook_units"]
+        n = len(units)
+        ask_price[i, :n] = [u["ask_price"] for u in units]
+        ask_size[i, :n] = [u["ask_size"] for u in units]
+        bid_price[i, :n] = [u["bid_price"] for u in units]
+        bid_size[i, :n] = [u["bid_size"] for u in units]
+    return arrays
+
+
+def aggregate_side(prices: np.ndarray, sizes: np.ndarray, depth: Optional[int],
+                   group_by_price: Optional[float], ask: bool) -> List[Tuple[List[float], List[float]]]:
+    """
+    한쪽(매도/매수) 호가 집계
+
+    Args:
+        prices: (마켓 수 x 단계 수) 가격 - 행마다 정렬되어 있어야 함 (매도 오름차순, 매수 내림차순)
+        sizes: 같은 모양의 잔량
+        depth: 남길 단계 수 (없으면 전체)
+        group_by_price: 가격 구간 크기 (없으면 단계 그대로)
+        ask: 매도 호가 여부 (구간 가격 올림), 아니면 내림
+
+    Returns:
+        마켓별 (가격 목록, 잔량 목록)
+    """
+    rows, levels = prices.shape
+    if rows == 0 or levels == 0:
+        return [([], []) for _ in range(rows)]
+    if group_by_price:
+        # 부동소수점 오차로 구간 경계가 어긋나지 않도록 반올림 후 올림/내림
+        scaled = np.round(prices / group_by_price, 9)
+        buckets = (np.ceil(scaled) if ask else np.floor(scaled)) * group_by_price
+    else:
+        buckets = prices
+
+    # 정렬된 행에서 구간이 바뀌는 위치가 그룹 시작 (행의 첫 칸은 항상 시작)
+    starts = np.ones(prices.shape, dtype=bool)
+    starts[:, 1:] = buckets[:, 1:] != buckets[:, :-1]
+    index = np.flatnonzero(starts)
+    totals = np.add.reduceat(np.nan_to_num(sizes).ravel(), index)
+    group_prices = buckets.ravel()[index]
+    group_rows = index // levels
+    # 행 안에서 그룹 순번 (depth 제한용)
+    rank = np.arange(len(index)) - np.searchsorted(group_rows, group_rows)
+    keep = ~np.isnan(group_prices)
+    if depth is not None:
+        keep &= rank < depth
+    group_rows, group_prices, totals = group_rows[keep], group_prices[keep], totals[keep]
+
+    bounds = np.searchsorted(group_rows, np.arange(rows + 1))
+    price_list, size_list = group_prices.tolist(), totals.tolist()
+    return [(price_list[bounds[i]:bounds[i + 1]], size_list[bounds[i]:bounds[i + 1]]) for i in range(rows)]
+
+
+def aggregate_orderbooks(orderbooks: List[Dict], depth: Optional[int] = None,
+                         group_by_price: Optional[float] = None) -> List[Dict]:
+    """
+    호가 목록 집계 (/orderbook 응답 형식)
+
+    Args:
+        orderbooks: /orderbook 응답 (여러 마켓)
+        depth: 남길 호가 단계 수
+        group_by_price: 가격 구간 크기
+    """
+    if depth is not None and depth < 1:
+        raise ValueError("depth 는 1 이상이어야 합니다")
+    if group_by_price is not None and group_by_price <= 0:
+        raise ValueError("group_by_price 는 0보다 커야 합니다")
+    ask_price, ask_size, bid_price, bid_size = _to_arrays(orderbooks)
+    asks = aggregate_side(ask_price, ask_size, depth, group_by_price, ask=True)
+    bids = aggregate_side(bid_price, bid_size, depth, group_by_price, ask=False)
+
+    result = []
+    for ob, (a_prices, a_sizes), (b_prices, b_sizes) in zip(orderbooks, asks, bids):
+        n = max(len(a_prices), len(b_prices))
+        a_prices += [None] * (n - len(a_prices))
+        a_sizes += [None] * (n - len(a_sizes))
+        b_prices += [None] * (n - len(b_prices))
+        b_sizes += [None] * (n - len(b_sizes))
+        item = {k: v for k, v in ob.items() if k != "orderbook_units"}
+        item["orderbook_units"] = [
+            {"ask_price": ap, "bid_price": bp, "ask_size": asz, "bid_size": bsz}
+            for ap, bp, asz, bsz in zip(a_prices, b_prices, a_sizes, b_sizes)
+        ]
+        if group_by_price:
+            item["level"] = group_by_price
+        result.append(item)
+    return result
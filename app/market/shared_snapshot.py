@@ -0,0 +1,368 @@
+"""
+워커 간 공유 메모리 시세 스냅샷
+
+피더(스케줄러 리더) 하나가 업비트 시세를 조회해 공유 메모리에 기록하고,
+모든 워커는 업비트 호출 없이 공유 메모리에서 /ticker, /orderbook, /market/all 응답을 만든다.
+
+레이아웃 (little-endian, 고정 크기):
+    헤더(64B): magic, version, capacity, count, catalog_seq, updated_at, overflow
+    슬롯(마켓별): seq | 마켓 정보 | 현재가 | 호가
+
+마켓 수가 capacity 를 넘으면 넘친 마켓은 슬롯 없이 건너뛰고 헤더에 개수(overflow)를 기록한다.
+슬롯이 없는 마켓의 현재가/호가와 overflow 가 있는 동안의 마켓 목록은 결과 없음(None)으로 업비트 조회로 넘긴다.
+
+슬롯마다 seqlock 을 사용한다. 피더는 seq 를 홀수로 올린 뒤 기록하고 다시 짝수로 올린다.
+읽는 쪽은 락 없이 슬롯을 복사하고, 복사 전후 seq 가 같고 짝수일 때만 결과를 사용한다.
+READ_ATTEMPTS 번 안에 일관된 복사본을 얻지 못하면(피더가 기록 중 종료 등) 결과 없음(None)으로
+업비트 조회로 넘긴다. 피더는 값을 모두 변환/패킹한 뒤에만 seq 를 올리고, 세그먼트를 만들거나
+다시 연결할 때 seq 를 0 으로 초기화한다.
+"""
+import logging
+import struct
+import time
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"UPBS"
+VERSION = 2
+MAX_UNITS = 30
+# 슬롯 일관된 복사본을 얻기 위한 최대 시도 횟수
+READ_ATTEMPTS = 100
+
+HEADER = struct.Struct("<4sIIIQdI28x")
+SEQ = struct.Struct("<Q")
+
+# 마켓 정보: market, korean_name, english_name, warning, caution 비트
+MARKET = struct.Struct("<16s64s64sBB6x")
+
+CAUTION_KEYS = (
+    "PRICE_FLUCTUATIONS",
+    "TRADING_VOLUME_SOARING",
+    "DEPOSIT_AMOUNT_SOARING",
+    "GLOBAL_PRICE_DIFFERENCES",
+    "CONCENTRATION_OF_SMALL_ACCOUNTS",
+)
+
+TICKER_STRINGS = (
+    ("trade_date", 8), ("trade_time", 6), ("trade_date_kst", 8), ("trade_time_kst", 6),
+    ("highest_52_week_date", 10), ("lowest_52_week_date", 10),
+)
+TICKER_INTS = ("trade_timestamp", "timestamp")
+TICKER_FLOATS = (
+    "opening_price", "high_price", "low_price", "trade_price", "prev_closing_price",
+    "change_price", "change_rate", "signed_change_price", "signed_change_rate",
+    "trade_volume", "acc_trade_price", "acc_trade_price_24h", "acc_trade_volume",
+    "acc_trade_volume_24h", "highest_52_week_price", "lowest_52_week_price",
+)
+CHANGES = ("EVEN", "RISE", "FALL")
+
+# 현재가: 유효 여부, change 코드, 문자열 필드, 정수 필드, 실수 필드
+TICKER = struct.Struct(
+    "<BB" + "".join(f"{size}s" for _, size in TICKER_STRINGS)
+    + "q" * len(TICKER_INTS) + "d" * len(TICKER_FLOATS)
+)
+
+# 호가: 유효 여부, 호가 단위 수, timestamp, total_ask_size, total_bid_size, 단위별 (ask_price, bid_price, ask_size, bid_size)
+ORDERBOOK = struct.Struct("<BBqdd" + "d" * (4 * MAX_UNITS))
+
+MARKET_OFFSET = SEQ.size
+TICKER_OFFSET = MARKET_OFFSET + MARKET.size
+ORDERBOOK_OFFSET = TICKER_OFFSET + TICKER.size
+SLOT_SIZE = (ORDERBOOK_OFFSET + ORDERBOOK.size + 7) // 8 * 8
+
+
+def segment_size(capacity: int) -> int:
+    return HEADER.size + SLOT_SIZE * capacity
+
+
+def _encode(value: Optional[str], size: int) -> bytes:
+    return (value or "").encode("utf-8")[:size]
+
+
+def _decode(value: bytes) -> str:
+    return value.rstrip(b"\0").decode("utf-8", "ignore")
+
+
+# 현재 프로세스의 피더 (리더 워커는 HTTP 도 처리하므로 같은 세그먼트를 그대로 읽는다)
+_writers: Dict[str, "SnapshotWriter"] = {}
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """기존 세그먼트에 연결 (읽는 프로세스가 종료될 때 세그먼트를 삭제하지 않도록 추적 해제)"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        shm = shared_memory.SharedMemory(name=name)
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+class SnapshotWriter:
+    """공유 메모리 기록 (피더 프로세스 하나만 사용)"""
+
+    def __init__(self, name: str, capacity: int = 512):
+        catalog_seq = 0
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=segment_size(capacity))
+        except FileExistsError:
+            # 이전 피더가 남긴 세그먼트 재사용 (크기가 맞지 않으면 새로 생성)
+            self.shm = _attach(name)
+            if self.shm.size < segment_size(capacity):
+                self.shm.close()
+                self.shm.unlink()
+                self.shm = shared_memory.SharedMemory(name=name, create=True, size=segment_size(capacity))
+            else:
+                # 읽는 쪽이 이전 피더의 마켓 목록을 계속 쓰지 않도록 catalog_seq 는 이어서 증가
+                magic, _, _, _, catalog_seq, _, _ = HEADER.unpack_from(self.shm.buf, 0)
+                catalog_seq = catalog_seq + 1 if magic == MAGIC else 0
+        self.buf = self.shm.buf
+        self.name = name
+        self.capacity = capacity
+        self.slots: Dict[str, int] = {}
+        self.catalog_seq = catalog_seq
+        self.overflow = 0
+        # 이전 피더가 기록 중 종료해 홀수로 남은 seq 초기화
+        for slot in range(capacity):
+            SEQ.pack_into(self.buf, HEADER.size + slot * SLOT_SIZE, 0)
+        self._write_header(time.time())
+        _writers[name] = self
+
+    def _write_header(self, updated_at: float):
+        HEADER.pack_into(self.buf, 0, MAGIC, VERSION, self.capacity, len(self.slots),
+                         self.catalog_seq, updated_at, self.overflow)
+
+    def _begin(self, slot: int) -> int:
+        offset = HEADER.size + slot * SLOT_SIZE
+        seq = SEQ.unpack_from(self.buf, offset)[0]
+        SEQ.pack_into(self.buf, offset, seq + 1)
+        return offset
+
+    def _end(self, offset: int):
+        seq = SEQ.unpack_from(self.buf, offset)[0]
+        SEQ.pack_into(self.buf, offset, seq + 1)
+
+    def _write(self, slot: int, field_offset: int, data: bytes):
+        """패킹된 필드를 seqlock 안에서 기록 (예외가 나도 seq 는 짝수로 돌려놓음)"""
+        offset = self._begin(slot)
+        try:
+            start = offset + field_offset
+            self.buf[start:start + len(data)] = data
+        finally:
+            self._end(offset)
+
+    def update_markets(self, markets: List[Dict]):
+        """
+        마켓 목록(/market/all?isDetails=true) 기록 - 기존 마켓은 같은 슬롯 유지
+
+        Note:
+            capacity 를 넘는 마켓은 기록하지 않고 개수를 헤더(overflow)에 남긴다 (SNAPSHOT_CAPACITY 를 늘려야 함)
+        """
+        overflow = 0
+        for m in markets:
+            code = m["market"]
+            slot = self.slots.get(code)
+            if slot is None:
+                if len(self.slots) >= self.capacity:
+                    overflow += 1
+                    continue
+                slot = self.slots[code] = len(self.slots)
+            event = m.get("market_event") or {}
+            caution = event.get("caution") or {}
+            bits = 0
+            for i, key in enumerate(CAUTION_KEYS):
+                if caution.get(key):
+                    bits |= 1 << i
+            data = MARKET.pack(
+                _encode(code, 16), _encode(m.get("korean_name"), 64),
+                _encode(m.get("english_name"), 64), 1 if event.get("warning") else 0, bits,
+            )
+            self._write(slot, MARKET_OFFSET, data)
+        if overflow != self.overflow:
+            if overflow:
+                logger.warning("Snapshot capacity %d exceeded: %d markets not shared (served from upstream)",
+                               self.capacity, overflow)
+            self.overflow = overflow
+        self.catalog_seq += 1
+        self._write_header(time.time())
+
+    def update_tickers(self, tickers: List[Dict]):
+        for t in tickers:
+            slot = self.slots.get(t["market"])
+            if slot is None:
+                continue
+            change = CHANGES.index(t["change"]) if t.get("change") in CHANGES else 0
+            values = [1, change]
+            values += [_encode(t.get(name), size) for name, size in TICKER_STRINGS]
+            values += [int(t.get(name) or 0) for name in TICKER_INTS]
+            values += [float(t.get(name) or 0.0) for name in TICKER_FLOATS]
+            self._write(slot, TICKER_OFFSET, TICKER.pack(*values))
+        self._write_header(time.time())
+
+    def update_orderbooks(self, orderbooks: List[Dict]):
+        for ob in orderbooks:
+            slot = self.slots.get(ob["market"])
+            if slot is None:
+                continue
+            units = ob.get("orderbook_units", [])[:MAX_UNITS]
+            flat = []
+            for u in units:
+                flat += [float(u["ask_price"]), float(u["bid_price"]), float(u["ask_size"]), float(u["bid_size"])]
+            flat += [0.0] * (4 * MAX_UNITS - len(flat))
+            data = ORDERBOOK.pack(
+                1, len(units), int(ob.get("timestamp") or 0),
+                float(ob.get("total_ask_size") or 0.0), float(ob.get("total_bid_size") or 0.0), *flat,
+            )
+            self._write(slot, ORDERBOOK_OFFSET, data)
+        self._write_header(time.time())
+
+    def close(self, unlink: bool = True):
+        _writers.pop(self.name, None)
+        self.buf = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+class SnapshotReader:
+    """공유 메모리 읽기 (워커마다 하나, 락 없이 읽음)"""
+
+    def __init__(self, name: str):
+        writer = _writers.get(name)
+        if writer is not None:
+            self.shm = None
+            self.buf = writer.buf
+        else:
+            self.shm = _attach(name)
+            self.buf = self.shm.buf
+        magic, version, self.capacity, _, _, _, _ = HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError("공유 메모리 스냅샷 형식이 맞지 않습니다")
+        self._catalog_seq = -1
+        self.slots: Dict[str, int] = {}
+
+    def header(self) -> Dict:
+        _, _, capacity, count, catalog_seq, updated_at, overflow = HEADER.unpack_from(self.buf, 0)
+        return {"capacity": capacity, "count": count, "catalog_seq": catalog_seq, "updated_at": updated_at,
+                "overflow": overflow}
+
+    def age(self) -> float:
+        """마지막 기록 이후 경과 시간 (초)"""
+        return time.time() - HEADER.unpack_from(self.buf, 0)[5]
+
+    def _read_slot(self, slot: int) -> Optional[bytes]:
+        """슬롯의 일관된 복사본 (READ_ATTEMPTS 번 안에 얻지 못하면 None)"""
+        offset = HEADER.size + slot * SLOT_SIZE
+        for _ in range(READ_ATTEMPTS):
+            before = SEQ.unpack_from(self.buf, offset)[0]
+            if before & 1:
+                continue
+            data = bytes(self.buf[offset:offset + SLOT_SIZE])
+            if SEQ.unpack_from(self.buf, offset)[0] == before:
+                return data
+        return None
+
+    def _refresh_catalog(self):
+        header = self.header()
+        if header["catalog_seq"] == self._catalog_seq:
+            return
+        slots = {}
+        complete = True
+        for slot in range(header["count"]):
+            data = self._read_slot(slot)
+            if data is None:
+                # 다음 조회에서 다시 읽음 (그동안 읽지 못한 마켓은 업비트 조회)
+                complete = False
+                continue
+            slots[_decode(MARKET.unpack_from(data, MARKET_OFFSET)[0])] = slot
+        self.slots = slots
+        if complete:
+            self._catalog_seq = header["catalog_seq"]
+
+    def _slots_for(self, markets: Sequence[str]) -> Optional[List[int]]:
+        self._refresh_catalog()
+        try:
+            return [self.slots[m] for m in markets]
+        except KeyError:
+            return None
+
+    def market_all(self, is_details: bool = False) -> Optional[List[Dict]]:
+        """/market/all 과 같은 형태의 마켓 목록 (읽지 못한 슬롯이 있거나 슬롯 없는 마켓이 있으면 None)"""
+        self._refresh_catalog()
+        if self.header()["overflow"]:
+            return None
+        result = []
+        for code, slot in self.slots.items():
+            data = self._read_slot(slot)
+            if data is None:
+                return None
+            _, korean, english, warning, bits = MARKET.unpack_from(data, MARKET_OFFSET)
+            item = {"market": code, "korean_name": _decode(korean), "english_name": _decode(english)}
+            if is_details:
+                item["market_event"] = {
+                    "warning": bool(warning),
+                    "caution": {key: bool(bits >> i & 1) for i, key in enumerate(CAUTION_KEYS)},
+                }
+            result.append(item)
+        return result
+
+    def tickers(self, markets: Sequence[str]) -> Optional[List[Dict]]:
+        """현재가 목록 (기록되지 않은 마켓이 하나라도 있으면 None)"""
+        slots = self._slots_for(markets)
+        if slots is None:
+            return None
+        result = []
+        n_strings = len(TICKER_STRINGS)
+        n_ints = len(TICKER_INTS)
+        for market, slot in zip(markets, slots):
+            data = self._read_slot(slot)
+            if data is None:
+                return None
+            values = TICKER.unpack_from(data, TICKER_OFFSET)
+            if not values[0]:
+                return None
+            row = {"market": market, "change": CHANGES[values[1]]}
+            strings = values[2:2 + n_strings]
+            ints = values[2 + n_strings:2 + n_strings + n_ints]
+            floats = values[2 + n_strings + n_ints:]
+            row.update((name, _decode(v)) for (name, _), v in zip(TICKER_STRINGS, strings))
+            row.update(zip(TICKER_INTS, ints))
+            row.update(zip(TICKER_FLOATS, floats))
+            result.append(row)
+        return result
+
+    def orderbooks(self, markets: Sequence[str]) -> Optional[List[Dict]]:
+        """호가 목록 (기록되지 않은 마켓이 하나라도 있으면 None)"""
+        slots = self._slots_for(markets)
+        if slots is None:
+            return None
+        result = []
+        for market, slot in zip(markets, slots):
+            data = self._read_slot(slot)
+            if data is None:
+                return None
+            values = ORDERBOOK.unpack_from(data, ORDERBOOK_OFFSET)
+            valid, n_units, timestamp, total_ask, total_bid = values[:5]
+            if not valid:
+                return None
+            flat = values[5:]
+            result.append({
+                "market": market,
+                "timestamp": timestamp,
+                "total_ask_size": total_ask,
+                "total_bid_size": total_bid,
+                "orderbook_units": [
+                    {"ask_price": flat[i], "bid_price": flat[i + 1],
+                     "ask_size": flat[i + 2], "bid_size": flat[i + 3]}
+                    for i in range(0, 4 * n_units, 4)
+                ],
+            })
+        return result
+
+    def close(self):
+        self.buf = None
+        if self.shm is not None:
+            self.shm.close()
@@ -0,0 +1,176 @@
+"""
+마켓별 현재가 상태 테이블 (NumPy 구조화 배열)
+
+현재가 응답(dict 목록)을 마켓 코드 -> 행 번호 맵과 필드별 고정 크기 배열로 보관한다.
+정렬/필터/상위 N개 조회는 배열 연산으로 처리하고, dict 변환은 API 응답(JSON) 직전에만 한다.
+
+    table = MarketTable()
+    table.update_markets(markets)            # /market/all?isDetails=true
+    table.update_tickers(tickers)            # /ticker
+    mask = table.quote_mask("KRW") & table.caution_mask() & table.change_mask("RISE")
+    rows = table.select(mask, order_by="acc_trade_price_24h", limit=20)
+    table.to_records(rows, fields=["market", "trade_price"])
+
+메모리/조회 시간 비교: python -m benchmarks.bench_market_state
+"""
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from app.market.shared_snapshot import (
+    CAUTION_KEYS, CHANGES, TICKER_FLOATS, TICKER_INTS, TICKER_STRINGS,
+)
+
+DTYPE = np.dtype(
+    [("valid", "?"), ("change", "i1"), ("warning", "?"), ("caution", "u1")]
+    + [(name, f"S{size}") for name, size in TICKER_STRINGS]
+    + [(name, "i8") for name in TICKER_INTS]
+    + [(name, "f8") for name in TICKER_FLOATS]
+)
+
+NUMERIC_FIELDS = TICKER_INTS + TICKER_FLOATS
+
+
+class MarketTable:
+    """
+    마켓 코드로 행을 찾는 현재가 테이블
+
+    행은 마켓이 처음 나타날 때 추가되고 삭제되지 않는다 (상장 폐지 마켓은 valid=False 로 남음).
+    """
+
+    def __init__(self, capacity: int = 256):
+        self.data = np.zeros(capacity, dtype=DTYPE)
+        self.codes = np.empty(capacity, dtype=object)
+        self.rows: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _row_of(self, market: str) -> int:
+        row = self.rows.get(market)
+        if row is None:
+            row = len(self.rows)
+            if row >= len(self.data):
+                self._grow(len(self.data) * 2)
+            self.rows[market] = row
+            self.codes[row] = market
+        return row
+
+    def _grow(self, capacity: int):
+        data = np.zeros(capacity, dtype=DTYPE)
+        data[:len(self.data)] = self.data
+        codes = np.empty(capacity, dtype=object)
+        codes[:len(self.codes)] = self.codes
+        self.data, self.codes = data, codes
+
+    @property
+    def view(self) -> np.ndarray:
+        """사용 중인 행"""
+        return self.data[:len(self.rows)]
+
+    def update_markets(self, markets: Iterable[Dict]):
+        """
+        마켓 코드(isDetails=true) 전체 응답의 유의/주의 상태 반영
+
+        응답에 없는 마켓(상장 폐지)은 valid=False 로 바꿔 조회에서 제외한다.
+        """
+        markets = list(markets)
+        rows = np.fromiter((self._row_of(m["market"]) for m in markets), dtype=np.intp, count=len(markets))
+        listed = np.zeros(len(self.rows), dtype="?")
+        listed[rows] = True
+        self.view["valid"] &= listed
+        warning = np.empty(len(markets), dtype="?")
+        caution = np.empty(len(markets), dtype="u1")
+        for i, m in enumerate(markets):
+            event = m.get("market_event") or {}
+            flags = event.get("caution") or {}
+            warning[i] = bool(event.get("warning"))
+            caution[i] = sum(1 << bit for bit, key in enumerate(CAUTION_KEYS) if flags.get(key))
+        self.data["warning"][rows] = warning
+        self.data["caution"][rows] = caution
+
+    def update_tickers(self, tickers: Sequence[Dict]):
+        """현재가 응답 반영 (필드별로 한 번에 기록)"""
+        rows = np.fromiter((self._row_of(t["market"]) for t in tickers), dtype=np.intp, count=len(tickers))
+        data = self.data
+        data["valid"][rows] = True
+        data["change"][rows] = [CHANGES.index(t["change"]) if t.get("change") in CHANGES else 0
+                                for t in tickers]
+        for name, _ in TICKER_STRINGS:
+            data[name][rows] = [(t.get(name) or "").encode() for t in tickers]
+        for name in NUMERIC_FIELDS:
+            data[name][rows] = [t.get(name) or 0 for t in tickers]
+
+    # ------------------------------------------------------------------
+    # 조건 (bool 배열)
+    # ------------------------------------------------------------------
+
+    def quote_mask(self, quote: str) -> np.ndarray:
+        """기준 화폐 마켓 (ex. KRW -> KRW-*)"""
+        prefix = quote + "-"
+        return np.fromiter((c.startswith(prefix) for c in self.codes[:len(self.rows)]),
+                           dtype="?", count=len(self.rows))
+
+    def change_mask(self, change: str) -> np.ndarray:
+        """전일 대비 (EVEN / RISE / FALL)"""
+        return self.view["change"] == CHANGES.index(change)
+
+    def caution_mask(self, key: Optional[str] = None) -> np.ndarray:
+        """주의 종목 (key 를 지정하면 해당 유형만)"""
+        bits = self.view["caution"]
+        if key is None:
+            return bits != 0
+        return (bits >> CAUTION_KEYS.index(key) & 1).astype("?")
+
+    def markets_mask(self, markets: Iterable[str]) -> np.ndarray:
+        mask = np.zeros(len(self.rows), dtype="?")
+        mask[[self.rows[m] for m in markets if m in self.rows]] = True
+        return mask
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+
+    def select(self, mask: Optional[np.ndarray] = None, order_by: Optional[str] = None,
+               descending: bool = True, limit: Optional[int] = None) -> np.ndarray:
+        """
+        조건에 맞는 행 번호 (정렬/개수 제한)
+
+        Args:
+            mask: 조건 (bool 배열, 없으면 전체)
+            order_by: 정렬 필드 (숫자 필드)
+            descending: 내림차순 여부
+            limit: 최대 개수 - 정렬 시 전체 정렬 대신 상위 N개만 골라 정렬
+        """
+        valid = self.view["valid"]
+        rows = np.flatnonzero(valid if mask is None else valid & mask)
+        if order_by is None:
+            return rows if limit is None else rows[:limit]
+        keys = self.view[order_by][rows]
+        if descending:
+            keys = -keys
+        if limit is not None and limit < len(rows):
+            top = np.argpartition(keys, limit)[:limit]
+            return rows[top[np.argsort(keys[top], kind="stable")]]
+        return rows[np.argsort(keys, kind="stable")]
+
+    def column(self, field: str, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        values = self.view[field]
+        return values if rows is None else values[rows]
+
+    def to_records(self, rows: Iterable[int], fields: Optional[Sequence[str]] = None) -> List[Dict]:
+        """행을 /ticker 응답 형식의 dict 목록으로 변환 (API 응답 직전에만 사용)"""
+        fields = list(fields) if fields else ["market", "change"] + [n for n, _ in TICKER_STRINGS] + list(NUMERIC_FIELDS)
+        strings = {n for n, _ in TICKER_STRINGS}
+        rows = np.asarray(rows, dtype=np.intp)
+        columns = {}
+        for name in fields:
+            if name == "market":
+                columns[name] = self.codes[rows].tolist()
+            elif name == "change":
+                columns[name] = [CHANGES[v] for v in self.data["change"][rows].tolist()]
+            elif name in strings:
+                columns[name] = [v.decode() for v in self.data[name][rows].tolist()]
+            else:
+                columns[name] = self.data[name][rows].tolist()
+        return [dict(zip(fields, values)) for values in zip(*(columns[f] for f in fields))]
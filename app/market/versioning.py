@@ -0,0 +1,132 @@
+"""
+시세 스냅샷 버전 관리 / 변경분(delta) 응답
+
+마켓별 최신 값을 보관하고, 값이 바뀔 때마다 순번(seq)을 올리며 바뀐 필드만 기록한다.
+클라이언트는 마지막으로 받은 seq 를 since 로 보내면 그 이후 바뀐 마켓/필드만 받는다.
+
+    1회차: GET /ticker?markets=KRW-BTC,KRW-ETH&since=0
+           -> {"seq": 4294967301, "full": true, "data": [{...}, {...}]}
+    2회차: GET /ticker?markets=KRW-BTC,KRW-ETH&since=4294967301
+           -> {"seq": 4294967303, "full": false, "changed": [{"market": "KRW-BTC", "trade_price": ...}], "removed": []}
+
+- 보관 중인 변경 이력보다 오래된 seq, 다른 워커(또는 재시작 전)가 준 seq 는 전체 스냅샷으로 응답한다.
+  seq 는 저장소마다 임의의 시작값(상위 비트)을 가지므로 다른 저장소의 seq 와 겹치지 않는다.
+- 요청한 마켓을 그 자리에서 반영한 뒤 변경분을 계산하므로, 마켓별 변경은 빠짐없이 전달된다.
+  (요청 마켓 목록을 바꾼 경우에는 since=0 으로 전체 스냅샷을 다시 받아야 한다)
+"""
+import random
+from collections import deque
+from itertools import islice
+from typing import Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+_MISSING = object()
+
+
+class VersionedStore:
+    """
+    마켓별 최신 값 + 변경 이력
+
+    Args:
+        key: 항목을 구분하는 필드 (default: market)
+        history: 보관할 변경 이력 수 (이보다 오래된 since 는 전체 스냅샷)
+    """
+
+    def __init__(self, key: str = "market", history: int = 1024):
+        self.key = key
+        # 저장소별 시작값 (JavaScript 안전 정수 2^53 범위 이내)
+        self.base = random.randrange(1, 1 << 20) << 32
+        self.seq = self.base
+        self.items: Dict[str, Dict] = {}
+        # (seq, {마켓: 바뀐 필드}, 삭제된 마켓)
+        self.history: Deque[Tuple[int, Dict[str, Dict], Tuple[str, ...]]] = deque(maxlen=history)
+
+    def update(self, rows: Iterable[Dict], complete: bool = False) -> int:
+        """
+        새 값 반영 (바뀐 값이 있을 때만 seq 증가)
+
+        Args:
+            rows: 항목 목록
+            complete: rows 가 전체 목록인지 여부 (True 면 rows 에 없는 항목은 삭제로 기록)
+        """
+        changes: Dict[str, Dict] = {}
+        seen = set()
+        for row in rows:
+            code = row[self.key]
+            seen.add(code)
+            previous = self.items.get(code)
+            if previous is None:
+                changed = dict(row)
+            else:
+                changed = {k: v for k, v in row.items() if previous.get(k, _MISSING) != v}
+            if changed:
+                changes[code] = {self.key: code, **changed}
+                self.items[code] = row
+        removed = tuple(code for code in self.items if code not in seen) if complete else ()
+        for code in removed:
+            del self.items[code]
+        if changes or removed:
+            self.seq += 1
+            self.history.append((self.seq, changes, removed))
+        return self.seq
+
+    def _can_diff(self, since: int) -> bool:
+        if since == self.seq:
+            return True
+        if not self.history or not (self.base <= since < self.seq):
+            return False
+        return since >= self.history[0][0] - 1
+
+    def delta(self, since: int, codes: Optional[Sequence[str]] = None) -> Dict:
+        """
+        since 이후 변경분 (불가능하면 전체 스냅샷)
+
+        Args:
+            since: 클라이언트가 마지막으로 받은 seq (0: 전체 스냅샷)
+            codes: 대상 항목 (없으면 전체)
+
+        Returns:
+            - seq: 현재 seq (다음 요청의 since)
+            - full: 전체 스냅샷 여부
+            - data: 전체 항목 (full=true)
+            - changed: 바뀐 항목의 바뀐 필드 (full=false, key 필드는 항상 포함)
+            - removed: 삭제된 항목 코드 (full=false)
+        """
+        wanted = set(codes) if codes is not None else None
+        if not self._can_diff(since):
+            if wanted is None:
+                data = list(self.items.values())
+            else:
+                data = [self.items[c] for c in codes if c in self.items]
+            return {"seq": self.seq, "full": True, "data": data}
+
+        merged: Dict[str, Dict] = {}
+        removed: List[str] = []
+        # 이력의 seq 는 연속이므로 since 다음 항목부터 바로 읽는다
+        start = since - self.history[0][0] + 1 if self.history else 0
+        for _, changes, gone in islice(self.history, max(start, 0), None):
+            for code, fields in changes.items():
+                if wanted is None or code in wanted:
+                    merged.setdefault(code, {}).update(fields)
+            for code in gone:
+                if wanted is None or code in wanted:
+                    merged.pop(code, None)
+                    removed.append(code)
+        removed = [c for c in removed if c not in self.items]
+        return {"seq": self.seq, "full": False, "changed": list(merged.values()), "removed": removed}
+
+
+def project_delta(result: Dict, fields: Optional[List[str]], key: str = "market") -> Dict:
+    """delta 응답에 필드 선택(fields) 적용 (key 필드는 항상 유지, 남은 필드가 없는 항목은 제외)"""
+    if not fields:
+        return result
+    names = [key] + [f for f in fields if f != key]
+    if result["full"]:
+        result["data"] = [{f: row[f] for f in names if f in row} for row in result["data"]]
+    else:
+        changed = []
+        for row in result["changed"]:
+            item = {f: row[f] for f in names if f in row}
+            if len(item) > 1:
+                changed.append(item)
+        result["changed"] = changed
+    return result
@@ -0,0 +1,160 @@
+"""
+계좌 잔고 변화 추적
+
+/accounts 를 주기적으로 받아 화폐별 잔고(balance, locked, avg_buy_price) 변화만 구독자에게 보낸다.
+구독자가 있는 동안만 갱신하며, 갱신 간격은 상황에 맞게 바꾼다.
+
+- 기본: BALANCE_INTERVAL(30초) 간격
+- 미체결 주문/출금 대기 등으로 잠긴 잔고(locked)가 있으면 BALANCE_ACTIVE_INTERVAL(3초) 간격
+- 이 서버로 주문/취소/출금/입금을 요청하면 바로 갱신 (poke, 연속 요청은 REFRESH_DELAY 동안 모아 한 번)
+
+    tracker = get_tracker()
+    queue = await tracker.subscribe()     # 스냅샷 후 {"type": "change", "seq", "time", "changes": [...]}
+    tracker.poke()                        # 주문 접수 후
+    tracker.unsubscribe(queue)
+
+Note:
+    갱신 작업과 구독은 워커(프로세스)별이다. GET /accounts, balance_refresh 작업으로 받은 잔고도 반영한다.
+"""
+import asyncio
+import time
+from decimal import Decimal
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from app.core.config import get_settings
+
+FIELDS = ("balance", "locked", "avg_buy_price")
+# poke 후 갱신까지 기다리는 시간 (연속 요청을 한 번의 조회로 합침)
+REFRESH_DELAY = 0.2
+
+
+class BalanceTracker:
+    """
+    화폐별 잔고와 변화 구독
+
+    Args:
+        fetch: /accounts 조회 함수
+        interval: 기본 갱신 간격 (초)
+        active_interval: 잠긴 잔고가 있을 때 갱신 간격 (초)
+    """
+
+    def __init__(self, fetch: Callable[[], Awaitable[List[Dict]]], interval: float = 30.0,
+                 active_interval: float = 3.0):
+        self.fetch = fetch
+        self.interval = interval
+        self.active_interval = active_interval
+        self.accounts: Dict[str, Dict] = {}
+        self.seq = 0
+        self.updated_at: Optional[float] = None
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._dirty = True
+
+    def apply(self, rows: List[Dict]) -> List[Dict]:
+        """
+        조회한 계좌 목록 반영 후 변화를 구독자에게 전달
+
+        Returns:
+            화폐별 변화 목록
+            - currency, balance, locked, avg_buy_price: 현재 값
+            - changed: 바뀐 필드, prev: 바뀐 필드의 이전 값
+            - removed: 목록에서 사라진 화폐 (true)
+        """
+        accounts = {row["currency"]: row for row in rows}
+        changes = []
+        for currency, row in accounts.items():
+            old = self.accounts.get(currency)
+            changed = [f for f in FIELDS if old is None or old.get(f) != row.get(f)]
+            if changed:
+                change = {"currency": currency, **{f: row.get(f) for f in FIELDS}, "changed": changed}
+                if old is not None:
+                    change["prev"] = {f: old.get(f) for f in changed}
+                changes.append(change)
+        for currency in self.accounts.keys() - accounts.keys():
+            changes.append({"currency": currency, "removed": True})
+
+        self.accounts = accounts
+        self.updated_at = time.time()
+        self._dirty = False
+        if changes:
+            self.seq += 1
+            event = {"type": "change", "seq": self.seq, "time": self.updated_at, "changes": changes}
+            for queue in self._subscribers:
+                queue.put_nowait(event)
+        return changes
+
+    async def refresh(self) -> List[Dict]:
+        """업비트에서 잔고 조회 후 반영"""
+        return self.apply(await self.fetch())
+
+    def snapshot(self) -> Dict:
+        return {"type": "snapshot", "seq": self.seq, "time": self.updated_at, "accounts": list(self.accounts.values())}
+
+    def has_locked(self) -> bool:
+        """잠긴 잔고(미체결 주문, 출금 대기)가 있는지"""
+        return any(Decimal(str(a.get("locked") or 0)) > 0 for a in self.accounts.values())
+
+    def poke(self):
+        """잔고가 바뀌었을 수 있음 (구독 중이면 곧바로 갱신, 아니면 다음 조회 때 갱신)"""
+        self._dirty = True
+        if self._wake is not None:
+            self._wake.set()
+
+    async def subscribe(self) -> asyncio.Queue:
+        """
+        변화 구독 (첫 항목은 현재 잔고 스냅샷)
+
+        구독자가 생기면 갱신 작업을 시작하고, 마지막 구독자가 해지하면 멈춘다.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        if self._dirty or time.time() - self.updated_at > self.next_interval():
+            await self.refresh()
+        self._subscribers.add(queue)
+        queue.put_nowait(self.snapshot())
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+        if not self._subscribers and self._wake is not None:
+            self._wake.set()
+
+    def next_interval(self) -> float:
+        return self.active_interval if self.has_locked() else self.interval
+
+    async def _run(self):
+        while self._subscribers:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.next_interval())
+                await asyncio.sleep(REFRESH_DELAY)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if not self._subscribers:
+                break
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Error in balance tracker: {str(e)}")
+        self._wake = None
+
+
+_tracker: Optional[BalanceTracker] = None
+
+
+def get_tracker() -> BalanceTracker:
+    """프로세스 공용 잔고 추적기"""
+    global _tracker
+    if _tracker is None:
+        from app.trading.transfers import signed_get
+
+        settings = get_settings()
+        _tracker = BalanceTracker(
+            lambda: signed_get("/accounts"),
+            interval=settings.balance_interval,
+            active_interval=settings.balance_active_interval,
+        )
+    return _tracker
@@ -0,0 +1,227 @@
+"""
+주문 처리 시간 측정 (주문 요청 -> 업비트 접수 -> 체결)
+
+주문마다 단계별 시각을 기록하고, 마켓/주문 타입별 지연 시간 히스토그램
+(upbit_order_latency_seconds{market, ord_type, stage})에 반영한다.
+
+- received: 주문 요청 수신
+- validated: 사전 검증 완료 (캐시된 주문 가능 정보 사용)
+- signed: JWT 서명 완료
+- sent: 업비트 호출 시작 (주문 요청 수 제한(order 그룹) 토큰을 얻은 뒤)
+- acked: 업비트 응답 수신 (주문 접수)
+- first_fill: 처음 체결을 확인한 시각
+- final: 최종 상태(done/cancel)를 확인한 시각
+
+업비트는 체결을 알려주지 않으므로 접수된 주문을 주기적으로 /orders/uuids 로 묶어 조회해 확인한다
+(체결/최종 시각의 정확도는 조회 간격만큼). 접수 응답에 이미 체결이나 최종 상태가 있으면(시장가, IOC/FOK)
+접수 시각을 그대로 쓴다.
+
+조회 간격은 주문마다 interval 에서 시작해 조회할 때마다 두 배로 늘린다 (최대 max_interval, 첫 체결을
+확인하면 다시 interval). 체결 없이 unfilled_track 초가 지난 주문(대기 중인 지정가 주문)과 max_track 초가
+지난 주문은 추적을 멈춰 주문 요청 수 제한을 아낀다.
+
+    timeline = tracker.start("KRW-BTC", "bid", "limit")
+    timeline.mark("signed")
+    await ratelimit.acquire("order")
+    timeline.mark("sent")
+    tracker.acked(timeline, order)      # 응답의 uuid 로 체결 추적 시작
+
+Note:
+    주문 기록과 체결 추적은 워커(프로세스)별이다. 주문을 받은 워커에서만 조회된다.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from app.core.metrics import ORDER_LATENCY
+
+logger = logging.getLogger(__name__)
+
+MARKS = ("received", "validated", "signed", "sent", "acked", "first_fill", "final")
+# (단계, 시작 시각, 끝 시각) - 접수된 주문만 끝 시각을 기록할 때 히스토그램에 반영
+STAGES = (
+    ("validate", "received", "validated"),
+    ("sign", "validated", "signed"),
+    ("send", "signed", "sent"),
+    ("ack", "sent", "acked"),
+    ("submit", "received", "acked"),
+    ("first_fill", "acked", "first_fill"),
+    ("fill", "received", "first_fill"),
+    ("final", "received", "final"),
+)
+FINAL_STATES = ("done", "cancel")
+# 한 번에 조회하는 주문 수 (/orders/uuids 한도)
+POLL_CHUNK = 100
+
+
+class OrderTimeline:
+    """주문 한 건의 단계별 시각"""
+
+    __slots__ = ("id", "market", "side", "ord_type", "uuid", "state", "error", "created_at", "marks")
+
+    def __init__(self, market: str, side: str, ord_type: str):
+        self.id = uuid4().hex
+        self.market = market
+        self.side = side
+        self.ord_type = ord_type
+        self.uuid: Optional[str] = None
+        self.state: Optional[str] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.marks: Dict[str, float] = {"received": time.perf_counter()}
+
+    def mark(self, name: str, at: Optional[float] = None):
+        """단계 시각 기록 (이미 기록한 단계는 유지)"""
+        if name in self.marks:
+            return
+        self.marks[name] = time.perf_counter() if at is None else at
+        if "acked" not in self.marks:
+            # 접수 전 단계는 접수에 성공했을 때 한꺼번에 반영 (거부된 주문은 히스토그램에서 제외)
+            return
+        ends = [m for m in MARKS if m in self.marks] if name == "acked" else [name]
+        for stage, start, end in STAGES:
+            if end in ends and start in self.marks:
+                ORDER_LATENCY.labels(self.market, self.ord_type, stage).observe(
+                    self.marks[end] - self.marks[start]
+                )
+
+    def elapsed(self, name: str) -> Optional[float]:
+        """주문 요청 수신 후 해당 단계까지 걸린 시간 (ms)"""
+        at = self.marks.get(name)
+        return None if at is None else round((at - self.marks["received"]) * 1000, 3)
+
+    def to_dict(self) -> Dict:
+        return {
+            "uuid": self.uuid,
+            "market": self.market,
+            "side": self.side,
+            "ord_type": self.ord_type,
+            "state": self.state,
+            "error": self.error,
+            "created_at": round(self.created_at * 1000),
+            "elapsed_ms": {name: self.elapsed(name) for name in MARKS if name in self.marks},
+        }
+
+
+class OrderLatencyTracker:
+    """
+    주문별 처리 시간 기록과 체결 추적
+
+    Args:
+        fetch: uuid 목록을 받아 주문 목록을 반환하는 함수 (/orders/uuids 호출)
+        interval: 체결 확인 첫 조회 간격 (초)
+        history: 보관하는 최근 주문 수
+        max_track: 접수 후 체결 확인을 계속하는 최대 시간 (초)
+        max_interval: 주문별 조회 간격 상한 (초, 조회할 때마다 두 배로 늘림)
+        unfilled_track: 체결 없는 주문의 체결 확인을 계속하는 최대 시간 (초)
+    """
+
+    def __init__(self, fetch: Callable[[List[str]], Awaitable[List[Dict]]], interval: float = 0.5,
+                 history: int = 1000, max_track: float = 3600, max_interval: float = 30.0,
+                 unfilled_track: float = 300.0):
+        self.fetch = fetch
+        self.interval = interval
+        self.history = history
+        self.max_track = max_track
+        self.max_interval = max_interval
+        self.unfilled_track = unfilled_track
+        self.timelines: "OrderedDict[str, OrderTimeline]" = OrderedDict()
+        self.pending: Dict[str, OrderTimeline] = {}
+        # uuid -> (다음 조회 시각, 현재 조회 간격)
+        self._schedule: Dict[str, Tuple[float, float]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, market: str, side: str, ord_type: str) -> OrderTimeline:
+        """주문 요청 수신 시각 기록"""
+        return OrderTimeline(market, side, ord_type)
+
+    def _keep(self, timeline: OrderTimeline):
+        self.timelines[timeline.uuid or timeline.id] = timeline
+        while len(self.timelines) > self.history:
+            self.timelines.popitem(last=False)
+
+    def acked(self, timeline: OrderTimeline, order: Dict):
+        """업비트 접수 응답 기록 후 최종 상태가 아니면 체결 추적 시작"""
+        timeline.mark("acked")
+        timeline.uuid = order.get("uuid")
+        self._keep(timeline)
+        self._update(timeline, order)
+        if timeline.uuid and "final" not in timeline.marks:
+            self.pending[timeline.uuid] = timeline
+            self._schedule[timeline.uuid] = (timeline.marks["acked"] + self.interval, self.interval)
+            self._ensure_polling()
+
+    def failed(self, timeline: OrderTimeline, error: Exception):
+        """접수 실패 기록"""
+        timeline.state = "error"
+        timeline.error = str(error)
+        self._keep(timeline)
+
+    def get(self, uuid: str) -> Optional[OrderTimeline]:
+        return self.timelines.get(uuid)
+
+    def recent(self, limit: int = 100, market: Optional[str] = None) -> List[OrderTimeline]:
+        """최근 주문 (최신순)"""
+        result = []
+        for timeline in reversed(self.timelines.values()):
+            if market and timeline.market != market:
+                continue
+            result.append(timeline)
+            if len(result) >= limit:
+                break
+        return result
+
+    @staticmethod
+    def _update(timeline: OrderTimeline, order: Dict):
+        """조회한 주문 상태로 체결/최종 시각 기록"""
+        timeline.state = order.get("state", timeline.state)
+        if float(order.get("executed_volume") or 0) > 0 or int(order.get("trades_count") or 0) > 0:
+            timeline.mark("first_fill")
+        if timeline.state in FINAL_STATES:
+            timeline.mark("final")
+
+    def _untrack(self, uuid: str):
+        self.pending.pop(uuid, None)
+        self._schedule.pop(uuid, None)
+
+    async def poll_once(self, now: Optional[float] = None):
+        """조회 시각이 된 주문 상태 조회 (추적 시간이 지난 주문은 추적 중단)"""
+        now = time.perf_counter() if now is None else now
+        for uuid, timeline in list(self.pending.items()):
+            age = now - timeline.marks["acked"]
+            if age > self.max_track or ("first_fill" not in timeline.marks and age > self.unfilled_track):
+                self._untrack(uuid)
+        uuids = [uuid for uuid, (next_at, _) in self._schedule.items() if next_at <= now]
+        for uuid in uuids:
+            # 다음 조회까지 간격을 두 배로 (응답에서 첫 체결을 확인하면 아래에서 다시 줄임)
+            delay = min(self._schedule[uuid][1] * 2, self.max_interval)
+            self._schedule[uuid] = (now + delay, delay)
+        chunks = [uuids[i:i + POLL_CHUNK] for i in range(0, len(uuids), POLL_CHUNK)]
+        for orders in await asyncio.gather(*(self.fetch(chunk) for chunk in chunks)):
+            for order in orders:
+                timeline = self.pending.get(order.get("uuid"))
+                if timeline is None:
+                    continue
+                filled = "first_fill" in timeline.marks
+                self._update(timeline, order)
+                if "final" in timeline.marks:
+                    self._untrack(timeline.uuid)
+                elif not filled and "first_fill" in timeline.marks:
+                    self._schedule[timeline.uuid] = (now + self.interval, self.interval)
+
+    async def _poll(self):
+        while self.pending:
+            next_at = min((at for at, _ in self._schedule.values()), default=time.perf_counter())
+            await asyncio.sleep(max(next_at - time.perf_counter(), 0.0))
+            try:
+                await self.poll_once()
+            except Exception as e:
+                logger.warning("Error in order latency polling: %s", e)
+                await asyncio.sleep(self.interval)
+
+    def _ensure_polling(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._poll())
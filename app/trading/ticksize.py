@@ -0,0 +1,136 @@
+"""
+호가 단위 (주문 가격 단위)
+
+마켓 기준 화폐(KRW/BTC/USDT)별 가격 구간 -> 호가 단위 표로 주문 가격을 검사하고 맞춘다.
+업비트는 호가 단위에 맞지 않는 지정가 주문을 거부하므로 주문 전에 가격을 맞추거나 미리 거부한다.
+
+- 단일 가격: Decimal 로 정확하게 계산 (주문 검증)
+- 가격 배열: NumPy 로 한 번에 계산 (사다리/그리드 주문처럼 수천 개 가격)
+
+    table = table_for("KRW-BTC")
+    table.round(Decimal("143250300"), "down")                  # Decimal('143250000')
+    table.round_array(np.array([1234.56, 99.987]), "nearest")  # array([1235., 99.99])
+
+mode: down(내림, 매수 가격), up(올림, 매도 가격), nearest(반올림)
+
+Note:
+    호가 단위는 업비트 공지 기준이며 정책이 바뀌면 PRICE_UNITS 를 갱신한다.
+"""
+from bisect import bisect_right
+from decimal import ROUND_CEILING, ROUND_FLOOR, ROUND_HALF_UP, Decimal
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 기준 화폐별 (가격 하한, 호가 단위) - 하한 이상 가격에 적용, 높은 구간부터
+PRICE_UNITS: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "KRW": (
+        ("2000000", "1000"),
+        ("1000000", "500"),
+        ("500000", "100"),
+        ("100000", "50"),
+        ("10000", "10"),
+        ("1000", "1"),
+        ("100", "0.1"),
+        ("10", "0.01"),
+        ("1", "0.001"),
+        ("0.1", "0.0001"),
+        ("0.01", "0.00001"),
+        ("0.001", "0.000001"),
+        ("0.0001", "0.0000001"),
+        ("0", "0.00000001"),
+    ),
+    "BTC": (
+        ("0", "0.00000001"),
+    ),
+    "USDT": (
+        ("10", "0.01"),
+        ("1", "0.001"),
+        ("0.1", "0.0001"),
+        ("0.01", "0.00001"),
+        ("0.001", "0.000001"),
+        ("0.0001", "0.0000001"),
+        ("0", "0.00000001"),
+    ),
+}
+MODES = {"down": ROUND_FLOOR, "up": ROUND_CEILING, "nearest": ROUND_HALF_UP}
+
+
+def _snap(steps: np.ndarray) -> np.ndarray:
+    """나눗셈 오차(몇 ULP) 안에서 정수에 가까운 값은 정수로 (ex. 150.2 / 1e-8 = 15019999999.999998)"""
+    nearest = np.rint(steps)
+    tolerance = 8 * np.finfo(float).eps * np.maximum(1.0, np.abs(steps))
+    return np.where(np.abs(steps - nearest) <= tolerance, nearest, steps)
+
+
+class TickTable:
+    """가격 구간별 호가 단위 표"""
+
+    def __init__(self, bands: Sequence[Tuple[str, str]]):
+        ordered = sorted(((Decimal(low), Decimal(unit)) for low, unit in bands), key=lambda b: b[0])
+        self.lowers = [low for low, _ in ordered]
+        self.units = [unit for _, unit in ordered]
+        # 배열 계산용: 호가 단위를 정수로 만드는 배율 (10^소수 자릿수)
+        self._lowers = np.array([float(low) for low in self.lowers])
+        self._units = np.array([float(unit) for unit in self.units])
+        self._scales = np.array([10.0 ** max(0, -unit.as_tuple().exponent) for unit in self.units])
+        self._unit_ints = np.rint(self._units * self._scales)
+
+    def unit(self, price: Decimal) -> Decimal:
+        """가격의 호가 단위"""
+        return self.units[max(0, bisect_right(self.lowers, price) - 1)]
+
+    def round(self, price: Decimal, mode: str = "nearest") -> Decimal:
+        """호가 단위에 맞춘 가격"""
+        unit = self.unit(price)
+        return (price / unit).to_integral_value(rounding=MODES[mode]) * unit
+
+    def is_valid(self, price: Decimal) -> bool:
+        return price > 0 and price % self.unit(price) == 0
+
+    def _bands(self, prices: np.ndarray) -> np.ndarray:
+        return np.clip(np.searchsorted(self._lowers, prices, side="right") - 1, 0, len(self.units) - 1)
+
+    def units_array(self, prices: np.ndarray) -> np.ndarray:
+        """가격별 호가 단위"""
+        return self._units[self._bands(np.asarray(prices, dtype=float))]
+
+    def round_array(self, prices: np.ndarray, mode: str = "nearest") -> np.ndarray:
+        """
+        가격 배열을 호가 단위에 맞춤
+
+        Args:
+            prices: 가격 배열
+            mode: down/up/nearest
+
+        Returns:
+            맞춘 가격 배열 (0 이하/NaN 가격은 NaN)
+        """
+        if mode not in MODES:
+            raise ValueError(f"mode 는 {', '.join(MODES)} 중 하나여야 합니다")
+        prices = np.asarray(prices, dtype=float)
+        bands = self._bands(prices)
+        steps = prices / self._units[bands]
+        if mode == "down":
+            steps = np.floor(_snap(steps))
+        elif mode == "up":
+            steps = np.ceil(_snap(steps))
+        else:
+            steps = np.floor(_snap(steps + 0.5))
+        # 정수 배율로 계산해 0.1 + 0.2 같은 표현 오차 없이 가장 가까운 float 로 만든다
+        scales = self._scales[bands]
+        rounded = np.rint(steps * self._unit_ints[bands]) / scales
+        return np.where(prices > 0, rounded, np.nan)
+
+    def valid_array(self, prices: np.ndarray) -> np.ndarray:
+        """가격별 호가 단위 일치 여부"""
+        prices = np.asarray(prices, dtype=float)
+        return (prices > 0) & (self.round_array(prices, "nearest") == prices)
+
+
+TABLES: Dict[str, TickTable] = {quote: TickTable(bands) for quote, bands in PRICE_UNITS.items()}
+
+
+def table_for(market: str) -> Optional[TickTable]:
+    """마켓(ex. KRW-BTC)의 호가 단위 표 (기준 화폐 표가 없으면 None)"""
+    return TABLES.get(market.split("-", 1)[0])
@@ -0,0 +1,132 @@
+"""
+입출금 정보 캐시
+
+자주 바뀌지 않는 입출금 조회(출금 가능 정보, 출금 허용 주소, 입금 정보/주소, 트래블룰 거래소)를
+엔드포인트별 유효 시간으로 캐시한다. 출금/입금 주소 생성 후에는 영향을 받는 항목을 바로 비운다.
+
+    await cached_get("withdraw_chance", "/withdraws/chance", {'currency': "BTC"}, key="BTC")
+    get_transfer_cache().invalidate("withdraw_chance", "BTC")   # 출금 후
+
+유효 시간은 TRANSFER_CACHE_TTLS(ex. withdraw_chance=5,coin_info=120)로 엔드포인트별로 바꿀 수 있고,
+업비트 장애 시에는 UPSTREAM_STALE_TTL 이내의 만료된 값을 대신 응답한다.
+캐시별 적중/만료 값 응답 수는 GET /admin/caches 와 upbit_cache_requests_total{cache="transfer_*"} 로 확인한다.
+"""
+import asyncio
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from app.core import upstream
+from app.core.auth import encode
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+
+# 엔드포인트별 기본 유효 시간 (초)
+TRANSFER_TTLS: Dict[str, float] = {
+    "withdraw_chance": 10.0,  # 잔고/출금 한도 포함
+    "withdraw_addresses": 300.0,  # 업비트 웹에서 등록
+    "coin_info": 60.0,  # 입금 가능 여부/최소 수량
+    "coin_addresses": 300.0,  # 전체/개별 입금 주소
+    "available_banks": 3600.0,  # 트래블룰 가능 거래소
+}
+# 키 없이 캐시하는 엔드포인트 키
+ALL = "*"
+
+
+def parse_ttls(value: str) -> Dict[str, float]:
+    """엔드포인트별 유효 시간 설정 (ex. withdraw_chance=5,coin_info=120)"""
+    ttls = dict(TRANSFER_TTLS)
+    for item in value.split(","):
+        if "=" in item:
+            name, seconds = item.split("=", 1)
+            if name.strip() not in ttls:
+                raise ValueError(f"캐시하지 않는 엔드포인트입니다: {name.strip()}")
+            ttls[name.strip()] = float(seconds)
+    return ttls
+
+
+class TransferCache:
+    """
+    입출금 정보 엔드포인트별 캐시
+
+    Args:
+        ttls: 엔드포인트별 유효 시간 (초)
+        stale_ttl: 업비트 장애 시 만료된 값을 대신 응답하는 최대 시간 (초)
+    """
+
+    def __init__(self, ttls: Dict[str, float] = TRANSFER_TTLS, stale_ttl: float = 0.0):
+        self.caches = {
+            name: TTLCache(f"transfer_{name}", ttl, maxsize=256, stale_ttl=stale_ttl)
+            for name, ttl in ttls.items()
+        }
+
+    def _cache(self, endpoint: str) -> TTLCache:
+        cache = self.caches.get(endpoint)
+        if cache is None:
+            raise KeyError(f"캐시하지 않는 엔드포인트입니다: {endpoint}")
+        return cache
+
+    async def get(self, endpoint: str, key: Optional[Hashable],
+                  loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        캐시 조회 후 없으면 업비트 조회
+
+        Args:
+            endpoint: 엔드포인트 이름 (TRANSFER_TTLS 키)
+            key: 파라미터 (화폐 코드 등, 없으면 전체 조회)
+            loader: 업비트 조회 함수
+        """
+        return await self._cache(endpoint).get_or_load(ALL if key is None else key, loader)
+
+    def invalidate(self, endpoint: str, key: Optional[Hashable] = None):
+        """항목 삭제 (키 미지정 시 엔드포인트 전체)"""
+        if key is None:
+            self._cache(endpoint).invalidate()
+        else:
+            self._cache(endpoint).invalidate(key)
+
+
+_transfer_cache: Optional[TransferCache] = None
+
+
+def get_transfer_cache() -> TransferCache:
+    """프로세스 공용 입출금 정보 캐시"""
+    global _transfer_cache
+    if _transfer_cache is None:
+        settings = get_settings()
+        _transfer_cache = TransferCache(parse_ttls(settings.transfer_cache_ttls), settings.upstream_stale_ttl)
+    return _transfer_cache
+
+
+async def signed_get(path: str, params: Optional[Dict[str, str]] = None) -> Any:
+    """인증이 필요한 업비트 GET 조회 (업비트 호출은 스레드에서 실행)"""
+    settings = get_settings()
+
+    def sign():
+        payload = {
+            'access_key': settings.access_key,
+            'nonce': str(uuid.uuid4()),
+        }
+        if params:
+            payload['query'] = "&".join(f"{k}={v}" for k, v in params.items())
+        return {"Authorization": f"Bearer {encode(payload, settings.secret_key)}"}
+
+    def load():
+        response = upstream.get(f"{settings.upbit_api_url}{path}", params=params, sign=sign)
+        response.raise_for_status()
+        return upstream.decode(response)
+
+    return await asyncio.to_thread(load)
+
+
+async def cached_get(endpoint: str, path: str, params: Optional[Dict[str, str]] = None,
+                     key: Optional[Hashable] = None) -> Any:
+    """
+    입출금 정보 캐시를 거친 업비트 조회
+
+    Args:
+        endpoint: 엔드포인트 이름 (TRANSFER_TTLS 키)
+        path: API 경로 (ex. /withdraws/chance)
+        params: 쿼리 파라미터
+        key: 캐시 키 (없으면 엔드포인트 전체 조회 결과로 캐시)
+    """
+    return await get_transfer_cache().get(endpoint, key, lambda: signed_get(path, params))
@@ -0,0 +1,152 @@
+"""
+주문 사전 검증
+
+업비트에 주문을 보내기 전에 주문 가능 정보(/orders/chance, 짧게 캐시)로 주문을 검사해
+거부될 주문은 업비트 호출과 요청 수 제한을 쓰지 않고 바로 400 으로 응답한다.
+
+- 마켓 상태(active), 주문 방향, 주문 타입(bid_types/ask_types)
+- time_in_force: limit/best 주문만 ioc/fok 가능, best 주문은 필수
+- 주문 타입별 필수 값 (limit: price+volume, price: price, market: volume, best: 매수 price / 매도 volume)
+- 주문 총액: 최소 주문 금액(min_total) 이상, 최대 주문 금액(max_total) 이하
+- 잔고: 매수는 총액 + 수수료, 매도는 수량이 주문 가능 잔고 이하
+- 지정가 주문 가격의 호가 단위 (주문 가능 정보 없이 검사)
+
+    validate_price_unit(order)      # 주문 가능 정보 조회 전
+    validate_order(order, chance)   # 통과하지 못하면 OrderValidationError
+    validate_order(order, {})       # 주문 가능 정보가 없으면 마켓/잔고 검사 없이 주문 형식만 검사
+
+Note:
+    캐시된 잔고는 최대 캐시 유효 시간만큼 오래되었을 수 있다. 주문 접수 후에는 잠근 금액/수량을 캐시된 잔고에 반영한다.
+"""
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Optional
+
+from app.core.metrics import ORDER_REJECTS
+
+TIME_IN_FORCE = {
+    "limit": ("ioc", "fok"),
+    "best": ("ioc", "fok"),
+}
+
+
+class OrderValidationError(ValueError):
+    """사전 검증 실패 (reason: 메트릭 라벨)"""
+
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+def _reject(reason: str, message: str):
+    ORDER_REJECTS.labels(reason).inc()
+    raise OrderValidationError(reason, message)
+
+
+def _decimal(name: str, value: Optional[str]) -> Optional[Decimal]:
+    if value is None:
+        return None
+    try:
+        number = Decimal(str(value))
+    except InvalidOperation:
+        number = None
+    if number is None or not number.is_finite() or number <= 0:
+        _reject("invalid_number", f"{name} 는 0보다 큰 숫자여야 합니다: {value}")
+    return number
+
+
+def order_type_name(ord_type: str, time_in_force: Optional[str]) -> str:
+    """주문 가능 정보의 주문 타입 이름 (ex. limit + ioc -> limit_ioc)"""
+    return f"{ord_type}_{time_in_force}" if time_in_force else ord_type
+
+
+def validate_order(order: Any, chance: Dict):
+    """
+    주문 사전 검증
+
+    Args:
+        order: 주문 요청 (market, side, ord_type, price, volume, time_in_force)
+        chance: /orders/chance 응답
+
+    Raises:
+        OrderValidationError: 업비트가 거부할 주문
+    """
+    market = chance.get("market", {})
+    side, ord_type, tif = order.side, order.ord_type, order.time_in_force
+
+    if market.get("state", "active") != "active":
+        _reject("market_state", f"{order.market} 는 주문할 수 없는 상태입니다: {market.get('state')}")
+    if side not in market.get("order_sides", ("bid", "ask")):
+        _reject("side", f"지원하지 않는 주문 종류입니다: {side}")
+
+    if tif:
+        allowed = TIME_IN_FORCE.get(ord_type, ())
+        if tif not in allowed:
+            _reject("time_in_force", f"{ord_type} 주문은 time_in_force={tif} 를 지원하지 않습니다")
+    elif ord_type == "best":
+        _reject("time_in_force", "best 주문은 time_in_force(ioc, fok) 가 필수입니다")
+
+    # bid_types/ask_types 는 time_in_force 를 포함한 이름 (없으면 예전 형식 order_types)
+    types, name = market.get(f"{side}_types"), order_type_name(ord_type, tif)
+    if not types:
+        types, name = market.get("order_types"), ord_type
+    if types and name not in types:
+        _reject("ord_type", f"{order.market} 에서 지원하지 않는 주문 타입입니다: {name}")
+
+    price = _decimal("price", order.price)
+    volume = _decimal("volume", order.volume)
+    required = {
+        "limit": ("price", "volume"),
+        "price": ("price",),
+        "market": ("volume",),
+        "best": ("price",) if side == "bid" else ("volume",),
+    }.get(ord_type)
+    if required is None:
+        _reject("ord_type", f"알 수 없는 주문 타입입니다: {ord_type}")
+    for name, value in (("price", price), ("volume", volume)):
+        if name in required and value is None:
+            _reject("missing_field", f"{ord_type} 주문은 {name} 가 필수입니다")
+        if name not in required and value is not None:
+            _reject("unexpected_field", f"{ord_type} 주문은 {name} 를 지정할 수 없습니다")
+
+    # 총액: 지정가는 가격 x 수량, 시장가/최유리 매수는 가격 (시장가/최유리 매도는 체결 가격을 알 수 없어 생략)
+    total = price * volume if ord_type == "limit" else price
+    if total is not None:
+        min_total = market.get(side, {}).get("min_total")
+        if min_total and total < Decimal(str(min_total)):
+            _reject("min_total", f"최소 주문 금액은 {min_total} 입니다 (주문 금액 {total})")
+        max_total = market.get("max_total")
+        if max_total and total > Decimal(str(max_total)):
+            _reject("max_total", f"최대 주문 금액은 {max_total} 입니다 (주문 금액 {total})")
+
+    account = chance.get(f"{side}_account")
+    if account is None:
+        return
+    balance = Decimal(str(account.get("balance") or 0))
+    if side == "bid" and total is not None:
+        required_total = total * (1 + Decimal(str(chance.get("bid_fee") or 0)))
+        if required_total > balance:
+            _reject("balance", f"주문 가능 금액이 부족합니다 (필요 {required_total}, 가능 {balance})")
+    elif side == "ask" and volume is not None and volume > balance:
+        _reject("balance", f"주문 가능 수량이 부족합니다 (필요 {volume}, 가능 {balance})")
+
+
+def validate_price_unit(order: Any):
+    """
+    지정가 주문 가격이 호가 단위에 맞는지 검사 (호가 단위 표가 없는 마켓은 통과)
+
+    Raises:
+        OrderValidationError: 호가 단위에 맞지 않는 가격 (맞춘 가격을 함께 안내)
+    """
+    if order.ord_type != "limit" or order.price is None:
+        return
+    from app.trading.ticksize import table_for  # 사용 시에만 로드 (NumPy)
+
+    table = table_for(order.market)
+    price = _decimal("price", order.price)
+    if table is None or table.is_valid(price):
+        return
+    _reject(
+        "price_unit",
+        f"{order.market} {price} 의 호가 단위는 {table.unit(price)} 입니다 "
+        f"(가능한 가격: {table.round(price, 'down')}, {table.round(price, 'up')})",
+    )
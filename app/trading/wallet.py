@@ -0,0 +1,137 @@
+"""
+입출금 현황 (화폐/네트워크별 지갑 상태)
+
+스케줄러 작업(wallet_status_sync)이 주기적으로 /status/wallet 을 받아 화폐별로 색인하고,
+다른 워커는 공유 상태(wallet_status)에서 읽는다. 화폐 한 건 조회와 출금 전 상태 확인은
+업비트 호출 없이 메모리에서 처리한다.
+
+이전 조회 대비 wallet_state / block_state 가 바뀐 화폐/네트워크는 알림(app.market.alerts 싱크)으로 보낸다.
+
+    wallets = get_wallets()
+    alerts = wallets.update(rows)                 # 바뀐 지갑 상태 알림 목록
+    wallets.get("BTC")                            # 네트워크별 상태 목록
+    wallets.can_withdraw("BTC", "BTC")            # 출금 가능 여부 (모르면 None)
+
+Note:
+    상태 변화 알림은 스케줄러 작업에서만 만든다. 라우트가 직접 조회한 결과(update(notify=False))는
+    알림 기준 상태를 바꾸지 않으므로 다음 작업 실행에서 변화를 놓치지 않는다.
+"""
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.core import shared_state
+
+# 출금/입금이 가능한 지갑 상태
+WITHDRAW_STATES = ("working", "withdraw_only")
+DEPOSIT_STATES = ("working", "deposit_only")
+# 지갑 상태 변화 알림 싱크
+WALLET_SINKS = ("log", "push", "webhook")
+
+
+def wallet_key(row: Dict) -> Tuple[str, Optional[str]]:
+    return row["currency"], row.get("net_type")
+
+
+class WalletStatus:
+    """화폐별 입출금 현황"""
+
+    def __init__(self):
+        self.rows: List[Dict] = []
+        self.by_currency: Dict[str, List[Dict]] = {}
+        self.updated_at: Optional[float] = None
+        # 알림 기준 상태 (화폐, 네트워크) -> (wallet_state, block_state)
+        self._notified: Dict[Tuple[str, Optional[str]], Tuple[Optional[str], Optional[str]]] = {}
+
+    def update(self, rows: List[Dict], updated_at: Optional[float] = None, notify: bool = True) -> List[Dict]:
+        """
+        입출금 현황 반영
+
+        Args:
+            rows: /status/wallet 응답
+            updated_at: 조회 시각 (Unix timestamp, 없으면 현재)
+            notify: 상태 변화 알림 생성 여부
+
+        Returns:
+            상태가 바뀐 화폐/네트워크 알림 목록 (처음 본 화폐는 제외)
+        """
+        by_currency: Dict[str, List[Dict]] = {}
+        for row in rows:
+            by_currency.setdefault(row["currency"], []).append(row)
+        self.rows, self.by_currency = rows, by_currency
+        self.updated_at = time.time() if updated_at is None else updated_at
+        if not notify:
+            return []
+
+        alerts = []
+        states = {}
+        for row in rows:
+            key = wallet_key(row)
+            state = states[key] = (row.get("wallet_state"), row.get("block_state"))
+            previous = self._notified.get(key)
+            if previous is None:
+                continue
+            for field, old, new in zip(("wallet_state", "block_state"), previous, state):
+                if old != new:
+                    alerts.append(self._alert(row, field, old, new))
+        self._notified = states
+        return alerts
+
+    @staticmethod
+    def _alert(row: Dict, field: str, old: Optional[str], new: Optional[str]) -> Dict:
+        return {
+            "time": time.time(),
+            "rule": "wallet_status",
+            "event": field,
+            "market": row["currency"],
+            "currency": row["currency"],
+            "net_type": row.get("net_type"),
+            "prev": old,
+            "state": new,
+            "sinks": WALLET_SINKS,
+        }
+
+    def age(self) -> float:
+        """마지막 반영 후 지난 시간 (초, 반영한 적 없으면 inf)"""
+        return float("inf") if self.updated_at is None else time.time() - self.updated_at
+
+    def get(self, currency: str) -> Optional[List[Dict]]:
+        """화폐의 네트워크별 상태 (모르는 화폐는 None)"""
+        return self.by_currency.get(currency.upper())
+
+    def _allowed(self, currency: str, net_type: Optional[str], states: Tuple[str, ...]) -> Optional[bool]:
+        rows = self.get(currency)
+        if rows is None:
+            return None
+        if net_type:
+            rows = [r for r in rows if r.get("net_type") in (None, net_type)]
+            if not rows:
+                return None
+        return any(r.get("wallet_state") in states for r in rows)
+
+    def can_withdraw(self, currency: str, net_type: Optional[str] = None) -> Optional[bool]:
+        """출금 가능 여부 (현황에 없는 화폐/네트워크는 None)"""
+        return self._allowed(currency, net_type, WITHDRAW_STATES)
+
+    def can_deposit(self, currency: str, net_type: Optional[str] = None) -> Optional[bool]:
+        """입금 가능 여부 (현황에 없는 화폐/네트워크는 None)"""
+        return self._allowed(currency, net_type, DEPOSIT_STATES)
+
+    def sync_shared(self):
+        """다른 워커(스케줄러 리더)가 기록한 현황이 더 최신이면 반영"""
+        result = shared_state.read("wallet_status")
+        if result is None:
+            return
+        updated_at = result["data"].get("fetched_at", result["updated_at"])
+        if self.updated_at is None or updated_at > self.updated_at:
+            self.update(result["data"]["wallets"], updated_at, notify=False)
+
+
+_wallets: Optional[WalletStatus] = None
+
+
+def get_wallets() -> WalletStatus:
+    """프로세스 공용 입출금 현황"""
+    global _wallets
+    if _wallets is None:
+        _wallets = WalletStatus()
+    return _wallets
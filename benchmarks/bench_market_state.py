@@ -0,0 +1,70 @@
+"""
+현재가 상태 표현 방식별 메모리/조회 시간 비교
+
+    python -m benchmarks.bench_market_state
+
+- dict 목록   : 현재가 응답을 그대로 보관 (list[dict])
+- MarketTable : NumPy 구조화 배열 + 마켓 코드 -> 행 번호 맵 (app/market/state.py)
+
+ingest 는 응답(dict 목록)을 반영하는 비용이다. 테이블은 필드별 배열로 옮기는 변환 비용이 들고,
+대신 이후 정렬/필터/상위 N개 조회가 빨라진다.
+"""
+import json
+import timeit
+import tracemalloc
+
+from app.market.state import MarketTable
+from benchmarks.bench_passthrough import make_tickers
+
+N = 2000
+
+
+def measure_memory(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    value = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, after - before
+
+
+def dict_ops(tickers):
+    return {
+        "sort": lambda: sorted(tickers, key=lambda t: t["acc_trade_price_24h"], reverse=True),
+        "filter": lambda: [t for t in tickers if t["change"] == "RISE" and t["signed_change_rate"] > 0.005],
+        "top 20": lambda: sorted(tickers, key=lambda t: t["acc_trade_price_24h"], reverse=True)[:20],
+        "ingest": lambda: {t["market"]: t for t in tickers},
+    }
+
+
+def table_ops(table, tickers):
+    return {
+        "sort": lambda: table.select(order_by="acc_trade_price_24h"),
+        "filter": lambda: table.select(
+            table.change_mask("RISE") & (table.column("signed_change_rate") > 0.005)
+        ),
+        "top 20": lambda: table.select(order_by="acc_trade_price_24h", limit=20),
+        "ingest": lambda: table.update_tickers(tickers),
+    }
+
+
+if __name__ == "__main__":
+    for count in (250, 1000):
+        body = make_tickers(count)
+        tickers, dict_bytes = measure_memory(lambda: json.loads(body))
+
+        def build_table():
+            table = MarketTable()
+            table.update_tickers(tickers)
+            return table
+
+        table, table_bytes = measure_memory(build_table)
+
+        print(f"[{count} markets]")
+        print(f"  memory / market : dict {dict_bytes / count:8.0f} B   table {table_bytes / count:8.0f} B"
+              f"  (x{dict_bytes / table_bytes:.1f})")
+        d_ops, t_ops = dict_ops(tickers), table_ops(table, tickers)
+        for name in d_ops:
+            d = timeit.timeit(d_ops[name], number=N) / N
+            t = timeit.timeit(t_ops[name], number=N) / N
+            print(f"  {name:7s}         : dict {d * 1e6:8.1f} us  table {t * 1e6:8.1f} us  (x{d / t:.2f})")
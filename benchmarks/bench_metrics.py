@@ -0,0 +1,66 @@
+"""
+메트릭 기록 오버헤드 측정
+
+    python -m benchmarks.bench_metrics
+
+- 히스토그램 observe / 카운터 inc 1회당 비용
+- MetricsMiddleware 적용 전후 ASGI 요청 1건당 추가 비용
+"""
+import asyncio
+import time
+import timeit
+
+from app.core.metrics import Counter, Histogram, MetricsMiddleware
+
+N = 200_000
+
+
+def bench_primitives():
+    histogram = Histogram("bench_latency_seconds", "bench", ("method", "route"))
+    counter = Counter("bench_requests_total", "bench", ("method", "route", "status"))
+
+    observe = timeit.timeit(
+        lambda: histogram.labels("GET", "/api/upbit/ticker").observe(0.0123), number=N
+    )
+    inc = timeit.timeit(
+        lambda: counter.labels("GET", "/api/upbit/ticker", "200").inc(), number=N
+    )
+    print(f"histogram observe : {observe / N * 1e9:8.0f} ns")
+    print(f"counter inc       : {inc / N * 1e9:8.0f} ns")
+
+
+class _Route:
+    path = "/api/upbit/ticker"
+
+
+async def _app(scope, receive, send):
+    scope["route"] = _Route
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"[]"})
+
+
+async def _send(message):
+    pass
+
+
+async def _receive():
+    return {"type": "http.request"}
+
+
+async def _run(app, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        await app({"type": "http", "method": "GET"}, _receive, _send)
+    return time.perf_counter() - start
+
+
+def bench_middleware():
+    n = N // 4
+    base = asyncio.run(_run(_app, n))
+    wrapped = asyncio.run(_run(MetricsMiddleware(_app), n))
+    print(f"middleware        : {(wrapped - base) / n * 1e9:8.0f} ns/request")
+
+
+if __name__ == "__main__":
+    bench_primitives()
+    bench_middleware()
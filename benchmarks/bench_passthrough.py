@@ -0,0 +1,69 @@
+"""
+업비트 JSON 응답 전달 방식별 CPU 비용 비교
+
+    python -m benchmarks.bench_passthrough
+
+KRW 전체 마켓 /ticker 크기의 응답으로 요청 1건당 처리 시간을 비교한다.
+- decode + FastAPI 직렬화 : 기존 방식 (response.json() -> jsonable_encoder -> JSONResponse)
+- jsonutil (orjson)        : 가공이 필요할 때 (loads -> dumps)
+- passthrough              : 업비트 응답 바이트를 그대로 전달
+"""
+import json
+import random
+import timeit
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core import jsonutil
+from app.core.responses import RawJSONResponse
+
+N = 200
+
+
+def make_tickers(count: int = 250) -> bytes:
+    """/ticker 응답과 같은 필드 구성의 샘플 데이터"""
+    rows = []
+    for i in range(count):
+        price = random.uniform(1, 100_000_000)
+        rows.append({
+            "market": f"KRW-C{i:03d}",
+            "trade_date": "20241019", "trade_time": "123456",
+            "trade_date_kst": "20241019", "trade_time_kst": "213456",
+            "trade_timestamp": 1729373696000, "opening_price": price,
+            "high_price": price * 1.05, "low_price": price * 0.95, "trade_price": price,
+            "prev_closing_price": price * 0.99, "change": "RISE", "change_price": price * 0.01,
+            "change_rate": 0.0101, "signed_change_price": price * 0.01,
+            "signed_change_rate": 0.0101, "trade_volume": random.random() * 100,
+            "acc_trade_price": price * 1000, "acc_trade_price_24h": price * 2000,
+            "acc_trade_volume": 1000.5, "acc_trade_volume_24h": 2000.5,
+            "highest_52_week_price": price * 2, "highest_52_week_date": "2024-03-14",
+            "lowest_52_week_price": price / 2, "lowest_52_week_date": "2023-10-19",
+            "timestamp": 1729373696123,
+        })
+    return json.dumps(rows).encode()
+
+
+def reparse(body: bytes):
+    data = json.loads(body)
+    return JSONResponse(jsonable_encoder(data)).body
+
+
+def fast(body: bytes):
+    return RawJSONResponse(jsonutil.dumps(jsonutil.loads(body))).body
+
+
+def passthrough(body: bytes):
+    return RawJSONResponse(body).body
+
+
+if __name__ == "__main__":
+    body = make_tickers()
+    print(f"payload: {len(body) / 1024:.0f} KB")
+    base = None
+    for name, func in [("decode + FastAPI 직렬화", reparse),
+                       ("jsonutil (orjson)", fast),
+                       ("passthrough", passthrough)]:
+        elapsed = timeit.timeit(lambda: func(body), number=N) / N
+        base = base or elapsed
+        print(f"{name:24s}: {elapsed * 1e3:8.3f} ms/request  (x{base / elapsed:,.0f})")
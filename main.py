@@ -1,3 +1,7 @@
+import time
+_import_start = time.perf_counter()
+
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.exchage import accounts
@@ -6,7 +10,16 @@ from app.api.exchage import withdraws
 from app.api.exchage import deposits
 from app.api.exchage import status
 from app.api.exchage import market
-from app.api.schedule.scheduler import init_scheduler
+from app.api.monitoring import metrics
+from app.api.monitoring import admin
+from app.api.monitoring import alerts
+from app.api.schedule import jobs
+from app.api.schedule.scheduler import start_scheduler_later, shutdown_scheduler
+from app.api.schedule.warmup import warmup_caches
+from app.core.config import get_settings
+from app.core.metrics import MetricsMiddleware, STARTUP_SECONDS
+from app.core.tracing import TracingMiddleware
+from app.core.compression import CompressionMiddleware
 
 
 app = FastAPI(
@@ -15,10 +28,32 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# 백그라운드 작업 참조 유지 (GC 방지)
+background_tasks = set()
+
+def run_in_background(coro):
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+
 @app.on_event("startup")
 async def startup_event():
-    """앱 시작시 스케줄러 초기화"""
-    init_scheduler()
+    """
+    앱 시작시 캐시 워밍업/스케줄러 시작을 백그라운드로 예약
+
+    요청 수신을 막지 않도록 startup 훅에서는 작업을 예약만 하고 바로 반환한다.
+    """
+    start = time.perf_counter()
+    settings = get_settings()
+    if settings.warmup_enabled:
+        run_in_background(warmup_caches())
+    if settings.scheduler_enabled:
+        run_in_background(start_scheduler_later(settings.scheduler_start_delay))
+
+    STARTUP_SECONDS.labels("import").set(_app_ready - _import_start)
+    STARTUP_SECONDS.labels("startup").set(time.perf_counter() - start)
+    print(f"앱 시작 완료 - import {(_app_ready - _import_start) * 1000:.0f}ms, "
+          f"startup {(time.perf_counter() - start) * 1000:.1f}ms")
 
 # CORS 설정
 app.add_middleware(
@@ -29,6 +64,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 응답 압축 (br/gzip)
+app.add_middleware(CompressionMiddleware)
+
+# 라우트별 요청 수/지연시간 메트릭
+app.add_middleware(MetricsMiddleware)
+
+# 요청별 트레이싱 (루트 스팬)
+app.add_middleware(TracingMiddleware)
+
 # 라우터 등록
 app.include_router(accounts.router)
 app.include_router(orders.router)
@@ -36,6 +80,18 @@ app.include_router(withdraws.router)
 app.include_router(deposits.router)
 app.include_router(status.router)
 app.include_router(market.router)
+app.include_router(metrics.router)
+app.include_router(admin.router)
+app.include_router(alerts.router)
+app.include_router(jobs.router)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """앱 종료시 스케줄러 종료 (리더 락 해제 - 다른 워커가 즉시 이어받음)"""
+    shutdown_scheduler()
+
+_app_ready = time.perf_counter()
 
 
 @app.get("/")
@@ -1,5 +1,6 @@
-import { useQuery } from '@tanstack/react-query';
-import { account } from '@/lib/api/account';
+import { useEffect } from 'react';
+import { useQuery, useQueryClient } from '@tanstack/react-query';
+import { account, applyBalanceEvent } from '@/lib/api/account';
 import { formatNumber } from '@/lib/utils';
 import { Pie } from 'react-chartjs-2';
 import { Chart as ChartJS, ArcElement, Tooltip, Legend } from 'chart.js';
@@ -14,11 +15,23 @@ interface Account {
 }
 
 export function AssetSummary() {
+  const queryClient = useQueryClient();
   const { data: accounts } = useQuery({
     queryKey: ['accounts'],
     queryFn: () => account.getBalance(),
+    // 이후 잔고는 스트림으로 갱신
+    staleTime: Infinity,
   });
 
+  useEffect(() => {
+    return account.subscribeBalance((event) => {
+      queryClient.setQueryData(['accounts'], (prev: any) => ({
+        ...prev,
+        data: applyBalanceEvent(prev?.data ?? [], event),
+      }));
+    });
+  }, [queryClient]);
+
   const chartData = {
     labels: accounts?.data?.map((account: Account) => account.currency) || [],
     datasets: [
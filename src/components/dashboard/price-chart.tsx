@@ -25,19 +25,23 @@ ChartJS.register(
 
 export function PriceChart() {
   const { data: candles } = useQuery({
-    queryKey: ['candles', 'KRW-BTC'],
-    queryFn: () => market.getCandles('KRW-BTC', 1),
+    queryKey: ['candles', 'live', 'KRW-BTC'],
+    // 실시간 캔들이 없으면(trade_sync 작업 미실행) 업비트 분 캔들로 표시
+    queryFn: () => market.getLiveCandles('KRW-BTC', 1).catch(() => market.getCandles('KRW-BTC', 1)),
     refetchInterval: 1000,
   });
 
+  // 최신순 응답을 시간 순으로 표시 (마지막 캔들은 진행 중인 캔들)
+  const rows = [...(candles?.data || [])].reverse();
+
   const chartData = {
-    labels: candles?.data?.map((candle: any) => 
+    labels: rows.map((candle: any) =>
       new Date(candle.timestamp).toLocaleTimeString()
-    ) || [],
+    ),
     datasets: [
       {
         label: '가격',
-        data: candles?.data?.map((candle: any) => candle.trade_price) || [],
+        data: rows.map((candle: any) => candle.trade_price),
         borderColor: 'rgb(75, 192, 192)',
         tension: 0.1
       }
@@ -11,9 +11,47 @@ export interface Account {
   unit_currency: string;
 }
 
+export interface BalanceChange {
+  currency: string;
+  balance?: string;
+  locked?: string;
+  avg_buy_price?: string;
+  changed?: string[];
+  prev?: Partial<Pick<Account, 'balance' | 'locked' | 'avg_buy_price'>>;
+  removed?: boolean;
+}
+
+export type BalanceEvent =
+  | { type: 'snapshot'; seq: number; time: number; accounts: Account[] }
+  | { type: 'change'; seq: number; time: number; changes: BalanceChange[] };
+
+// 스냅샷/변화를 반영한 잔고 목록
+export function applyBalanceEvent(accounts: Account[], event: BalanceEvent): Account[] {
+  if (event.type === 'snapshot') {
+    return event.accounts;
+  }
+  const next = new Map(accounts.map((a) => [a.currency, a]));
+  for (const change of event.changes) {
+    if (change.removed) {
+      next.delete(change.currency);
+      continue;
+    }
+    const { changed, prev, removed, ...fields } = change;
+    next.set(change.currency, { ...next.get(change.currency), ...fields } as Account);
+  }
+  return Array.from(next.values());
+}
+
 export const account = {
   getBalance: async () => {
     const response = await axios.get(`${BASE_URL}/accounts`);
     return response;
+  },
+
+  // 잔고 변화 구독 (SSE, 반환 함수로 해지)
+  subscribeBalance: (onEvent: (event: BalanceEvent) => void) => {
+    const source = new EventSource(`${BASE_URL}/accounts/stream`);
+    source.onmessage = (message) => onEvent(JSON.parse(message.data));
+    return () => source.close();
   }
 }; 
\ No newline at end of file
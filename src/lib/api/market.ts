@@ -16,6 +16,8 @@ export interface Ticker {
   change: 'RISE' | 'EVEN' | 'FALL';
   change_rate: number;
   change_price: number;
+  signed_change_rate: number;
+  signed_change_price: number;
   acc_trade_volume: number;
   acc_trade_price: number;
   acc_trade_volume_24h: number;
@@ -23,6 +25,14 @@ export interface Ticker {
   highest_52_week_price: number;
 }
 
+// 서버 측 필드 선택(fields=) - Ticker 인터페이스에서 사용하는 필드만 요청
+// (getTicker 사용처에서 읽는 필드를 추가하면 여기에도 추가)
+export const TICKER_FIELDS = [
+  'market', 'trade_date', 'trade_time', 'trade_price', 'change', 'change_rate',
+  'change_price', 'signed_change_rate', 'signed_change_price', 'acc_trade_volume', 'acc_trade_price', 'acc_trade_volume_24h',
+  'acc_trade_price_24h', 'highest_52_week_price'
+].join(',');
+
 export interface Trade {
   market: string;
   trade_date_utc: string;
@@ -48,9 +58,12 @@ export const market = {
     }
   },
   
-  getTicker: async (markets: string) => {
+  // fields: 요청할 필드 (콤마 구분, 기본 TICKER_FIELDS)
+  getTicker: async (markets: string, fields: string = TICKER_FIELDS) => {
     try {
-      const response = await axios.get(`${BASE_URL}/ticker?markets=${markets}`);
+      const response = await axios.get(`${BASE_URL}/ticker`, {
+        params: { markets, fields }
+      });
       console.log('Ticker response:', response); // 디버깅용
       return response;
     } catch (error) {
@@ -71,5 +84,13 @@ export const market = {
       params: { market }
     });
     return response;
+  },
+
+  // 체결 기반 실시간 캔들 (서버에서 만든 캔들, 업비트 호출 없음)
+  getLiveCandles: async (market: string, unit: number = 1, count: number = 60) => {
+    const response = await axios.get(`${BASE_URL}/candles/live/${unit}`, {
+      params: { market, count }
+    });
+    return response;
   }
 }; 
\ No newline at end of file
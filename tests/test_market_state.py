@@ -0,0 +1,32 @@
+from app.market.state import MarketTable
+
+
+def ticker(market, price=100.0):
+    return {"market": market, "change": "RISE", "trade_price": price, "acc_trade_price_24h": price}
+
+
+def test_delisted_market_becomes_invalid():
+    table = MarketTable()
+    table.update_markets([{"market": "KRW-BTC"}, {"market": "KRW-OLD"}])
+    table.update_tickers([ticker("KRW-BTC"), ticker("KRW-OLD")])
+    assert table.view["valid"].all()
+
+    # 상장 폐지: 마켓 코드 전체 응답에서 빠짐
+    table.update_markets([{"market": "KRW-BTC"}])
+    table.update_tickers([ticker("KRW-BTC")])
+
+    rows = table.select(order_by="acc_trade_price_24h")
+    assert [r["market"] for r in table.to_records(rows, ["market"])] == ["KRW-BTC"]
+    assert not table.view["valid"][table.rows["KRW-OLD"]]
+
+
+def test_relisted_market_becomes_valid_again():
+    table = MarketTable()
+    table.update_markets([{"market": "KRW-BTC"}])
+    table.update_tickers([ticker("KRW-BTC")])
+    table.update_markets([])
+    assert len(table.select()) == 0
+
+    table.update_markets([{"market": "KRW-BTC"}])
+    table.update_tickers([ticker("KRW-BTC")])
+    assert len(table.select()) == 1